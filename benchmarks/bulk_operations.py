@@ -0,0 +1,106 @@
+"""
+Benchmark operacji zbiorczych: Repository.add_many / update_many /
+delete_many kontra add / update / delete wywoływane w pętli.
+
+Tabela Book ma indeks haszujący (author), posortowany
+(publication_year) i — z --journal — dziennik, do którego pętla
+dopisuje każdy rekord osobno, a operacja zbiorcza jedną partię.
+
+Uruchomienie (z katalogu repozytorium):
+    PYTHONPATH=src python benchmarks/bulk_operations.py
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from biblioteka.models import Book
+from biblioteka.storage.journal import Journal
+from biblioteka.storage.repository import Repository
+
+
+def make_books(n, seed=0):
+    rnd = random.Random(seed)
+    return [
+        Book(
+            isbn=f"B{i:07d}", title=f"Title {i}", author=f"A{i % 500}",
+            publication_year=rnd.randrange(1800, 2025),
+        )
+        for i in range(n)
+    ]
+
+
+def make_repo(journal_dir):
+    repo = Repository(
+        indexes={Book: ("author",)},
+        sorted_indexes={Book: ("publication_year",)},
+    )
+    if journal_dir:
+        path = os.path.join(journal_dir, f"books-{time.perf_counter_ns()}")
+        repo.attach_journal(Book, Journal(path))
+    return repo
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(n, journal_dir):
+    books = make_books(n)
+    keys = [b.isbn for b in books]
+
+    loop = make_repo(journal_dir)
+    bulk = make_repo(journal_dir)
+    results = {}
+
+    def add_loop():
+        for book in books:
+            loop.add(book)
+
+    results["add"] = (timed(add_loop), timed(lambda: bulk.add_many(books)))
+
+    for book in books:
+        book.publication_year += 1
+
+    def update_loop():
+        for book in books:
+            loop.update(book)
+
+    results["update"] = (
+        timed(update_loop), timed(lambda: bulk.update_many(books)),
+    )
+
+    def delete_loop():
+        for key in keys:
+            loop.delete(Book, key)
+
+    results["delete"] = (
+        timed(delete_loop), timed(lambda: bulk.delete_many(Book, keys)),
+    )
+    assert loop.count(Book) == bulk.count(Book) == 0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--journal", action="store_true")
+    args = parser.parse_args()
+    print(
+        f"{args.records} books, hash + sorted index, "
+        f"journal {'on' if args.journal else 'off'}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.records, tmp if args.journal else None)
+    for op, (loop, bulk) in results.items():
+        print(
+            f"{op:8} loop {loop:8.3f}s   {op}_many {bulk:8.3f}s   "
+            f"speedup {loop / bulk:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
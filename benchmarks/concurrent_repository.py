@@ -0,0 +1,170 @@
+"""
+Benchmark rywalizacji o blokady: ConcurrentRepository (blokady RW
+per tabela + blokada pisarza) kontra jedna globalna blokada.
+
+Wątki-czytelnicy wykonują get/list na tabeli Book, wątki-pisarze
+wypożyczają i zwracają książki (LoanService) z dziennikiem fsync.
+--fsync-ms dodaje opóźnienie każdego fsync dziennika (wolny dysk),
+w trakcie którego wątek pisarza nie zajmuje GIL, a --think-ms
+przerwę czytelnika między zapytaniami (obsługa żądania, sieć).
+--group-commit-ms włącza grupowe zatwierdzanie dziennika
+(Journal(group_commit=...)) — jeden fsync na okno czasu.
+
+Uruchomienie (z katalogu repozytorium):
+    PYTHONPATH=src python benchmarks/concurrent_repository.py
+"""
+from contextlib import contextmanager
+from datetime import date
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from biblioteka.models import Book, Loan, Member
+from biblioteka.services import LoanService
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.journal import Journal
+
+
+class SlowJournal(Journal):
+    """
+    Dziennik z dodatkowym opóźnieniem fsync (symulacja wolnego dysku).
+    Opóźniane jest każde utrwalenie — przy zapisie (write()) albo,
+    w trybie group_commit, raz na okno w sync().
+    """
+
+    delay = 0.0
+
+    def _fsync(self, f):
+        time.sleep(self.delay)
+        super()._fsync(f)
+
+
+class GlobalLockRepository(ConcurrentRepository):
+    """
+    Punkt odniesienia: każda operacja (także odczyt) pod jedną
+    wspólną blokadą.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._global = threading.RLock()
+        super().__init__(*args, **kwargs)
+
+    @contextmanager
+    def transaction(self):
+        with self._global:
+            with super().transaction() as repo:
+                yield repo
+
+    def _acquire_read(self, cls):
+        self._global.acquire()
+        self._table(cls)
+        self._ensure_indexes(cls)
+        return self
+
+    def release_read(self):
+        self._global.release()
+
+    @contextmanager
+    def _writing(self, cls):
+        with self._global:
+            yield
+
+
+def build(repo_cls, books, members, journal_dir, group_commit):
+    repo = repo_cls(indexes={Book: ("status",), Loan: ("returned_on",)})
+    for i in range(books):
+        repo.add(Book(isbn=f"B{i}", title=f"Title {i}", author="A"))
+    for i in range(members):
+        repo.add(Member(
+            member_id=f"M{i}", name="N", registered_on=date.today(),
+            max_books=10 ** 6,
+        ))
+    for cls in (Book, Loan, Member):
+        path = os.path.join(journal_dir, f"{cls.__name__}.journal")
+        repo.attach_journal(
+            cls, SlowJournal(path, fsync=True, group_commit=group_commit),
+        )
+    return repo
+
+
+def run(repo_cls, readers, writers, seconds, books, think, group_commit):
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = build(repo_cls, books, writers, tmp, group_commit)
+        service = LoanService(repo)
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0}
+        guard = threading.Lock()
+
+        def reader(seed):
+            rnd = random.Random(seed)
+            done = 0
+            while not stop.is_set():
+                repo.get(Book, f"B{rnd.randrange(books)}")
+                repo.list(Book, author="A")
+                done += 1
+                if think:
+                    time.sleep(think)
+            with guard:
+                counts["reads"] += done
+
+        def writer(n):
+            rnd = random.Random(n)
+            done = 0
+            while not stop.is_set():
+                isbn = f"B{rnd.randrange(books)}"
+                try:
+                    loan = service.loan_book(f"M{n}", isbn)
+                except Exception:
+                    continue
+                service.return_book(loan.loan_id)
+                done += 1
+            with guard:
+                counts["writes"] += done
+
+        threads = [
+            threading.Thread(target=reader, args=(i,)) for i in range(readers)
+        ] + [
+            threading.Thread(target=writer, args=(i,)) for i in range(writers)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+    return counts["reads"] / seconds, counts["writes"] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--fsync-ms", type=float, default=2.0)
+    parser.add_argument("--think-ms", type=float, default=0.2)
+    parser.add_argument("--group-commit-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    SlowJournal.delay = args.fsync_ms / 1000
+    print(
+        f"{args.readers} readers, {args.writers} writers, "
+        f"{args.books} books, {args.fsync_ms} ms fsync delay, "
+        f"{args.group_commit_ms} ms group commit window, "
+        f"{args.think_ms} ms reader think time, {args.seconds}s per run"
+    )
+    for repo_cls in (GlobalLockRepository, ConcurrentRepository):
+        reads, writes = run(
+            repo_cls, args.readers, args.writers, args.seconds, args.books,
+            args.think_ms / 1000, args.group_commit_ms / 1000,
+        )
+        print(
+            f"{repo_cls.__name__:24} reads/s {reads:10.0f}   "
+            f"loan+return/s {writes:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
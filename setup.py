@@ -22,6 +22,12 @@ setup(
             "mypy>=1.0",
             "black>=24.0",
         ],
+        "analytics": [
+            "numpy>=1.24",
+        ],
+        "fast": [
+            "orjson>=3.9",
+        ],
     },
     include_package_data=True,
     zip_safe=False,
@@ -1,8 +1,19 @@
+import io
 import os
+import sys
 import argparse
-from datetime import date, datetime
-
+from contextlib import redirect_stdout
+from datetime import date
+from typing import Optional
+
+from biblioteka.config import JOURNAL_COMPACT_THRESHOLD
+from biblioteka.storage.codecs import get_codec
+from biblioteka.storage.filelock import TableLocks
+from biblioteka.storage.fulltext import FullTextIndex
+from biblioteka.storage.journal import Journal
 from biblioteka.storage.repository import Repository
+from biblioteka.storage.sharding import MANIFEST
+from biblioteka.storage.sqlite_repository import SQLiteRepository
 from biblioteka.services import (
     CatalogService,
     MemberService,
@@ -12,8 +23,8 @@ from biblioteka.services import (
 )
 from biblioteka.models import Book, Member, Role, Loan, User
 from biblioteka.models.reservation import Reservation
-from biblioteka.models.book import BookStatus
-from biblioteka.utils.exceptions import DataImportError
+from biblioteka.services.catalog_service import SEARCH_FIELDS
+from biblioteka.utils.exceptions import DataExportError, DataImportError
 
 
 DATA_BOOK_FILE = os.getenv("BIB_BOOK_DATA_FILE", "biblioteka_books.json")
@@ -24,57 +35,297 @@ DATA_RESERVATION_FILE = os.getenv(
     "biblioteka_reservations.json",
 )
 DATA_USER_FILE = os.getenv("BIB_USER_DATA_FILE", "biblioteka_users.json")
+DATABASE_FILE = os.getenv("BIB_DATABASE", "")
+JOURNAL_MODE = os.getenv("BIB_JOURNAL", "") not in ("", "0")
+JOURNAL_SUFFIX = ".journal"
+SNAPSHOT_MODE = os.getenv("BIB_SNAPSHOT", "") not in ("", "0")
+SNAPSHOT_SUFFIX = ".bin"
+COLUMNAR_MODE = os.getenv("BIB_COLUMNAR", "") not in ("", "0")
+COLUMNAR_SUFFIX = ".col"
+SHARDS = int(os.getenv("BIB_SHARDS", "0") or 0)
+SHARDS_SUFFIX = ".shards"
+SEARCH_SUFFIX = ".search.json"
+# Kodek plików JSON tabel: BIB_CODEC ("json", "jsonl", "fast-json"),
+# domyślnie strumieniowy JsonCodec — "fast-json" wczytuje cały plik
+# naraz, więc jest tylko jawnym wyborem.
+CODEC = get_codec(os.getenv("BIB_CODEC") or "json")
+
+COMMAND_TABLES = {
+    "add-book": (Book,),
+    "list-books": (Book,),
+    "search-books": (Book,),
+    "register-member": (Member,),
+    "loan-book": (Member, Book, Loan),
+    "return-book": (Loan, Book, Member),
+    "renew-loan": (Loan,),
+    "cancel-loan": (Loan, Book),
+    "list-overdue": (Loan,),
+    "reserve-book": (Book, Reservation),
+    "cancel-reservation": (Reservation, Book),
+    "expire-reservations": (Reservation, Book),
+    "create-user": (User,),
+    "change-role": (User,),
+    "deactivate-user": (User,),
+    "activate-user": (User,),
+    "login-user": (User,),
+    "compact-journal": (Book, Member, Loan, Reservation, User),
+}
+
+# Komendy, które niczego nie zapisują (nie biorą udziału
+# w wykrywaniu konfliktów zapisu).
+READ_ONLY_COMMANDS = ("list-books", "search-books", "list-overdue")
+
+INDEXES = {
+    Book: ("author", "genre", "status"),
+    Loan: ("member_id", "isbn", "returned_on"),
+    Reservation: ("member_id", "isbn", "active"),
+    User: ("role",),
+}
+
+
+def tables():
+    """
+    Zwraca listę tabel CLI: (model, factory, ścieżka pliku JSON).
+    """
+    return [
+        (Book, CODEC.factory(Book), DATA_BOOK_FILE),
+        (Member, CODEC.factory(Member), DATA_MEMBER_FILE),
+        (Loan, CODEC.factory(Loan), DATA_LOAN_FILE),
+        (Reservation, CODEC.factory(Reservation), DATA_RESERVATION_FILE),
+        (User, CODEC.factory(User), DATA_USER_FILE),
+    ]
+
+
+def snapshot_path(path: str) -> str:
+    """
+    Zwraca ścieżkę snapshotu binarnego odpowiadającego plikowi JSON.
+    """
+    return os.path.splitext(path)[0] + SNAPSHOT_SUFFIX
+
+
+def columnar_path(path: str) -> str:
+    """
+    Zwraca ścieżkę pliku kolumnowego odpowiadającego plikowi JSON.
+    """
+    return os.path.splitext(path)[0] + COLUMNAR_SUFFIX
+
+
+def sharded_path(path: str) -> str:
+    """
+    Zwraca ścieżkę katalogu shardów odpowiadającego plikowi JSON.
+    """
+    return os.path.splitext(path)[0] + SHARDS_SUFFIX
+
+
+def source_stamp(path: str) -> list:
+    """
+    Opisuje stan plików tabeli (JSON, dziennik, snapshot .bin,
+    plik kolumnowy .col, manifest shardów)
+    jako listę [nazwa, rozmiar, czas modyfikacji] — każda zmiana
+    danych zmienia ten opis.
+    """
+    stamp = []
+    names = (
+        path, path + JOURNAL_SUFFIX, snapshot_path(path), columnar_path(path),
+        os.path.join(sharded_path(path), MANIFEST),
+    )
+    for name in names:
+        if os.path.isfile(name):
+            st = os.stat(name)
+            stamp.append([name, st.st_size, st.st_mtime_ns])
+    return stamp
+
+
+def search_path() -> str:
+    """
+    Zwraca ścieżkę indeksu pełnotekstowego zapisanego obok pliku książek.
+    """
+    return os.path.splitext(DATA_BOOK_FILE)[0] + SEARCH_SUFFIX
+
+
+def load_search(repo: Repository) -> bool:
+    """
+    Podłącza zapisany indeks pełnotekstowy książek, jeśli odpowiada
+    on bieżącym danym; zwraca True, gdy się to udało. Od tej chwili
+    add/update/delete aktualizują indeks, a zapis tabeli książek
+    (write_table()) zapisuje go ponownie.
+    """
+    repo.count(Book)
+    index = FullTextIndex.load(
+        search_path(), SEARCH_FIELDS, source_stamp(DATA_BOOK_FILE),
+    )
+    if index is None:
+        return False
+    repo.attach_search_index(Book, index)
+    return True
+
+
+def save_search(repo: Repository) -> None:
+    """
+    Zapisuje indeks pełnotekstowy książek (jeśli repozytorium go ma)
+    z opisem bieżącego stanu plików książek. Nieudany zapis oznacza
+    tylko przebudowę indeksu przy kolejnym wyszukiwaniu.
+    """
+    index = repo.search_index(Book)
+    if index is None:
+        return
+    try:
+        index.save(search_path(), source_stamp(DATA_BOOK_FILE))
+    except DataExportError:
+        pass
+
+
+def prepare_search(repo: Repository) -> None:
+    """
+    Przygotowuje indeks pełnotekstowy książek: wczytuje indeks
+    zapisany obok pliku książek, jeśli odpowiada on bieżącym danym,
+    a w przeciwnym razie buduje go i zapisuje na kolejne uruchomienia.
+    Z bazą SQLite (BIB_DATABASE) indeks budowany jest w pamięci.
+    """
+    if isinstance(repo, SQLiteRepository):
+        repo.create_search_index(Book, SEARCH_FIELDS)
+        return
+    if not load_search(repo):
+        repo.create_search_index(Book, SEARCH_FIELDS)
+        save_search(repo)
+
+
+def load_table(repo: Repository, model, factory, path: str) -> None:
+    """
+    Wczytuje tabelę z pliku JSON, a w trybie dziennika (BIB_JOURNAL)
+    dodatkowo odtwarza dziennik i podłącza go do repozytorium.
+    W trybie snapshotu (BIB_SNAPSHOT) leniwie mapuje plik .bin,
+    w trybie kolumnowym (BIB_COLUMNAR) importuje plik .col,
+    a w trybie shardów (BIB_SHARDS) podpina katalog shardów,
+    z którego shardy wczytywane są dopiero przy dostępie;
+    gdy pliku jeszcze nie ma, wczytuje dotychczasowy plik JSON.
+    Brakujący lub uszkodzony plik oznacza pustą tabelę.
+    Baza SQLite (BIB_DATABASE) nie wymaga wczytywania.
+    Wywoływana leniwie, przy pierwszym dostępie do tabeli.
+    """
+    if isinstance(repo, SQLiteRepository):
+        return
+    try:
+        if JOURNAL_MODE:
+            repo.load_journaled(
+                model, path, Journal(path + JOURNAL_SUFFIX), factory,
+            )
+        elif SNAPSHOT_MODE and os.path.isfile(snapshot_path(path)):
+            repo.load_snapshot(model, snapshot_path(path))
+        elif COLUMNAR_MODE and os.path.isfile(columnar_path(path)):
+            repo.import_columnar(model, columnar_path(path))
+        elif SHARDS and os.path.isfile(
+                os.path.join(sharded_path(path), MANIFEST)
+        ):
+            repo.load_sharded(model, sharded_path(path), factory)
+        else:
+            repo.import_from_json(model, path, factory)
+    except DataImportError:
+        pass
+
+
+def load_locked(
+        repo: Repository,
+        model,
+        factory,
+        path: str,
+        locks: TableLocks,
+        search: bool = False,
+) -> None:
+    """
+    Wczytuje tabelę (load_table()) pod współdzieloną blokadą pliku,
+    zapamiętując w locks wersję wczytanych danych.
+    Z search=True (książki w komendach zmieniających dane) podłącza
+    też zapisany indeks pełnotekstowy (load_search()), by komenda
+    aktualizowała go przyrostowo zamiast unieważniać.
+    """
+    with locks.reading(path):
+        load_table(repo, model, factory, path)
+        if search:
+            load_search(repo)
+
+
+def write_table(repo: Repository, model, path: str, changes=None) -> None:
+    """
+    Zapisuje tabelę (writer dla Repository.flush()):
+    - bez dziennika eksportuje całą tabelę do JSON albo, w trybie
+      BIB_SNAPSHOT, do snapshotu binarnego, w trybie BIB_COLUMNAR
+      do skompresowanego pliku kolumnowego, a w trybie BIB_SHARDS
+      przepisuje tylko shardy ze zmienionymi rekordami (changes),
+    - w trybie dziennika zmienione rekordy (changes) są już zapisane
+      w dzienniku; tabela jest kompaktowana do snapshotu dopiero,
+      gdy dziennik przekroczy JOURNAL_COMPACT_THRESHOLD wpisów.
+    Po zapisie książek zapisywany jest też ich indeks pełnotekstowy
+    (save_search()), aktualizowany przyrostowo w trakcie komendy.
+    """
+    journal = repo.journal_for(model)
+    if journal is None and SNAPSHOT_MODE:
+        repo.export_snapshot(model, snapshot_path(path))
+    elif journal is None and COLUMNAR_MODE:
+        repo.export_columnar(model, columnar_path(path))
+    elif journal is None and SHARDS:
+        repo.export_sharded(
+            model, sharded_path(path), SHARDS,
+            keys=None if changes is None else list(changes),
+        )
+    elif journal is None:
+        repo.export_to_json(model, path)
+    elif len(journal) >= JOURNAL_COMPACT_THRESHOLD:
+        repo.compact_journal(model, path)
+    if model is Book:
+        save_search(repo)
+
+
+def register_writers(repo: Repository, models) -> None:
+    """
+    Rejestruje write_table() jako zapis tabel models,
+    z których korzysta komenda. W trybie dziennika i shardów zapis
+    jest przyrostowy (delta): flush() przekazuje tylko zmienione
+    rekordy.
+    """
+    for model, _, path in tables():
+        if model in models:
+            repo.register_writer(
+                model,
+                lambda changes, m=model, p=path: write_table(
+                    repo, m, p, changes,
+                ),
+                delta=JOURNAL_MODE or bool(SHARDS),
+            )
 
 
-def book_factory(rec: dict) -> Book:
-    rec = rec.copy()
-    status_val = rec.pop("status", None)
-    book = Book(**rec)
-    if status_val:
-        key = status_val.split('.')[-1]
-        book.status = BookStatus[key]
-    return book
-
-
-def member_factory(rec: dict) -> Member:
-    rec = rec.copy()
-    rec["registered_on"] = date.fromisoformat(rec["registered_on"])
-    rec["membership_expiry"] = date.fromisoformat(rec["membership_expiry"])
-    current = rec.pop("current_loans", [])
-    member = Member(**rec)
-    member.current_loans = current
-    return member
-
-
-def loan_factory(rec: dict) -> Loan:
-    rec = rec.copy()
-    rec["loan_date"] = date.fromisoformat(rec["loan_date"])
-    rec["due_date"] = date.fromisoformat(rec["due_date"])
-    if rec.get("returned_on"):
-        rec["returned_on"] = date.fromisoformat(rec["returned_on"])
-    return Loan(**rec)
-
-
-def reservation_factory(rec: dict) -> Reservation:
-    rec = rec.copy()
-    rec["reserved_on"] = date.fromisoformat(rec["reserved_on"])
-    rec.pop("expiration_date", None)
-    rec.pop("active", None)
-    rec.pop("cancelled_on", None)
-    rec.pop("expired_on", None)
-    return Reservation(**rec)
-
-
-def user_factory(rec: dict) -> User:
-    rec = rec.copy()
-    raw_role = rec.get("role")
-    if isinstance(raw_role, str):
-        key = raw_role.split('.')[-1]
-        rec["role"] = Role[key]
-    rec["joined_on"] = datetime.fromisoformat(rec["joined_on"])
-    if rec.get("last_login"):
-        rec["last_login"] = datetime.fromisoformat(rec["last_login"])
-    return User(**rec)
+def save(repo: Repository, locks: Optional[TableLocks] = None) -> bool:
+    """
+    Utrwala zmiany komendy: Repository.flush() zapisuje tylko
+    tabele zmienione od wczytania (np. nieudana rezerwacja
+    niczego nie zapisuje), a w trybie dziennika tylko zmienione
+    rekordy. Z bazą SQLite (BIB_DATABASE) zmiany są już w bazie.
+    Z blokadami locks zapis odbywa się pod blokadami wczytanych
+    tabel i tylko wtedy, gdy żaden inny proces nie zmienił ich
+    od wczytania; w razie konfliktu nic nie jest zapisywane
+    (ścieżki trafiają do locks.conflicts), a funkcja zwraca False.
+    """
+    if locks is None:
+        repo.flush()
+        return True
+    written = [path for model, _, path in tables() if repo.is_dirty(model)]
+    if not written:
+        return True
+    with locks.committing(written) as stale:
+        if not stale:
+            repo.flush()
+    return not stale
+
+
+def compact(repo: Repository) -> None:
+    """
+    Składa dzienniki wszystkich tabel do snapshotów JSON.
+    """
+    for model, _, path in tables():
+        repo.count(model)
+        if repo.journal_for(model) is not None:
+            repo.compact_journal(model, path)
+    repo.mark_clean()
 
 
 def main():
@@ -95,7 +346,22 @@ def main():
     p_add.add_argument("--location")
 
 
-    subparsers.add_parser("list-books", help="Wyświetl wszystkie książki")
+    p_list = subparsers.add_parser(
+        "list-books",
+        help="Wyświetl książki (wszystkie lub jedną stronę)",
+    )
+    p_list.add_argument("--limit", type=int)
+    p_list.add_argument(
+        "--page", type=int, default=1, help="Numer strony (wymaga --limit)",
+    )
+
+
+    p_search = subparsers.add_parser(
+        "search-books",
+        help="Wyszukaj książki po tytule, autorze i opisie",
+    )
+    p_search.add_argument("query")
+    p_search.add_argument("--limit", type=int, default=10)
 
 
     p_reg = subparsers.add_parser(
@@ -132,6 +398,14 @@ def main():
     p_cancel_loan.add_argument("--loan-id", required=True)
 
 
+    p_overdue = subparsers.add_parser(
+        "list-overdue",
+        help="Wyświetl przeterminowane (lub wkrótce wymagalne) wypożyczenia",
+    )
+    p_overdue.add_argument("--as-of", type=date.fromisoformat)
+    p_overdue.add_argument("--within", type=int)
+
+
     p_res = subparsers.add_parser("reserve-book", help="Zarezerwuj książkę")
     p_res.add_argument("--member-id", required=True)
     p_res.add_argument("--isbn", required=True)
@@ -181,26 +455,80 @@ def main():
     p_login = subparsers.add_parser("login-user", help="Zaloguj użytkownika")
     p_login.add_argument("--user-id", required=True)
 
-    args = parser.parse_args()
 
+    subparsers.add_parser(
+        "compact-journal",
+        help="Złóż dzienniki zmian do snapshotów JSON",
+    )
+
+    args = parser.parse_args()
 
-    repo = Repository()
-    for model, factory, path in [
-        (Book, book_factory, DATA_BOOK_FILE),
-        (Member, member_factory, DATA_MEMBER_FILE),
-        (Loan, loan_factory, DATA_LOAN_FILE),
-        (Reservation, reservation_factory, DATA_RESERVATION_FILE),
-        (User, user_factory, DATA_USER_FILE),
-    ]:
+    if DATABASE_FILE:
+        run(parser, args, None)
+    elif args.command in READ_ONLY_COMMANDS:
+        run(parser, args, TableLocks())
+    elif JOURNAL_MODE:
+        # Dziennik zapisywany jest w trakcie komendy, więc komenda
+        # od początku trzyma blokady swoich tabel.
+        run_locked(parser, args)
+    else:
+        # Próba optymistyczna: wynik wypisywany jest dopiero, gdy
+        # zapis nie wykrył konfliktu — inaczej komenda jest powtarzana
+        # na świeżo wczytanych danych, tym razem pod blokadami.
+        # Wyjątek komendy nie gubi tego, co już wypisała.
+        locks = TableLocks()
+        output = io.StringIO()
+        retry = False
         try:
-            repo.import_from_json(model, path, factory)
-        except DataImportError:
-            pass
+            with redirect_stdout(output):
+                run(parser, args, locks)
+            retry = bool(locks.conflicts)
+        finally:
+            if not retry:
+                sys.stdout.write(output.getvalue())
+        if retry:
+            run_locked(parser, args)
+
+
+def run_locked(parser, args) -> None:
+    """
+    Wykonuje komendę, trzymając przez cały czas wyłączne blokady
+    plików jej tabel (konflikt zapisu nie jest wtedy możliwy).
+    """
+    locks = TableLocks()
+    needed = COMMAND_TABLES.get(args.command, ())
+    paths = [path for model, _, path in tables() if model in needed]
+    with locks.holding(paths):
+        run(parser, args, locks)
+
+
+def run(parser, args, locks: Optional[TableLocks]) -> None:
+    """
+    Wykonuje komendę args na repozytorium wczytywanym leniwie
+    z plików (pod blokadami locks) albo na bazie SQLite
+    (locks=None — blokadami zarządza SQLite).
+    """
+    if DATABASE_FILE:
+        repo = SQLiteRepository(DATABASE_FILE, indexes=INDEXES)
+    else:
+        repo = Repository(indexes=INDEXES, codec=CODEC)
+        needed = COMMAND_TABLES.get(args.command, ())
+        for model, factory, path in tables():
+            if model in needed:
+                repo.register_loader(
+                    model,
+                    lambda m=model, f=factory, p=path: load_locked(
+                        repo, m, f, p, locks, search=m is Book
+                        and args.command not in READ_ONLY_COMMANDS,
+                    ),
+                )
+        register_writers(repo, needed)
 
 
     catalog = CatalogService(repo)
     member_svc = MemberService(repo)
     loan_svc = LoanService(repo)
+    loan_svc.enable_due_index()
     res_svc = ReservationService(repo)
     user_svc = UserService(repo)
 
@@ -218,13 +546,23 @@ def main():
             )
             try:
                 catalog.add_book(book)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Added book {book.isbn}")
             except ValueError as e:
                 print(f"Error: {e}")
 
         case "list-books":
-            for b in catalog.list_books():
+            try:
+                books = catalog.iter_books(limit=args.limit, page=args.page)
+            except ValueError as e:
+                print(f"Error: {e}")
+            else:
+                for b in books:
+                    print(f"{b.isbn}: {b.title} — {b.author}")
+
+        case "search-books":
+            prepare_search(repo)
+            for b in catalog.search(args.query, limit=args.limit):
                 print(f"{b.isbn}: {b.title} — {b.author}")
 
         case "register-member":
@@ -237,7 +575,7 @@ def main():
             )
             try:
                 member_svc.register_member(member)
-                repo.export_to_json(Member, DATA_MEMBER_FILE)
+                save(repo, locks)
                 print(f"Registered member {member.member_id}")
             except ValueError as e:
                 print(f"Error: {e}")
@@ -245,9 +583,7 @@ def main():
         case "loan-book":
             try:
                 loan = loan_svc.loan_book(args.member_id, args.isbn)
-                repo.export_to_json(Loan, DATA_LOAN_FILE)
-                repo.export_to_json(Member, DATA_MEMBER_FILE)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Loan created: {loan.loan_id}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -255,9 +591,7 @@ def main():
         case "return-book":
             try:
                 loan_svc.return_book(args.loan_id)
-                repo.export_to_json(Loan, DATA_LOAN_FILE)
-                repo.export_to_json(Member, DATA_MEMBER_FILE)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Returned loan {args.loan_id}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -268,7 +602,7 @@ def main():
                     args.loan_id,
                     extra_days=args.extra_days,
                 )
-                repo.export_to_json(Loan, DATA_LOAN_FILE)
+                save(repo, locks)
                 print(
                     f"Renewed loan {renewed.loan_id}, "
                     f"new due date {renewed.due_date}"
@@ -279,35 +613,34 @@ def main():
         case "cancel-loan":
             try:
                 loan_svc.cancel_loan(args.loan_id)
-                repo.export_to_json(Loan, DATA_LOAN_FILE)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Cancelled loan {args.loan_id}")
             except Exception as e:
                 print(f"Error: {e}")
 
+        case "list-overdue":
+            if args.within is None:
+                loans = loan_svc.list_overdue_loans(as_of=args.as_of)
+            else:
+                loans = loan_svc.list_due_within(args.within, as_of=args.as_of)
+            for loan in loans:
+                print(
+                    f"{loan.loan_id}: {loan.isbn} — {loan.member_id}, "
+                    f"due {loan.due_date}"
+                )
+
         case "reserve-book":
             try:
                 res = res_svc.reserve_book(args.member_id, args.isbn)
-                repo.export_to_json(Reservation, DATA_RESERVATION_FILE)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Reserved book: {res.reservation_id}")
             except Exception as e:
                 print(f"Error: {e}")
 
         case "cancel-reservation":
             try:
-                try:
-                    repo.import_from_json(
-                        Reservation,
-                        DATA_RESERVATION_FILE,
-                        reservation_factory,
-                    )
-                except DataImportError:
-                    pass
-
                 res_svc.cancel_reservation(args.reservation_id)
-                repo.export_to_json(Reservation, DATA_RESERVATION_FILE)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Canceled reservation {args.reservation_id}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -315,8 +648,7 @@ def main():
         case "expire-reservations":
             try:
                 expired = res_svc.expire_reservations()
-                repo.export_to_json(Reservation, DATA_RESERVATION_FILE)
-                repo.export_to_json(Book, DATA_BOOK_FILE)
+                save(repo, locks)
                 print(f"Expired {len(expired)} reservations")
             except Exception as e:
                 print(f"Error: {e}")
@@ -324,7 +656,7 @@ def main():
         case "create-user":
             try:
                 user = user_svc.create_user(args.name, Role[args.role])
-                repo.export_to_json(User, DATA_USER_FILE)
+                save(repo, locks)
                 print(f"Created user: {user.user_id}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -336,7 +668,7 @@ def main():
                     args.target_id,
                     Role[args.role],
                 )
-                repo.export_to_json(User, DATA_USER_FILE)
+                save(repo, locks)
                 print(f"Changed role for {user.user_id} to {user.role.name}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -344,7 +676,7 @@ def main():
         case "deactivate-user":
             try:
                 user = user_svc.deactivate_user(args.admin_id, args.target_id)
-                repo.export_to_json(User, DATA_USER_FILE)
+                save(repo, locks)
                 print(f"Deactivated user: {user.user_id}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -352,7 +684,7 @@ def main():
         case "activate-user":
             try:
                 user = user_svc.activate_user(args.admin_id, args.target_id)
-                repo.export_to_json(User, DATA_USER_FILE)
+                save(repo, locks)
                 print(f"Activated user: {user.user_id}")
             except Exception as e:
                 print(f"Error: {e}")
@@ -360,11 +692,18 @@ def main():
         case "login-user":
             try:
                 user = user_svc.login_user(args.user_id)
-                repo.export_to_json(User, DATA_USER_FILE)
+                save(repo, locks)
                 print(f"User {user.user_id} logged in at {user.last_login}")
             except Exception as e:
                 print(f"Error: {e}")
 
+        case "compact-journal":
+            if not JOURNAL_MODE:
+                print("Error: journal mode is disabled (set BIB_JOURNAL=1)")
+            else:
+                compact(repo)
+                print("Compacted journals")
+
         case _:
             parser.print_help()
 
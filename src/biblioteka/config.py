@@ -3,3 +3,4 @@ MAX_RENEWALS = 2
 DEFAULT_RESERVATION_DURATION_DAYS = 7
 DEFAULT_MEMBERSHIP_DURATION_DAYS = 365
 DEFAULT_MAX_BOOKS_PER_MEMBER = 5
+JOURNAL_COMPACT_THRESHOLD = 1000
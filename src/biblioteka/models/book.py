@@ -11,6 +11,8 @@ class BookStatus(Enum):
 
 @dataclass
 class Book:
+    __primary_key__ = "isbn"
+
     isbn: str
     title: str
     author: str
@@ -8,6 +8,8 @@ from biblioteka.utils.exceptions import MaxRenewalsExceeded
 
 @dataclass
 class Loan:
+    __primary_key__ = "loan_id"
+
     loan_id: str
     member_id: str
     isbn: str
@@ -11,6 +11,8 @@ PHONE_REGEX = re.compile(r"^\+?[0-9]{7,15}$")
 
 @dataclass
 class Member:
+    __primary_key__ = "member_id"
+
     member_id: str
     name: str
     registered_on: date
@@ -7,6 +7,8 @@ from biblioteka.utils.exceptions import ReservationExpired
 
 @dataclass
 class Reservation:
+    __primary_key__ = "reservation_id"
+
     reservation_id: str
     member_id: str
     isbn: str
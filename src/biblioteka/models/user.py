@@ -14,6 +14,8 @@ class Role(Enum):
 
 @dataclass
 class User:
+    __primary_key__ = "user_id"
+
     user_id: str
     name: str
     role: Role
@@ -3,6 +3,14 @@ from .member_service import MemberService
 from .loan_service import LoanService
 from .reservation_service import ReservationService
 from .user_service import UserService
+from .analytics_service import AnalyticsService
+from .async_services import (
+    AsyncCatalogService,
+    AsyncLoanService,
+    AsyncMemberService,
+    AsyncReservationService,
+    AsyncUserService,
+)
 
 __all__ = [
     "CatalogService",
@@ -10,4 +18,10 @@ __all__ = [
     "LoanService",
     "ReservationService",
     "UserService",
+    "AnalyticsService",
+    "AsyncCatalogService",
+    "AsyncLoanService",
+    "AsyncMemberService",
+    "AsyncReservationService",
+    "AsyncUserService",
 ]
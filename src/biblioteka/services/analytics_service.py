@@ -0,0 +1,115 @@
+from datetime import date
+from typing import Dict, Optional
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.storage.arrays import ArrayTable, NO_DATE, group_counts, np
+from biblioteka.storage.repository import Repository
+
+# Ordinal 1970-01-01 — początek skali numpy.datetime64.
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class AnalyticsService:
+    """
+    Serwis statystyk katalogu i wypożyczeń:
+    liczy agregaty wektorowo (NumPy) na kolumnowych widokach
+    ArrayTable tabel Book i Loan, zamiast iterować obiekty.
+    Widoki odświeżają się przyrostowo przy każdym zapytaniu,
+    więc po zmianie kilku rekordów przeliczane są tylko one.
+    Wymaga numpy (pip install biblioteka[analytics]); bez niego
+    konstruktor podnosi ImportError.
+    """
+
+    def __init__(self, repo: Repository):
+        """
+        Inicjalizuje serwis z repozytorium, w którym przechowywane
+        są obiekty Book i Loan.
+        """
+        self.repo = repo
+        self.books = ArrayTable(
+            repo, Book, ("author", "genre", "publication_year", "status"),
+        )
+        self.loans = ArrayTable(
+            repo, Loan, ("isbn", "loan_date", "due_date", "returned_on"),
+        )
+
+    def close(self) -> None:
+        """
+        Zamyka widoki (przestają obserwować repozytorium).
+        """
+        self.books.close()
+        self.loans.close()
+
+    def books_per_genre(self) -> Dict[Optional[str], int]:
+        """
+        Zwraca liczbę książek w każdym gatunku (None — bez gatunku).
+        """
+        return self.books.counts("genre")
+
+    def books_per_author(self) -> Dict[Optional[str], int]:
+        """
+        Zwraca liczbę książek każdego autora.
+        """
+        return self.books.counts("author")
+
+    def books_per_status(self) -> Dict[BookStatus, int]:
+        """
+        Zwraca liczbę książek w każdym statusie.
+        """
+        return self.books.counts("status")
+
+    def books_per_decade(self) -> Dict[int, int]:
+        """
+        Zwraca histogram lat wydania w dekadach, np. {1990: 12, ...};
+        książki bez roku wydania są pomijane.
+        """
+        years = self.books.column("publication_year")
+        years = years[~np.isnan(years)]
+        decades, totals = np.unique(
+            (years // 10 * 10).astype("int64"), return_counts=True,
+        )
+        return dict(zip(decades.tolist(), totals.tolist()))
+
+    def loans_per_genre(self) -> Dict[Optional[str], int]:
+        """
+        Zwraca liczbę wypożyczeń (wszystkich, także zwróconych)
+        książek każdego gatunku. Wypożyczenia książek bez gatunku
+        lub usuniętych z katalogu liczone są pod kluczem None.
+        """
+        isbn_codes, isbns = self.loans.categorical("isbn")
+        # Gatunek każdej książki ze słownika ISBN wypożyczeń (raz
+        # na ISBN), a potem gatunek każdego wypożyczenia jednym
+        # indeksowaniem tablicy.
+        genre_of_isbn = self.books.values_for("genre", isbns)
+        _, genres = self.books.categorical("genre")
+        return group_counts(genre_of_isbn[isbn_codes], genres)
+
+    def loans_per_month(self) -> Dict[str, int]:
+        """
+        Zwraca histogram wypożyczeń wg miesiąca wypożyczenia,
+        np. {"2024-01": 40, "2024-02": 35}.
+        """
+        ordinals = self.loans.column("loan_date")
+        ordinals = ordinals[ordinals != NO_DATE].astype("int64")
+        months = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+        labels, totals = np.unique(
+            months.astype("datetime64[M]"), return_counts=True,
+        )
+        return dict(zip(
+            (str(label) for label in labels), totals.tolist(),
+        ))
+
+    def overdue_ratio(self, as_of: Optional[date] = None) -> float:
+        """
+        Zwraca udział przeterminowanych (na dzień as_of, domyślnie
+        dziś) wśród aktywnych wypożyczeń; 0.0, gdy nie ma aktywnych.
+        """
+        as_of = as_of or date.today()
+        returned, due = self.loans.columns("returned_on", "due_date")
+        active = returned == NO_DATE
+        total = int(np.count_nonzero(active))
+        if not total:
+            return 0.0
+        overdue = int(np.count_nonzero(active & (due < as_of.toordinal())))
+        return overdue / total
@@ -0,0 +1,71 @@
+from typing import Any, Callable, Dict, Type
+
+from biblioteka.storage.async_repository import AsyncRepository
+from biblioteka.services.catalog_service import CatalogService
+from biblioteka.services.loan_service import LoanService
+from biblioteka.services.member_service import MemberService
+from biblioteka.services.reservation_service import ReservationService
+from biblioteka.services.user_service import UserService
+
+
+class AsyncService:
+    """
+    Asynchroniczny odpowiednik serwisu synchronicznego SERVICE:
+    każda publiczna metoda serwisu jest dostępna jako korutyna
+    (await service.loan_book(...)) o tej samej sygnaturze.
+    Całe wywołanie metody (wraz z jej transakcją) wykonywane jest
+    przez AsyncRepository.run(): w pętli zdarzeń albo w executorze,
+    gdy repozytorium korzysta z plików — logika biznesowa pozostaje
+    w jednym miejscu, w serwisie synchronicznym.
+    """
+
+    SERVICE: Type = object
+
+    def __init__(self, repo: AsyncRepository):
+        self.repo = repo
+        self.sync = self.SERVICE(repo.repo)
+        self._methods: Dict[str, Callable[..., Any]] = {}
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = self._methods.get(name)
+        if method is None:
+            target = getattr(self.sync, name)
+            if not callable(target):
+                raise AttributeError(
+                    f"{type(self).__name__}.{name} is not a method"
+                )
+
+            async def method(*args, **kwargs):
+                return await self.repo.run(target, *args, **kwargs)
+
+            method.__name__ = name
+            method.__doc__ = target.__doc__
+            self._methods[name] = method
+        return method
+
+
+class AsyncCatalogService(AsyncService):
+    """Asynchroniczny CatalogService."""
+    SERVICE = CatalogService
+
+
+class AsyncMemberService(AsyncService):
+    """Asynchroniczny MemberService."""
+    SERVICE = MemberService
+
+
+class AsyncLoanService(AsyncService):
+    """Asynchroniczny LoanService."""
+    SERVICE = LoanService
+
+
+class AsyncReservationService(AsyncService):
+    """Asynchroniczny ReservationService."""
+    SERVICE = ReservationService
+
+
+class AsyncUserService(AsyncService):
+    """Asynchroniczny UserService."""
+    SERVICE = UserService
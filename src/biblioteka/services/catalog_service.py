@@ -1,8 +1,12 @@
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
+from biblioteka.storage.bulk import BulkResult
 from biblioteka.storage.repository import Repository
 from biblioteka.models.book import Book, BookStatus
 from biblioteka.utils.exceptions import PermissionDenied, BookNotAvailable
 
+# Pola książki objęte wyszukiwaniem pełnotekstowym.
+SEARCH_FIELDS = ("title", "author", "description")
+
 
 class CatalogService:
     """
@@ -26,9 +30,28 @@ class CatalogService:
         """
         if user_role and user_role not in ("LIBRARIAN", "ADMIN"):
             raise PermissionDenied("Only librarian or admin can add books")
-        if self.repo.get(Book, book.isbn):
-            raise ValueError(f"Book with ISBN {book.isbn} already exists")
-        self.repo.add(book)
+        with self.repo.transaction():
+            if self.repo.get(Book, book.isbn):
+                raise ValueError(
+                    f"Book with ISBN {book.isbn} already exists"
+                )
+            self.repo.add(book)
+
+    def add_books(
+            self,
+            books: Iterable[Book],
+            user_role: Optional[str] = None,
+    ) -> BulkResult:
+        """
+        Dodaje wiele książek naraz (np. import katalogu)
+        przez repo.add_many().
+        - Uprawnienia sprawdzane są jak w add_book.
+        - Książki z ISBN już istniejącym lub powtórzonym w partii
+        są pomijane i zgłaszane w BulkResult.errors.
+        """
+        if user_role and user_role not in ("LIBRARIAN", "ADMIN"):
+            raise PermissionDenied("Only librarian or admin can add books")
+        return self.repo.add_many(books)
 
     def remove_book(self, isbn: str, user_role: Optional[str] = None) -> None:
         """
@@ -40,14 +63,16 @@ class CatalogService:
         """
         if user_role and user_role not in ("LIBRARIAN", "ADMIN"):
             raise PermissionDenied("Only librarian or admin can remove books")
-        book = self.repo.get(Book, isbn)
-        if not book:
-            raise KeyError(f"Book {isbn} not found")
-        if book.status != BookStatus.AVAILABLE:
-            raise BookNotAvailable(
-                f"Cannot remove book {isbn} while status is {book.status.name}"
-            )
-        self.repo.delete(Book, isbn)
+        with self.repo.transaction():
+            book = self.repo.get(Book, isbn)
+            if not book:
+                raise KeyError(f"Book {isbn} not found")
+            if book.status != BookStatus.AVAILABLE:
+                raise BookNotAvailable(
+                    f"Cannot remove book {isbn} "
+                    f"while status is {book.status.name}"
+                )
+            self.repo.delete(Book, isbn)
 
     def update_book_info(
         self,
@@ -90,15 +115,37 @@ class CatalogService:
 
     def list_books(self) -> List[Book]:
         """
-        Alias dla list_all, używany przez CLI.
+        Alias dla list_all.
         """
         return self.list_all()
 
+    def iter_books(
+        self,
+        limit: Optional[int] = None,
+        page: int = 1,
+        order_by: Optional[str] = None,
+    ) -> Iterator[Book]:
+        """
+        Zwraca leniwy iterator po książkach, używany przez CLI:
+        bez limit — po całym katalogu, z limit — po stronie page
+        (numerowanej od 1) o rozmiarze limit.
+        Podnosi ValueError, gdy limit lub page są mniejsze niż 1
+        albo gdy podano page > 1 bez limit.
+        """
+        if page < 1 or (limit is not None and limit < 1):
+            raise ValueError("limit and page must be at least 1")
+        if limit is None and page > 1:
+            raise ValueError("page requires limit")
+        offset = (page - 1) * limit if limit is not None else 0
+        return self.repo.iterate(
+            Book, order_by=order_by, offset=offset, limit=limit,
+        )
+
     def list_available(self) -> List[Book]:
         """
         Zwraca tylko książki dostępne do wypożyczenia (status AVAILABLE).
         """
-        return [b for b in self.repo.list(Book) if b.is_available()]
+        return self.repo.list(Book, status=BookStatus.AVAILABLE)
 
     def list_by_author(self, author: str) -> List[Book]:
         """
@@ -116,6 +163,23 @@ class CatalogService:
         """
         Wyszukuje książki, których tytuł zawiera
         podany fragment (bez rozróżnienia wielkości liter).
+        Korzysta z indeksu trigramowego repozytorium, jeśli istnieje.
+        """
+        return self.repo.find_by_pattern(Book, "title", fragment)
+
+    def enable_search(self) -> None:
+        """
+        Buduje indeks pełnotekstowy książek (SEARCH_FIELDS),
+        jeśli repozytorium jeszcze go nie ma.
+        """
+        if self.repo.search_index(Book) is None:
+            self.repo.create_search_index(Book, SEARCH_FIELDS)
+
+    def search(self, query: str, limit: int = 10) -> List[Book]:
+        """
+        Wyszukiwanie pełnotekstowe po tytule, autorze i opisie:
+        zwraca do limit książek uszeregowanych wg trafności (BM25).
+        Wielkość liter i polskie znaki nie mają znaczenia.
         """
-        all_books = self.repo.list(Book)
-        return [b for b in all_books if fragment.lower() in b.title.lower()]
+        self.enable_search()
+        return self.repo.search(Book, query, limit)
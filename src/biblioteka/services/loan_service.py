@@ -1,7 +1,8 @@
 import uuid
 from datetime import date, timedelta
-from typing import List
+from typing import List, Optional
 
+from biblioteka.storage.query import between, lt
 from biblioteka.storage.repository import Repository
 from biblioteka.models.loan import Loan
 from biblioteka.models.book import Book, BookStatus
@@ -38,40 +39,44 @@ class LoanService:
           - MemberNotFound, jeśli nie znaleziono member_id.
           - BookNotAvailable, jeśli książka nie istnieje lub nie jest dostępna.
         """
-        member = self.repo.get(Member, member_id)
-        if not member:
-            raise MemberNotFound(f"Member {member_id} not found")
-
-        book = self.repo.get(Book, isbn)
-        if not book:
-            raise BookNotAvailable(f"Book {isbn} not found in catalog")
-
-        if isinstance(book.status, str):
-            try:
-                key = book.status.split('.')[-1]
-                book.status = BookStatus[key]
-            except Exception:
-                book.status = BookStatus.UNAVAILABLE
-
-        if book.status is not BookStatus.AVAILABLE:
-            raise BookNotAvailable(f"Book {isbn} is not available")
-
-        book.mark_loaned()
-        self.repo.update(book)
-
-        loan = Loan(
-            loan_id=str(uuid.uuid4()),
-            member_id=member_id,
-            isbn=isbn,
-            loan_date=date.today(),
-            due_date=date.today() + timedelta(days=DEFAULT_LOAN_DURATION_DAYS)
-        )
-        self.repo.add(loan)
-
-        member.add_loan(loan.loan_id)
-        self.repo.update(member)
-
-        return loan
+        with self.repo.transaction():
+            member = self.repo.get(Member, member_id)
+            if not member:
+                raise MemberNotFound(f"Member {member_id} not found")
+
+            book = self.repo.get(Book, isbn)
+            if not book:
+                raise BookNotAvailable(f"Book {isbn} not found in catalog")
+
+            if isinstance(book.status, str):
+                try:
+                    key = book.status.split('.')[-1]
+                    book.status = BookStatus[key]
+                except Exception:
+                    book.status = BookStatus.UNAVAILABLE
+
+            if book.status is not BookStatus.AVAILABLE:
+                raise BookNotAvailable(f"Book {isbn} is not available")
+
+            book.mark_loaned()
+            self.repo.update(book)
+
+            loan = Loan(
+                loan_id=str(uuid.uuid4()),
+                member_id=member_id,
+                isbn=isbn,
+                loan_date=date.today(),
+                due_date=(
+                    date.today()
+                    + timedelta(days=DEFAULT_LOAN_DURATION_DAYS)
+                ),
+            )
+            self.repo.add(loan)
+
+            member.add_loan(loan.loan_id)
+            self.repo.update(member)
+
+            return loan
 
     def return_book(self, loan_id: str) -> None:
         """
@@ -81,20 +86,21 @@ class LoanService:
         - Usuwa loan_id z listy członka.
         Podnosi KeyError, jeśli wypożyczenie nie istnieje.
         """
-        loan = self.repo.get(Loan, loan_id)
-        if not loan:
-            raise KeyError(f"Loan {loan_id} not found")
+        with self.repo.transaction():
+            loan = self.repo.get(Loan, loan_id)
+            if not loan:
+                raise KeyError(f"Loan {loan_id} not found")
 
-        loan.mark_returned(date.today())
-        self.repo.update(loan)
+            loan.mark_returned(date.today())
+            self.repo.update(loan)
 
-        book = self.repo.get(Book, loan.isbn)
-        book.mark_returned()
-        self.repo.update(book)
+            book = self.repo.get(Book, loan.isbn)
+            book.mark_returned()
+            self.repo.update(book)
 
-        member = self.repo.get(Member, loan.member_id)
-        member.remove_loan(loan_id)
-        self.repo.update(member)
+            member = self.repo.get(Member, loan.member_id)
+            member.remove_loan(loan_id)
+            self.repo.update(member)
 
     def renew_loan(
             self,
@@ -105,13 +111,14 @@ class LoanService:
         Przedłuża termin zwrotu o extra_days.
         Podnosi KeyError, jeśli wypożyczenie nie istnieje.
         """
-        loan = self.repo.get(Loan, loan_id)
-        if not loan:
-            raise KeyError(f"Loan {loan_id} not found")
+        with self.repo.transaction():
+            loan = self.repo.get(Loan, loan_id)
+            if not loan:
+                raise KeyError(f"Loan {loan_id} not found")
 
-        loan.renew(extra_days=extra_days)
-        self.repo.update(loan)
-        return loan
+            loan.renew(extra_days=extra_days)
+            self.repo.update(loan)
+            return loan
 
     def cancel_loan(self, loan_id: str) -> None:
         """
@@ -120,35 +127,60 @@ class LoanService:
         - Usuwa wpis Loan z repo.
         Podnosi KeyError, jeśli wypożyczenie nie istnieje.
         """
-        loan = self.repo.get(Loan, loan_id)
-        if not loan:
-            raise KeyError(f"Loan {loan_id} not found")
+        with self.repo.transaction():
+            loan = self.repo.get(Loan, loan_id)
+            if not loan:
+                raise KeyError(f"Loan {loan_id} not found")
 
-        book = self.repo.get(Book, loan.isbn)
-        book.mark_returned()
-        self.repo.update(book)
+            book = self.repo.get(Book, loan.isbn)
+            book.mark_returned()
+            self.repo.update(book)
 
-        self.repo.delete(Loan, loan_id)
+            self.repo.delete(Loan, loan_id)
 
     def list_active_loans(self) -> List[Loan]:
         """
         Zwraca listę aktywnych wypożyczeń.
         """
-        return [
-            loan
-            for loan in self.repo.list(Loan)
-            if loan.returned_on is None
-        ]
+        return self.repo.list(Loan, returned_on=None)
+
+    def enable_due_index(self) -> None:
+        """
+        Deklaruje w repozytorium indeks posortowany po due_date
+        obejmujący tylko aktywne wypożyczenia (returned_on=None),
+        z którego korzystają list_overdue_loans i list_due_within.
+        """
+        self.repo.create_sorted_index(
+            Loan, "due_date", where={"returned_on": None},
+        )
 
-    def list_overdue_loans(self) -> List[Loan]:
+    def list_overdue_loans(self, as_of: Optional[date] = None) -> List[Loan]:
         """
-        Zwraca listę przeterminowanych wypożyczeń.
+        Zwraca listę wypożyczeń przeterminowanych na dzień as_of
+        (domyślnie dziś), w kolejności terminu zwrotu.
+        Z indeksem z enable_due_index() to wyszukiwanie binarne
+        i wycinek listy aktywnych wypożyczeń, a nie skan całej historii.
         """
-        return [
-            loan
-            for loan in self.list_active_loans()
-            if loan.is_overdue
-        ]
+        as_of = as_of or date.today()
+        loans = self.repo.list(Loan, returned_on=None, due_date=lt(as_of))
+        return sorted(loans, key=lambda loan: loan.due_date)
+
+    def list_due_within(
+            self,
+            days: int,
+            as_of: Optional[date] = None,
+    ) -> List[Loan]:
+        """
+        Zwraca aktywne wypożyczenia z terminem zwrotu między as_of
+        (domyślnie dziś) a as_of + days włącznie, wg terminu.
+        """
+        as_of = as_of or date.today()
+        loans = self.repo.list(
+            Loan,
+            returned_on=None,
+            due_date=between(as_of, as_of + timedelta(days=days)),
+        )
+        return sorted(loans, key=lambda loan: loan.due_date)
 
     def count_loans(self) -> int:
         """
@@ -24,9 +24,12 @@ class MemberService:
         Rejestruje nowego członka.
         Podnosi ValueError, jeśli member_id jest już w użyciu.
         """
-        if self.repo.get(Member, member.member_id):
-            raise ValueError(f"Member {member.member_id} already registered")
-        self.repo.add(member)
+        with self.repo.transaction():
+            if self.repo.get(Member, member.member_id):
+                raise ValueError(
+                    f"Member {member.member_id} already registered"
+                )
+            self.repo.add(member)
 
     def deregister_member(self, member_id: str) -> None:
         """
@@ -34,12 +37,13 @@ class MemberService:
         - Podnosi MemberNotFound, jeśli nie ma takiego member_id.
         - Podnosi ValueError, jeśli członek ma nadal aktywne wypożyczenia.
         """
-        member = self.repo.get(Member, member_id)
-        if not member:
-            raise MemberNotFound(f"Member {member_id} not found")
-        if member.current_loans:
-            raise ValueError("Cannot deregister member with active loans")
-        self.repo.delete(Member, member_id)
+        with self.repo.transaction():
+            member = self.repo.get(Member, member_id)
+            if not member:
+                raise MemberNotFound(f"Member {member_id} not found")
+            if member.current_loans:
+                raise ValueError("Cannot deregister member with active loans")
+            self.repo.delete(Member, member_id)
 
     def renew_membership(
             self,
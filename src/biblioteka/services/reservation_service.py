@@ -32,21 +32,22 @@ class ReservationService:
         Zwraca utworzoną rezerwację.
         Podnosi BookNotAvailable, jeśli książka nie istnieje.
         """
-        book = self.repo.get(Book, isbn)
-        if not book:
-            raise BookNotAvailable(f"Book {isbn} not found in catalog")
+        with self.repo.transaction():
+            book = self.repo.get(Book, isbn)
+            if not book:
+                raise BookNotAvailable(f"Book {isbn} not found in catalog")
 
-        book.mark_reserved()
-        self.repo.update(book)
+            book.mark_reserved()
+            self.repo.update(book)
 
-        reservation = Reservation(
-            reservation_id=str(uuid.uuid4()),
-            member_id=member_id,
-            isbn=isbn,
-            reserved_on=date.today()
-        )
-        self.repo.add(reservation)
-        return reservation
+            reservation = Reservation(
+                reservation_id=str(uuid.uuid4()),
+                member_id=member_id,
+                isbn=isbn,
+                reserved_on=date.today()
+            )
+            self.repo.add(reservation)
+            return reservation
 
     def cancel_reservation(self, reservation_id: str) -> None:
         """
@@ -58,37 +59,40 @@ class ReservationService:
         4. Przywraca status książki na
         AVAILABLE i aktualizuje Book w repozytorium.
         """
-        reservation = self.repo.get(Reservation, reservation_id)
-        if not reservation:
-            raise KeyError(f"Reservation {reservation_id} not found")
+        with self.repo.transaction():
+            reservation = self.repo.get(Reservation, reservation_id)
+            if not reservation:
+                raise KeyError(f"Reservation {reservation_id} not found")
 
-        reservation.cancel()
-        self.repo.update(reservation)
+            reservation.cancel()
+            self.repo.update(reservation)
 
-        book = self.repo.get(Book, reservation.isbn)
-        book.mark_returned()
-        self.repo.update(book)
+            book = self.repo.get(Book, reservation.isbn)
+            book.mark_returned()
+            self.repo.update(book)
 
     def expire_reservations(self) -> List[Reservation]:
         """
         Przegląda wszystkie rezerwacje i wygasza te, których termin minął:
         - Dla każdej rezerwacji wywołuje is_expired(),
-        a jeśli True, to expire() i aktualizuje w repo.
+        a jeśli True, to expire().
+        - Wygaszone rezerwacje zapisuje jednym update_many().
         - Zwraca listę wszystkich wygaszonych obiektów Reservation.
         """
-        expired = []
-        for r in self.repo.list(Reservation):
-            if r.is_expired():
-                r.expire()
-                self.repo.update(r)
-                expired.append(r)
-        return expired
+        with self.repo.transaction():
+            expired = []
+            for r in self.repo.list(Reservation):
+                if r.is_expired():
+                    r.expire()
+                    expired.append(r)
+            self.repo.update_many(expired).raise_first()
+            return expired
 
     def list_active_reservations(self) -> List[Reservation]:
         """
         Zwraca listę wszystkich aktywnych rezerwacji.
         """
-        return [r for r in self.repo.list(Reservation) if r.active]
+        return self.repo.list(Reservation, active=True)
 
     def list_expired_reservations(self) -> List[Reservation]:
         """
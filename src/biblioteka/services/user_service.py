@@ -118,13 +118,13 @@ class UserService:
         """
         Zwraca listę wszystkich użytkowników o wskazanej roli.
         """
-        return [u for u in self.repo.list(User) if u.role == role]
+        return self.repo.list(User, role=role)
 
     def list_active_users(self) -> List[User]:
         """
         Zwraca listę aktywnych (is_active=True) użytkowników.
         """
-        return [u for u in self.repo.list(User) if u.is_active]
+        return self.repo.list(User, is_active=True)
 
     def count_users(self) -> int:
         """
@@ -1,5 +1,11 @@
 from .repository import Repository
+from .concurrent_repository import ConcurrentRepository
+from .async_repository import AsyncRepository
+from .sqlite_repository import SQLiteRepository
 
 __all__ = [
+    "AsyncRepository",
+    "ConcurrentRepository",
     "Repository",
+    "SQLiteRepository",
 ]
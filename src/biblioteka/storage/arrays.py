@@ -0,0 +1,349 @@
+from typing import (
+    Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type,
+)
+import threading
+
+from biblioteka.storage.keys import get_key
+from biblioteka.storage.schema import (
+    Field,
+    fields_of,
+    KIND_BOOL,
+    KIND_DATE,
+    KIND_ENUM,
+    KIND_FLOAT,
+    KIND_INT,
+    KIND_STR,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest zależnością opcjonalną (extras "analytics")
+    np = None
+
+# Wartości oznaczające None w kolumnach kodów i dat.
+NO_CODE = -1
+NO_DATE = 0
+
+_DTYPES = {
+    KIND_STR: "int32",
+    KIND_ENUM: "int8",
+    KIND_DATE: "int32",
+    KIND_INT: "float64",
+    KIND_FLOAT: "float64",
+    KIND_BOOL: "bool",
+}
+
+# Odsetek usuniętych wierszy, powyżej którego tablice są zagęszczane.
+_COMPACT_RATIO = 0.5
+
+
+def require_numpy() -> None:
+    """
+    Podnosi ImportError, jeśli numpy nie jest zainstalowane.
+    """
+    if np is None:
+        raise ImportError(
+            "Analytics requires numpy: pip install biblioteka[analytics]"
+        )
+
+
+class ArrayTable:
+    """
+    Widok tabeli klasy cls tylko do odczytu jako kolumny NumPy:
+    - napisy: kody kategorii int32 (NO_CODE dla None),
+      słownik kodów zwraca categories(attr),
+    - enumy: numer wartości w enumie int8 (NO_CODE dla None),
+    - daty: ordinal int32 (NO_DATE dla None),
+    - liczby: float64 (NaN dla None),
+    - bool: bool.
+    Pola innych rodzajów (datetime, JSON) nie są obsługiwane.
+    Widok obserwuje repozytorium (Repository.watch()): zmiany rekordów
+    zapamiętuje jako klucze, a przy kolejnym odczycie (refresh())
+    nanosi tylko te rekordy; wyczyszczenie tabeli oznacza
+    przebudowę. Po zakończeniu pracy należy wywołać close().
+    Wymaga numpy (podnosi ImportError, jeśli go brak).
+    """
+
+    def __init__(
+            self,
+            repo: Any,
+            cls: Type,
+            attrs: Optional[Iterable[str]] = None,
+    ):
+        """
+        Tworzy widok kolumn attrs (domyślnie wszystkich obsługiwanych
+        pól) klasy cls. Podnosi ValueError dla nieznanego pola
+        lub pola nieobsługiwanego rodzaju.
+        """
+        require_numpy()
+        schema = {field.name: field for field in fields_of(cls)}
+        if attrs is None:
+            attrs = [n for n, f in schema.items() if f.kind in _DTYPES]
+        self._fields: List[Field] = []
+        for attr in attrs:
+            field = schema.get(attr)
+            if field is None or field.kind not in _DTYPES:
+                raise ValueError(
+                    f"{cls.__name__}.{attr} cannot be stored in an array"
+                )
+            self._fields.append(field)
+        self.repo = repo
+        self.cls = cls
+        # _pending chroni zgłoszenia zmian (wywoływane przez pisarzy),
+        # _lock — tablice widoku; pisarz nigdy nie czeka na _lock.
+        self._pending = threading.Lock()
+        self._lock = threading.Lock()
+        self._dirty: set = set()
+        self._stale = True
+        self._size = 0
+        self._dead = 0
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._live = np.zeros(0, dtype=bool)
+        self._columns: Dict[str, Any] = {}
+        self._codes: Dict[str, Dict[Any, int]] = {}
+        self._members = {
+            field.name: {m: i for i, m in enumerate(field.enum)}
+            for field in self._fields if field.kind == KIND_ENUM
+        }
+        repo.watch(self)
+
+    def close(self) -> None:
+        """
+        Przestaje obserwować repozytorium.
+        """
+        self.repo.unwatch(self)
+
+    def __enter__(self) -> "ArrayTable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._size - self._dead
+
+    def refresh(self) -> None:
+        """
+        Nanosi zmiany repozytorium zgłoszone od ostatniego odświeżenia:
+        przebudowuje widok po wyczyszczeniu tabeli, a w przeciwnym razie
+        odczytuje ponownie tylko zmienione rekordy.
+        Odczyty (column(), counts(), ...) odświeżają widok same.
+        """
+        with self._lock:
+            self._refresh()
+
+    def column(self, attr: str) -> Any:
+        """
+        Zwraca kopię kolumny attr (tylko istniejące rekordy,
+        w kolejności keys()).
+        """
+        return self.columns(attr)[0]
+
+    def columns(self, *attrs: str) -> Tuple[Any, ...]:
+        """
+        Zwraca kopie kolumn attrs z tego samego stanu widoku
+        (wiersze kolumn odpowiadają sobie).
+        """
+        for attr in attrs:
+            self._field(attr)
+        with self._lock:
+            self._refresh()
+            live = self._live[:self._size]
+            return tuple(
+                self._columns[attr][:self._size][live] for attr in attrs
+            )
+
+    def categorical(self, attr: str) -> Tuple[Any, List[Any]]:
+        """
+        Zwraca (kody, wartości) kolumny kategorii attr (napisy lub
+        enum): kod i oznacza wartości[i], NO_CODE — None.
+        """
+        field = self._field(attr)
+        if field.kind not in (KIND_STR, KIND_ENUM):
+            raise ValueError(f"{attr} is not a categorical column")
+        with self._lock:
+            self._refresh()
+            live = self._live[:self._size]
+            codes = self._columns[attr][:self._size][live]
+            if field.kind == KIND_STR:
+                return codes, list(self._codes[attr])
+            return codes, list(field.enum)
+
+    def keys(self) -> List[str]:
+        """
+        Zwraca klucze rekordów w kolejności wierszy kolumn.
+        """
+        with self._lock:
+            self._refresh()
+            return [key for key in self._keys if key is not None]
+
+    def counts(self, attr: str) -> Dict[Any, int]:
+        """
+        Zlicza rekordy wg wartości kolumny kategorii attr
+        (np.bincount); rekordy z None liczone są pod kluczem None.
+        """
+        return group_counts(*self.categorical(attr))
+
+    def values_for(self, attr: str, keys: Sequence[str]) -> Any:
+        """
+        Zwraca wartości kolumny attr dla rekordów o kluczach keys
+        (brakujący rekord daje wartość oznaczającą None) — pozwala
+        łączyć tablice różnych tabel, np. gatunek książki wypożyczenia.
+        """
+        field = self._field(attr)
+        with self._lock:
+            self._refresh()
+            rows = np.fromiter(
+                (self._rows.get(key, -1) for key in keys),
+                dtype="int64", count=len(keys),
+            )
+            column = self._columns[attr][:self._size]
+            result = np.full(len(keys), _null(field), dtype=column.dtype)
+            found = rows >= 0
+            result[found] = column[rows[found]]
+            return result
+
+    def _changed(self, cls: Type, key: str) -> None:
+        if cls is self.cls:
+            with self._pending:
+                self._dirty.add(key)
+
+    def _cleared(self, cls: Optional[Type]) -> None:
+        if cls is None or cls is self.cls:
+            with self._pending:
+                self._stale = True
+                self._dirty.clear()
+
+    def _refresh(self) -> None:
+        with self._pending:
+            stale, self._stale = self._stale, False
+            dirty, self._dirty = self._dirty, set()
+        if stale:
+            self._rebuild()
+            return
+        for key in dirty:
+            self._apply(key, self.repo.get(self.cls, key))
+        if self._dead > self._size * _COMPACT_RATIO:
+            self._compact()
+
+    def _field(self, attr: str) -> Field:
+        for field in self._fields:
+            if field.name == attr:
+                return field
+        raise ValueError(f"{attr} is not a column of this view")
+
+    def _rebuild(self) -> None:
+        objects = self.repo.list(self.cls)
+        self._keys = [get_key(obj) for obj in objects]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._size = len(objects)
+        self._dead = 0
+        self._live = np.ones(self._size, dtype=bool)
+        self._codes = {}
+        for field in self._fields:
+            if field.kind == KIND_STR:
+                self._codes[field.name] = {}
+            values = [getattr(obj, field.name) for obj in objects]
+            self._columns[field.name] = np.fromiter(
+                (self._encode(field, value) for value in values),
+                dtype=_DTYPES[field.kind], count=self._size,
+            )
+
+    def _apply(self, key: str, obj: Any) -> None:
+        row = self._rows.get(key)
+        if obj is None:
+            if row is not None:
+                del self._rows[key]
+                self._keys[row] = None
+                self._live[row] = False
+                self._dead += 1
+            return
+        if row is None:
+            row = self._append(key)
+        for field in self._fields:
+            self._columns[field.name][row] = self._encode(
+                field, getattr(obj, field.name),
+            )
+
+    def _append(self, key: str) -> int:
+        row = self._size
+        if row == len(self._live):
+            capacity = max(16, row * 2)
+            self._live = _grow(self._live, capacity, False)
+            for field in self._fields:
+                self._columns[field.name] = _grow(
+                    self._columns[field.name], capacity, _null(field),
+                )
+        self._live[row] = True
+        self._keys.append(key)
+        self._rows[key] = row
+        self._size += 1
+        return row
+
+    def _compact(self) -> None:
+        live = self._live[:self._size]
+        for field in self._fields:
+            self._columns[field.name] = (
+                self._columns[field.name][:self._size][live]
+            )
+        self._keys = [key for key in self._keys if key is not None]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._size = len(self._keys)
+        self._dead = 0
+        self._live = np.ones(self._size, dtype=bool)
+
+    def _encode(self, field: Field, value: Any) -> Any:
+        if value is None:
+            return _null(field)
+        kind = field.kind
+        if kind == KIND_STR:
+            codes = self._codes[field.name]
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            return code
+        if kind == KIND_ENUM:
+            if isinstance(value, str):
+                value = field.enum[value.split(".")[-1]]
+            return self._members[field.name][value]
+        if kind == KIND_DATE:
+            return value.toordinal()
+        return value
+
+
+def group_counts(codes: Any, labels: Sequence[Any]) -> Dict[Any, int]:
+    """
+    Zlicza wystąpienia kodów kategorii (np.bincount) i zwraca je
+    jako {wartość: liczba}; kody NO_CODE liczone są pod kluczem None.
+    """
+    codes = np.asarray(codes, dtype="int64")
+    present = codes != NO_CODE
+    totals = np.bincount(codes[present], minlength=len(labels))
+    result = {
+        labels[code]: int(total)
+        for code, total in enumerate(totals.tolist()) if total
+    }
+    missing = int(codes.size - np.count_nonzero(present))
+    if missing:
+        result[None] = missing
+    return result
+
+
+def _null(field: Field) -> Any:
+    """Wartość kolumny oznaczająca None."""
+    if field.kind in (KIND_STR, KIND_ENUM):
+        return NO_CODE
+    if field.kind == KIND_DATE:
+        return NO_DATE
+    if field.kind == KIND_BOOL:
+        return False
+    return np.nan
+
+
+def _grow(array: Any, capacity: int, fill: Any) -> Any:
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
@@ -0,0 +1,179 @@
+from concurrent.futures import Executor
+from functools import partial
+from typing import (
+    Any, AsyncIterator, Callable, Iterable, List, Optional, Type,
+)
+import asyncio
+
+from biblioteka.storage.bulk import BulkResult
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.keys import get_key
+from biblioteka.storage.repository import Repository
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class AsyncRepository:
+    """
+    Asynchroniczna (asyncio) fasada repozytorium:
+    await repo.get(...), await repo.list(...), async for po iterate(...).
+    Operacja, która może wstrzymać wątek (Repository.may_block():
+    dostęp do dysku — leniwe wczytanie tabeli, dziennik, import/eksport,
+    snapshot — albo czekanie na blokadę tabeli ConcurrentRepository
+    trzymaną przez inny wątek), trafia do puli wątków (executor),
+    więc nie blokuje pętli; pozostałe wykonywane są od razu w pętli.
+    Domyślnie opakowuje ConcurrentRepository, bo wywołania z puli
+    wątków mogą się nakładać — wtedy każda operacja trafia do puli;
+    SQLiteRepository nie jest obsługiwane (połączenie sqlite3 jest
+    związane z wątkiem, który je otworzył).
+    """
+
+    def __init__(
+            self,
+            repo: Optional[Repository] = None,
+            executor: Optional[Executor] = None,
+    ):
+        """
+        repo — opakowywane repozytorium (domyślnie nowe
+        ConcurrentRepository); executor — pula dla operacji
+        blokujących (domyślnie pula pętli zdarzeń).
+        """
+        self.repo = repo if repo is not None else ConcurrentRepository()
+        self._executor = executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Wykonuje synchroniczną funkcję fn operującą na repozytorium
+        (np. metodę serwisu): od razu, jeśli operacje repozytorium
+        nie mogą wstrzymać wątku, a w przeciwnym razie w executorze.
+        """
+        if not self.repo.may_block():
+            return fn(*args, **kwargs)
+        return await self.offload(fn, *args, **kwargs)
+
+    async def offload(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Zawsze wykonuje fn w executorze.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(fn, *args, **kwargs),
+        )
+
+    async def add(self, obj: Any) -> None:
+        await self.run(self.repo.add, obj)
+
+    async def get(self, cls: Type, pk: str) -> Any:
+        return await self.run(self.repo.get, cls, pk)
+
+    async def list(self, cls: Type, **filters) -> List[Any]:
+        return await self.run(self.repo.list, cls, **filters)
+
+    async def iterate(
+            self,
+            cls: Type,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            **kwargs,
+    ) -> AsyncIterator[Any]:
+        """
+        Asynchroniczna iteracja po repo.iterate(cls, **kwargs)
+        (filtry oraz order_by/after_key/offset/limit).
+        Obiekty pobierane są stronami po batch_size (każda strona
+        osobnym await), więc w pamięci jest co najwyżej jedna strona,
+        a przeglądanie dużej tabeli nie wstrzymuje innych żądań.
+        Z order_by lub after_key kolejne strony zaczynają się za
+        kluczem ostatniego obiektu poprzedniej (after_key) — każda
+        strona przegląda wtedy tabelę od nowa; bez nich strony idą
+        w kolejności tabeli (offset).
+        Podnosi ValueError, gdy batch_size jest mniejszy niż 1.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        limit = kwargs.pop("limit", None)
+        keyset = (
+            kwargs.get("order_by") is not None
+            or kwargs.get("after_key") is not None
+        )
+        while limit is None or limit > 0:
+            size = batch_size if limit is None else min(batch_size, limit)
+            page = await self.run(
+                lambda: list(self.repo.iterate(cls, limit=size, **kwargs)),
+            )
+            for obj in page:
+                yield obj
+            if len(page) < size:
+                return
+            if limit is not None:
+                limit -= len(page)
+            if keyset:
+                kwargs["after_key"] = get_key(page[-1])
+                kwargs["offset"] = 0
+            else:
+                kwargs["offset"] = kwargs.get("offset", 0) + len(page)
+
+    async def update(self, obj: Any) -> None:
+        await self.run(self.repo.update, obj)
+
+    async def delete(self, cls: Type, pk: str) -> None:
+        await self.run(self.repo.delete, cls, pk)
+
+    async def add_many(self, objs: Iterable[Any]) -> BulkResult:
+        return await self.run(self.repo.add_many, list(objs))
+
+    async def update_many(self, objs: Iterable[Any]) -> BulkResult:
+        return await self.run(self.repo.update_many, list(objs))
+
+    async def delete_many(self, cls: Type, pks: Iterable[str]) -> BulkResult:
+        return await self.run(self.repo.delete_many, cls, list(pks))
+
+    async def count(self, cls: Type = None) -> int:
+        return await self.run(self.repo.count, cls)
+
+    async def find_by_pattern(
+            self,
+            cls: Type,
+            attr: str,
+            pattern: str,
+    ) -> List[Any]:
+        return await self.run(self.repo.find_by_pattern, cls, attr, pattern)
+
+    async def search(
+            self,
+            cls: Type,
+            query: str,
+            limit: int = 10,
+    ) -> List[Any]:
+        return await self.run(self.repo.search, cls, query, limit)
+
+    async def import_from_json(self, cls: Type, *args, **kwargs) -> None:
+        await self.offload(self.repo.import_from_json, cls, *args, **kwargs)
+
+    async def export_to_json(self, cls: Type, *args, **kwargs) -> None:
+        await self.offload(self.repo.export_to_json, cls, *args, **kwargs)
+
+    async def load_journaled(self, cls: Type, *args, **kwargs) -> None:
+        await self.offload(self.repo.load_journaled, cls, *args, **kwargs)
+
+    async def compact_journal(self, cls: Type, snapshot_path: str) -> None:
+        await self.offload(self.repo.compact_journal, cls, snapshot_path)
+
+    async def export_snapshot(self, cls: Type, filepath: str) -> None:
+        await self.offload(self.repo.export_snapshot, cls, filepath)
+
+    async def load_snapshot(self, cls: Type, filepath: str) -> None:
+        await self.offload(self.repo.load_snapshot, cls, filepath)
+
+    async def flush(self) -> List[Type]:
+        return await self.offload(self.repo.flush)
+
+    async def export_columnar(self, cls: Type, *args, **kwargs) -> None:
+        await self.offload(self.repo.export_columnar, cls, *args, **kwargs)
+
+    async def import_columnar(self, cls: Type, filepath: str) -> None:
+        await self.offload(self.repo.import_columnar, cls, filepath)
+
+    async def export_sharded(self, cls: Type, *args, **kwargs) -> None:
+        await self.offload(self.repo.export_sharded, cls, *args, **kwargs)
+
+    async def load_sharded(self, cls: Type, *args, **kwargs) -> None:
+        await self.offload(self.repo.load_sharded, cls, *args, **kwargs)
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from typing import IO, Callable, Iterator, Optional
+import os
+import threading
+
+
+@contextmanager
+def atomic_write(
+        path: str,
+        mode: str = "w",
+        encoding: Optional[str] = None,
+        fsync: bool = True,
+        before_replace: Optional[Callable[[], None]] = None,
+) -> Iterator[IO]:
+    """
+    Zapis pliku "wszystko albo nic": dane trafiają do pliku
+    tymczasowego obok path, który po udanym zapisie jest utrwalany
+    (fsync), a następnie atomowo zastępuje path (os.replace).
+    Awaria w trakcie zapisu zostawia poprzednią wersję pliku,
+    a wyjątek w bloku usuwa plik tymczasowy.
+    Z fsync=True utrwalany jest też katalog, więc po powrocie
+    nowa wersja przetrwa awarię systemu.
+    before_replace (np. zamknięcie mmap starego pliku) wywoływane jest
+    tuż przed podmianą pliku.
+    """
+    # Nazwa unikalna dla procesu i wątku: równoległe zapisy
+    # tego samego pliku nie nadpisują sobie plików tymczasowych.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        if before_replace is not None:
+            before_replace()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if fsync:
+        fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def fsync_directory(path: str) -> None:
+    """
+    Utrwala wpisy katalogu path (np. po os.replace);
+    na systemach bez takiej możliwości (Windows) nic nie robi.
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,85 @@
+from dataclasses import dataclass, field
+from typing import Any, Container, Dict, Iterable, List, Tuple, Type
+
+from biblioteka.storage.keys import get_key
+
+# Element partii: (pozycja w partii, klucz, obiekt lub None).
+BatchItem = Tuple[int, str, Any]
+
+
+@dataclass
+class BulkResult:
+    """
+    Wynik operacji zbiorczej (add_many/update_many/delete_many):
+    - keys — klucze zapisanych rekordów (kolejno w obrębie klasy),
+    - errors — (pozycja w partii, wyjątek) dla odrzuconych elementów,
+      w kolejności pozycji.
+    Odrzucenie elementu nie wstrzymuje zapisu pozostałych; partię
+    "wszystko albo nic" daje wywołanie w transaction() i raise_first().
+    """
+
+    keys: List[str] = field(default_factory=list)
+    errors: List[Tuple[int, Exception]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def raise_first(self) -> None:
+        """
+        Podnosi pierwszy błąd partii (jeśli był).
+        """
+        if self.errors:
+            raise self.errors[0][1]
+
+
+def group_batch(
+        objs: Iterable[Any],
+        result: BulkResult,
+) -> Dict[Type, List[BatchItem]]:
+    """
+    Grupuje obiekty partii wg klas, wyznaczając ich klucze
+    (storage.keys.get_key()); obiekty bez klucza trafiają
+    do result.errors.
+    """
+    groups: Dict[Type, List[BatchItem]] = {}
+    for pos, obj in enumerate(objs):
+        try:
+            key = get_key(obj)
+        except Exception as e:
+            result.errors.append((pos, e))
+            continue
+        groups.setdefault(type(obj), []).append((pos, key, obj))
+    return groups
+
+
+def check_batch(
+        cls: Type,
+        items: List[BatchItem],
+        existing: Container[str],
+        must_exist: bool,
+        result: BulkResult,
+) -> List[BatchItem]:
+    """
+    Zwraca elementy partii klasy cls, które można zapisać, a pozostałe
+    zgłasza w result.errors (KeyError jak add/update/delete):
+    klucz powtórzony w partii, już istniejący (must_exist=False)
+    albo nieistniejący (must_exist=True) w existing.
+    """
+    valid = []
+    seen = set()
+    name = cls.__name__
+    for pos, key, obj in items:
+        if key in seen:
+            error = KeyError(f"{name} with key {key} repeated in batch")
+        elif (key in existing) != must_exist:
+            error = KeyError(
+                f"{name} with key {key} not found" if must_exist
+                else f"{name} with key {key} already exists"
+            )
+        else:
+            seen.add(key)
+            valid.append((pos, key, obj))
+            continue
+        result.errors.append((pos, error))
+    return valid
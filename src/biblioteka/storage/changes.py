@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Type,
+)
+import copy
+import json
+import os
+import threading
+
+from biblioteka.storage.codecs import Codec, JsonCodec
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+CLEAR = "clear"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    Zdarzenie zmiany danych repozytorium (change data capture):
+    - op — INSERT, UPDATE, DELETE albo CLEAR (wyczyszczenie tabeli
+      cls, a przy cls None — wszystkich tabel; key jest wtedy None),
+    - old/new — stan rekordu przed i po zmianie jako słownik
+      zakodowany kodekiem repozytorium (jak w export_to_json());
+      old jest None dla INSERT, a także dla UPDATE, gdy poprzedni
+      stan nie jest znany (patrz Repository.subscribe()), new jest
+      None dla DELETE,
+    - version — Repository.version po zmianie.
+    """
+
+    op: str
+    cls: Optional[Type]
+    key: Optional[str]
+    old: Optional[Dict[str, Any]]
+    new: Optional[Dict[str, Any]]
+    version: int
+
+    def to_record(self) -> Dict[str, Any]:
+        """
+        Zwraca zdarzenie jako słownik do zapisu w JSON
+        (klasa zapisywana jest nazwą).
+        """
+        return {
+            "op": self.op,
+            "class": self.cls.__name__ if self.cls is not None else None,
+            "key": self.key,
+            "old": self.old,
+            "new": self.new,
+            "version": self.version,
+        }
+
+
+class ChangeBus:
+    """
+    Magistrala zdarzeń zmian repozytorium działająca w procesie:
+    subskrybenci (funkcje przyjmujące ChangeEvent) wywoływani są
+    synchronicznie, w kolejności subskrypcji, zaraz po zmianie
+    (w transakcji — po jej zatwierdzeniu). Wyjątek subskrybenta
+    przerywa powiadamianie i jest przekazywany dalej.
+    """
+
+    def __init__(self, codec: Optional[Codec] = None):
+        self.codec = codec if codec is not None else JsonCodec()
+        self._subscribers: tuple = ()
+
+    @property
+    def active(self) -> bool:
+        """
+        True, jeśli ktoś subskrybuje zdarzenia.
+        """
+        return bool(self._subscribers)
+
+    def subscribe(
+            self,
+            callback: Callable[[ChangeEvent], None],
+            classes: Optional[Iterable[Type]] = None,
+    ) -> None:
+        """
+        Rejestruje subskrybenta zdarzeń wszystkich klas albo tylko
+        klas classes (CLEAR wszystkich tabel dostaje każdy).
+        """
+        only = frozenset(classes) if classes is not None else None
+        self._subscribers += ((callback, only),)
+
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        self._subscribers = tuple(
+            entry for entry in self._subscribers if entry[0] != callback
+        )
+
+    def publish(self, event: ChangeEvent) -> None:
+        for callback, only in self._subscribers:
+            if only is None or event.cls is None or event.cls in only:
+                callback(event)
+
+    def image(self, obj: Any) -> Dict[str, Any]:
+        """
+        Zwraca bieżący stan obiektu zakodowany kodekiem;
+        kontenery są kopiowane, więc późniejsze zmiany obiektu
+        go nie zmieniają.
+        """
+        return self.image_of(getattr(obj, "__dict__", {}))
+
+    def image_of(self, state: Mapping[str, Any]) -> Dict[str, Any]:
+        encode_value = self.codec.encode_value
+        return {
+            name: encode_value(copy.copy(value))
+            for name, value in state.items()
+        }
+
+
+class EventLog:
+    """
+    Plik zdarzeń tylko do dopisywania: subskrybent ChangeBus
+    (repo.subscribe(EventLog(path))) zapisujący każde zdarzenie
+    jako jedną linię JSON (ChangeEvent.to_record()).
+    Jeśli fsync=True, każde zdarzenie jest utrwalane na dysku.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._f = open(path, "ab")
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ChangeEvent) -> None:
+        line = json.dumps(
+            event.to_record(),
+            default=str,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self._f.write(line.encode("utf-8") + b"\n")
+            self._f.flush()
+            if self.fsync:
+                os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Zwraca kolejne zdarzenia z pliku EventLog (słowniki
+    ChangeEvent.to_record()). Ostatnia, niedokończona linia
+    (np. po awarii w trakcie zapisu) jest pomijana.
+    """
+    if not os.path.isfile(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply_event(
+        repo: Any,
+        record: Mapping[str, Any],
+        classes: Mapping[str, Type],
+) -> None:
+    """
+    Stosuje zdarzenie (słownik z read_events() albo
+    ChangeEvent.to_record()) do repozytorium repo, np. repliki:
+    rekordy tworzone są kodekiem repo (Codec.decode()), a classes
+    mapuje nazwy klas na klasy. Zdarzenia klas spoza classes są
+    pomijane.
+    """
+    op = record["op"]
+    name = record["class"]
+    if op == CLEAR and name is None:
+        repo.clear()
+        return
+    cls = classes.get(name)
+    if cls is None:
+        return
+    if op == CLEAR:
+        repo.clear(cls)
+    elif op == DELETE:
+        repo.delete(cls, record["key"])
+    elif op in (INSERT, UPDATE):
+        obj = repo.codec.decode(cls, record["new"])
+        if op == INSERT:
+            repo.add(obj)
+        else:
+            repo.update(obj)
+    else:
+        raise ValueError(f"Unsupported change operation: {op}")
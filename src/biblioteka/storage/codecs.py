@@ -0,0 +1,252 @@
+from abc import ABC, abstractmethod
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from functools import partial
+from typing import (
+    Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional,
+    Tuple, Type,
+)
+import json
+
+from biblioteka.storage.schema import (
+    Field,
+    fields_of,
+    KIND_DATE,
+    KIND_DATETIME,
+    KIND_ENUM,
+)
+from biblioteka.storage.streaming import JsonArrayReader
+
+try:
+    import orjson
+except ImportError:  # orjson jest zależnością opcjonalną (extras "fast")
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec jest zależnością opcjonalną (extras "fast")
+    msgspec = None
+
+
+class Codec(ABC):
+    """
+    Kodek plików eksportu/importu repozytorium.
+    Zamienia obiekt modelu na słownik prostych wartości (encode())
+    i z powrotem (decode()), a listę słowników na zawartość pliku
+    (dump()/load()). Wartości typowane kodowane są wg typu:
+    - date/datetime — tekst ISO 8601 (datetime z ewentualną strefą),
+    - Enum (BookStatus, Role, ...) — nazwa wartości, np. "LOANED",
+    a dekodowane wg schematu klasy (storage.schema); dekoder
+    przyjmuje też starszy zapis enumów "BookStatus.LOANED".
+    Podklasy implementują dump() i load(); mogą też zmienić
+    encode_value()/decode_value().
+    """
+
+    name = "codec"
+
+    def __init__(self):
+        self._plans: Dict[Type, Tuple[List[Field], frozenset]] = {}
+
+    def encode(self, obj: Any) -> dict:
+        """
+        Zwraca słownik atrybutów obiektu z zakodowanymi wartościami.
+        Podnosi TypeError, jeśli obiekt nie ma __dict__.
+        """
+        if not hasattr(obj, "__dict__"):
+            raise TypeError(
+                f"Cannot serialize object of type {type(obj).__name__}"
+            )
+        encode_value = self.encode_value
+        return {
+            name: encode_value(value) for name, value in obj.__dict__.items()
+        }
+
+    def decode(self, cls: Type, rec: dict) -> Any:
+        """
+        Tworzy obiekt dataclassy cls z rekordu zapisanego przez
+        encode(): pola przyjmowane przez konstruktor przekazywane są
+        do cls(...) (z walidacją i wartościami domyślnymi brakujących
+        pól), a pozostałe (init=False, np. wyliczane w __post_init__)
+        przywracane po utworzeniu obiektu.
+        Podnosi TypeError, jeśli cls nie jest dataclassą.
+        """
+        schema, init = self._plan(cls)
+        decode_value = self.decode_value
+        args = {}
+        extra = {}
+        for field in schema:
+            if field.name in rec:
+                value = decode_value(field, rec[field.name])
+                if field.name in init:
+                    args[field.name] = value
+                else:
+                    extra[field.name] = value
+        obj = cls(**args)
+        obj.__dict__.update(extra)
+        return obj
+
+    def factory(self, cls: Type) -> Callable[[dict], Any]:
+        """
+        Zwraca fabrykę rekord -> obiekt klasy cls (decode())
+        w postaci oczekiwanej przez import_from_json(),
+        load_journaled() czy load_sharded().
+        """
+        return lambda rec: self.decode(cls, rec)
+
+    def encode_value(self, value: Any) -> Any:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Enum):
+            return value.name
+        return value
+
+    def decode_value(self, field: Field, value: Any) -> Any:
+        if value is None or not isinstance(value, str):
+            return value
+        if field.kind == KIND_DATE:
+            return date.fromisoformat(value)
+        if field.kind == KIND_DATETIME:
+            return datetime.fromisoformat(value)
+        if field.kind == KIND_ENUM:
+            return field.enum[value.rsplit(".", 1)[-1]]
+        return value
+
+    @abstractmethod
+    def dump(self, records: Iterable[dict], f: BinaryIO) -> None:
+        """
+        Zapisuje rekordy do pliku f otwartego w trybie binarnym.
+        """
+
+    @abstractmethod
+    def load(self, f: BinaryIO) -> Iterator[dict]:
+        """
+        Zwraca kolejne rekordy z pliku f otwartego w trybie binarnym.
+        Błędy składni zgłaszane są jako ValueError.
+        """
+
+    def _plan(self, cls: Type) -> Tuple[List[Field], frozenset]:
+        plan = self._plans.get(cls)
+        if plan is None:
+            if not is_dataclass(cls):
+                raise TypeError(f"{cls.__name__} is not a dataclass")
+            init = frozenset(f.name for f in fields(cls) if f.init)
+            plan = self._plans[cls] = (fields_of(cls), init)
+        return plan
+
+
+class JsonCodec(Codec):
+    """
+    Tablica JSON (biblioteka standardowa), domyślnie zwarta
+    (indent=None); odczyt strumieniowy, rekord po rekordzie
+    (storage.streaming.JsonArrayReader).
+    """
+
+    name = "json"
+
+    def __init__(self, indent: Optional[int] = None):
+        super().__init__()
+        self.indent = indent
+
+    def dump(self, records: Iterable[dict], f: BinaryIO) -> None:
+        text = json.dumps(
+            list(records),
+            default=str,
+            ensure_ascii=False,
+            indent=self.indent,
+            separators=None if self.indent else (",", ":"),
+        )
+        f.write(text.encode("utf-8"))
+
+    def load(self, f: BinaryIO) -> Iterator[dict]:
+        return iter(JsonArrayReader(f))
+
+
+class JsonLinesCodec(Codec):
+    """
+    JSON Lines: jeden rekord JSON w wierszu. Zapis i odczyt
+    są strumieniowe, a plik można dopisywać bez przepisywania.
+    """
+
+    name = "jsonl"
+
+    def dump(self, records: Iterable[dict], f: BinaryIO) -> None:
+        encoder = json.JSONEncoder(
+            default=str, ensure_ascii=False, separators=(",", ":"),
+        )
+        for rec in records:
+            f.write(encoder.encode(rec).encode("utf-8"))
+            f.write(b"\n")
+
+    def load(self, f: BinaryIO) -> Iterator[dict]:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Line {number}: {e}") from e
+
+
+class FastJsonCodec(Codec):
+    """
+    Tablica JSON (zgodna z JsonCodec) kodowana biblioteką orjson,
+    a bez niej msgspec (pip install biblioteka[fast]); bez żadnej
+    z nich konstruktor podnosi ImportError.
+    Plik parsowany jest w całości, a nie strumieniowo.
+    """
+
+    name = "fast-json"
+
+    def __init__(self):
+        super().__init__()
+        if orjson is not None:
+            self._dumps = partial(orjson.dumps, default=str)
+            self._loads = orjson.loads
+        elif msgspec is not None:
+            self._dumps = partial(msgspec.json.encode, enc_hook=str)
+            self._loads = msgspec.json.decode
+        else:
+            raise ImportError(
+                "Fast codec requires orjson or msgspec: "
+                "pip install biblioteka[fast]"
+            )
+
+    def dump(self, records: Iterable[dict], f: BinaryIO) -> None:
+        f.write(self._dumps(list(records)))
+
+    def load(self, f: BinaryIO) -> Iterator[dict]:
+        data = self._loads(f.read())
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of records")
+        return iter(data)
+
+
+CODECS: Dict[str, Callable[[], Codec]] = {
+    JsonCodec.name: JsonCodec,
+    JsonLinesCodec.name: JsonLinesCodec,
+    FastJsonCodec.name: FastJsonCodec,
+}
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Zwraca nowy kodek o nazwie name ("json", "jsonl", "fast-json").
+    Podnosi ValueError dla nieznanej nazwy i ImportError, gdy kodek
+    wymaga niezainstalowanej biblioteki.
+    """
+    factory = CODECS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown codec {name!r}")
+    return factory()
+
+
+def best_codec() -> Codec:
+    """
+    Zwraca najszybszy dostępny kodek tablicy JSON: FastJsonCodec,
+    jeśli zainstalowano orjson lub msgspec, a w przeciwnym razie
+    JsonCodec. FastJsonCodec wczytuje cały plik naraz, więc przy
+    dużych plikach, gdzie liczy się pamięć, lepszy jest JsonCodec.
+    """
+    if orjson is not None or msgspec is not None:
+        return FastJsonCodec()
+    return JsonCodec()
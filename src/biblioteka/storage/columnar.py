@@ -0,0 +1,358 @@
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type
+import json
+import lzma
+import struct
+import sys
+import zlib
+
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.storage.schema import (
+    Field,
+    fields_of,
+    build,
+    schema_bytes,
+    KIND_BOOL,
+    KIND_DATE,
+    KIND_DATETIME,
+    KIND_ENUM,
+    KIND_FLOAT,
+    KIND_INT,
+    KIND_JSON,
+    KIND_STR,
+)
+
+MAGIC = b"BIBCOL01"
+
+# magic | kodek kompresji | liczba rekordów | długość schematu
+_HEADER = struct.Struct("<8sBQI")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+
+# Kodeki kompresji części z kolumnami (biblioteka standardowa).
+CODECS: Dict[str, int] = {"none": 0, "zlib": 1, "lzma": 2}
+_COMPRESS: Dict[int, Callable[[bytes], bytes]] = {
+    0: bytes,
+    1: zlib.compress,
+    2: lzma.compress,
+}
+_DECOMPRESS: Dict[int, Callable[[bytes], bytes]] = {
+    0: bytes,
+    1: zlib.decompress,
+    2: lzma.decompress,
+}
+
+# Kodowanie kolumny napisów: wprost albo słownikiem.
+_PLAIN = 0
+_DICTIONARY = 1
+# Kolumna napisów kodowana jest słownikiem, gdy różnych wartości
+# jest co najwyżej 1/_DICTIONARY_RATIO wszystkich (np. author,
+# genre, location), a nie gdy prawie każda jest inna (isbn, title).
+_DICTIONARY_RATIO = 2
+
+# Tablice (array) zapisywane są w porządku little-endian.
+_SWAP = sys.byteorder == "big"
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+_KEY = Field("", KIND_STR)
+
+
+def write_columnar(
+        path: str,
+        cls: Type,
+        items: Iterable[Tuple[str, Any]],
+        compression: str = "zlib",
+) -> int:
+    """
+    Zapisuje obiekty klasy cls (pary klucz, obiekt) do pliku path
+    w formacie kolumnowym: nagłówek i schemat, a po nich kolumny
+    (klucze, potem kolejne pola) skompresowane kodekiem compression
+    ("zlib", "lzma" lub "none"). Każda kolumna ma bitmapę wartości
+    None; napisy o powtarzających się wartościach kodowane są
+    słownikiem, daty jako ordinal (int32), enumy jako numer (uint8).
+    Zapis jest atomowy (storage.atomic.atomic_write).
+    Zwraca liczbę zapisanych rekordów.
+    Podnosi ValueError dla nieznanego kodeka.
+    """
+    codec = CODECS.get(compression)
+    if codec is None:
+        raise ValueError(f"Unknown compression: {compression}")
+    keys: List[str] = []
+    objects: List[Any] = []
+    for key, obj in items:
+        if not isinstance(key, str):
+            raise TypeError(
+                f"Columnar keys must be str, got {type(key).__name__}"
+            )
+        keys.append(key)
+        objects.append(obj)
+    columns = [_encode_column(_KEY, keys)]
+    for field in fields_of(cls):
+        columns.append(_encode_column(
+            field, [getattr(obj, field.name) for obj in objects],
+        ))
+    body = _COMPRESS[codec](b"".join(
+        _U32.pack(len(column)) + column for column in columns
+    ))
+    schema = schema_bytes(cls)
+    with atomic_write(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, codec, len(keys), len(schema)))
+        f.write(schema)
+        f.write(body)
+    return len(keys)
+
+
+def read_columnar(path: str, cls: Type) -> List[Tuple[str, Any]]:
+    """
+    Wczytuje plik zapisany przez write_columnar() i zwraca listę
+    par (klucz, obiekt) w kolejności zapisu. Kolumny dekodowane są
+    w całości (tablice array, jeden dekod UTF-8 na kolumnę napisów),
+    a obiekty tworzone z gotowych wartości (schema.build).
+    Podnosi ValueError, jeśli plik lub schemat są niepoprawne.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is too short")
+    magic, codec, count, schema_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a columnar file")
+    if codec not in _DECOMPRESS:
+        raise ValueError(f"{path} uses unknown compression {codec}")
+    start = _HEADER.size + schema_len
+    if data[_HEADER.size:start] != schema_bytes(cls):
+        raise ValueError(f"{path} schema does not match {cls.__name__}")
+    reader = _Reader(_DECOMPRESS[codec](data[start:]))
+    keys = reader.column(_KEY, count)
+    schema = fields_of(cls)
+    names = [field.name for field in schema]
+    columns = [reader.column(field, count) for field in schema]
+    return [
+        (key, build(cls, dict(zip(names, row))))
+        for key, row in zip(keys, zip(*columns))
+    ]
+
+
+class _Reader:
+    """Sekwencyjny odczyt kolumn z rozpakowanej części pliku."""
+
+    def __init__(self, buf: bytes):
+        self.buf = buf
+        self.pos = 0
+
+    def take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.buf):
+            raise ValueError("Columnar data is truncated")
+        chunk = self.buf[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def u8(self) -> int:
+        return self.take(_U8.size)[0]
+
+    def u32(self) -> int:
+        return _U32.unpack(self.take(_U32.size))[0]
+
+    def array(self, typecode: str, count: int) -> array:
+        values = array(typecode)
+        values.frombytes(self.take(values.itemsize * count))
+        if _SWAP:
+            values.byteswap()
+        return values
+
+    def column(self, field: Field, count: int) -> List[Any]:
+        size = self.u32()
+        end = self.pos + size
+        nulls = self.take((count + 7) // 8) if self.u8() else None
+        values = _DECODERS[field.kind](self, field, count)
+        if self.pos != end:
+            raise ValueError(f"Column {field.name!r} is corrupted")
+        if nulls is not None:
+            for i in range(count):
+                if nulls[i >> 3] & (1 << (i & 7)):
+                    values[i] = None
+        return values
+
+
+def _pack_array(typecode: str, values: Iterable[Any]) -> bytes:
+    packed = array(typecode, values)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _code_type(size: int) -> str:
+    """Najmniejszy typ tablicy mieszczący numery size wartości."""
+    if size <= 0x100:
+        return "B"
+    if size <= 0x10000:
+        return "H"
+    return "I"
+
+
+def _encode_column(field: Field, values: List[Any]) -> bytes:
+    nulls = bytearray((len(values) + 7) // 8)
+    has_nulls = False
+    for i, value in enumerate(values):
+        if value is None:
+            nulls[i >> 3] |= 1 << (i & 7)
+            has_nulls = True
+    head = _U8.pack(1) + bytes(nulls) if has_nulls else _U8.pack(0)
+    return head + _ENCODERS[field.kind](field, values)
+
+
+def _pack_texts(texts: List[str]) -> bytes:
+    # Długości w znakach: odczyt dekoduje UTF-8 raz dla całej kolumny
+    # i tnie gotowy napis.
+    blob = "".join(texts).encode("utf-8")
+    return _pack_array("I", map(len, texts)) + _U32.pack(len(blob)) + blob
+
+
+def _unpack_texts(reader: _Reader, count: int) -> List[str]:
+    lengths = reader.array("I", count)
+    text = reader.take(reader.u32()).decode("utf-8")
+    texts = []
+    pos = 0
+    for length in lengths:
+        texts.append(text[pos:pos + length])
+        pos += length
+    return texts
+
+
+def _encode_str(field: Field, values: List[Any]) -> bytes:
+    texts = ["" if v is None else str(v) for v in values]
+    words = list(dict.fromkeys(texts))
+    if len(words) * _DICTIONARY_RATIO > len(texts):
+        return _U8.pack(_PLAIN) + _pack_texts(texts)
+    codes = {word: i for i, word in enumerate(words)}
+    return b"".join((
+        _U8.pack(_DICTIONARY),
+        _U32.pack(len(words)),
+        _pack_texts(words),
+        _pack_array(_code_type(len(words)), map(codes.__getitem__, texts)),
+    ))
+
+
+def _decode_str(reader: _Reader, field: Field, count: int) -> List[str]:
+    if reader.u8() == _PLAIN:
+        return _unpack_texts(reader, count)
+    size = reader.u32()
+    words = _unpack_texts(reader, size)
+    return [words[code] for code in reader.array(_code_type(size), count)]
+
+
+def _encode_json(field: Field, values: List[Any]) -> bytes:
+    return _encode_str(field, [
+        None if v is None else json.dumps(v, default=str) for v in values
+    ])
+
+
+def _decode_json(reader: _Reader, field: Field, count: int) -> List[Any]:
+    return [
+        json.loads(text) if text else None
+        for text in _decode_str(reader, field, count)
+    ]
+
+
+def _encode_int(field: Field, values: List[Any]) -> bytes:
+    return _pack_array("q", (0 if v is None else v for v in values))
+
+
+def _decode_int(reader: _Reader, field: Field, count: int) -> List[int]:
+    return reader.array("q", count).tolist()
+
+
+def _encode_float(field: Field, values: List[Any]) -> bytes:
+    return _pack_array("d", (0.0 if v is None else v for v in values))
+
+
+def _decode_float(reader: _Reader, field: Field, count: int) -> List[float]:
+    return reader.array("d", count).tolist()
+
+
+def _encode_bool(field: Field, values: List[Any]) -> bytes:
+    return _pack_array("B", (1 if v else 0 for v in values))
+
+
+def _decode_bool(reader: _Reader, field: Field, count: int) -> List[bool]:
+    return [bool(v) for v in reader.array("B", count)]
+
+
+def _encode_enum(field: Field, values: List[Any]) -> bytes:
+    members = {member: i for i, member in enumerate(field.enum)}
+    codes = []
+    for value in values:
+        if isinstance(value, str):
+            value = field.enum[value.split(".")[-1]]
+        codes.append(0 if value is None else members[value])
+    return _pack_array("B", codes)
+
+
+def _decode_enum(reader: _Reader, field: Field, count: int) -> List[Any]:
+    members = list(field.enum)
+    return [members[code] for code in reader.array("B", count)]
+
+
+def _encode_date(field: Field, values: List[Any]) -> bytes:
+    return _pack_array("i", (
+        0 if v is None else v.toordinal() for v in values
+    ))
+
+
+def _decode_date(reader: _Reader, field: Field, count: int) -> List[Any]:
+    ordinals = reader.array("i", count)
+    # Daty w kolumnie zwykle się powtarzają: każdą tworzymy raz.
+    dates = {o: date.fromordinal(o) for o in set(ordinals) if o > 0}
+    return [dates.get(o) for o in ordinals]
+
+
+def _encode_datetime(field: Field, values: List[Any]) -> bytes:
+    micros, aware = [], []
+    for value in values:
+        if value is None:
+            micros.append(0)
+            aware.append(0)
+        elif value.tzinfo is None:
+            micros.append((value - _EPOCH) // _MICROSECOND)
+            aware.append(0)
+        else:
+            micros.append((value - _EPOCH_UTC) // _MICROSECOND)
+            aware.append(1)
+    return _pack_array("q", micros) + _pack_array("B", aware)
+
+
+def _decode_datetime(reader: _Reader, field: Field, count: int) -> List[Any]:
+    micros = reader.array("q", count)
+    aware = reader.array("B", count)
+    return [
+        (_EPOCH_UTC if flag else _EPOCH) + m * _MICROSECOND
+        for m, flag in zip(micros, aware)
+    ]
+
+
+_ENCODERS: Dict[str, Callable[[Field, List[Any]], bytes]] = {
+    KIND_STR: _encode_str,
+    KIND_INT: _encode_int,
+    KIND_FLOAT: _encode_float,
+    KIND_BOOL: _encode_bool,
+    KIND_ENUM: _encode_enum,
+    KIND_DATE: _encode_date,
+    KIND_DATETIME: _encode_datetime,
+    KIND_JSON: _encode_json,
+}
+
+_DECODERS: Dict[str, Callable[[_Reader, Field, int], List[Any]]] = {
+    KIND_STR: _decode_str,
+    KIND_INT: _decode_int,
+    KIND_FLOAT: _decode_float,
+    KIND_BOOL: _decode_bool,
+    KIND_ENUM: _decode_enum,
+    KIND_DATE: _decode_date,
+    KIND_DATETIME: _decode_datetime,
+    KIND_JSON: _decode_json,
+}
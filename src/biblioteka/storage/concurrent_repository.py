@@ -0,0 +1,356 @@
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+import threading
+
+from biblioteka.storage.codecs import Codec
+from biblioteka.storage.locks import RWLock
+from biblioteka.storage.mvcc import RepositorySnapshot
+from biblioteka.storage.repository import Repository
+from biblioteka.storage.transaction import Transaction
+
+
+class ConcurrentRepository(Repository):
+    """
+    Wariant Repository bezpieczny dla wielu wątków (np. serwer
+    z pulą workerów), z tym samym interfejsem.
+    - Każda tabela (klasa modelu) ma własną blokadę RWLock:
+      odczyty (get/list/count/find_by_pattern/search) tej samej
+      lub różnych tabel wykonują się równolegle.
+    - Zapisy są szeregowane jedną blokadą pisarza, a na czas zmiany
+      tabeli dodatkowo blokują zapis tylko do tej tabeli — czytelnicy
+      pozostałych tabel nie czekają.
+    - transaction() trzyma blokadę pisarza przez cały blok, więc
+      operacje serwisów typu "sprawdź i zmień" (loan_book itp.)
+      są sekcją krytyczną: dwa wątki nie wypożyczą tej samej książki.
+      Blokada zapisu tabeli zdobyta w transakcji jest trzymana do jej
+      końca (blokowanie dwufazowe), więc czytelnicy nie widzą
+      częściowo wykonanej operacji ani stanu przed wycofaniem.
+      Zapis do dzienników odbywa się już po zwolnieniu blokad tabel
+      (pod samą blokadą pisarza), więc odczyty nie czekają na dysk,
+      a na utrwalenie (fsync, Journal.sync()) operacja czeka dopiero
+      po zwolnieniu blokady pisarza — dziennik z group_commit łączy
+      wtedy fsync równoległych operacji w jeden.
+    - Bieżąca transakcja jest przypisana do wątku (threading.local),
+      więc odczyty innych wątków nie trafiają do jej zapisu zmian.
+    - snapshot() czeka tylko na bieżącą transakcję; dalej widok
+      czyta bez blokad tabel, a pisarze działają równolegle.
+    Leniwe wczytanie tabeli i przebudowa indeksów wykonywane są
+    pod blokadą zapisu, przed pierwszym odczytem.
+    """
+
+    def __init__(
+            self,
+            indexes: Optional[Dict[Type, Iterable[str]]] = None,
+            text_indexes: Optional[Dict[Type, Iterable[str]]] = None,
+            sorted_indexes: Optional[Dict[Type, Iterable[str]]] = None,
+            codec: Optional[Codec] = None,
+    ):
+        self._local = threading.local()
+        self._locks: Dict[Type, RWLock] = {}
+        self._locks_guard = threading.Lock()
+        self._writer = threading.RLock()
+        super().__init__(indexes, text_indexes, sorted_indexes, codec)
+
+    @property
+    def _tx(self) -> Optional[Transaction]:
+        return getattr(self._local, "tx", None)
+
+    @_tx.setter
+    def _tx(self, tx: Optional[Transaction]) -> None:
+        self._local.tx = tx
+
+    @contextmanager
+    def transaction(self) -> Iterator["ConcurrentRepository"]:
+        """
+        Jak Repository.transaction(), a dodatkowo sekcja krytyczna:
+        w danej chwili tylko jeden wątek zmienia repozytorium.
+        """
+        if self._tx is not None:
+            yield self
+            return
+        try:
+            with self._writer:
+                tx = Transaction()
+                with ExitStack() as stack:
+                    self._local.held = (stack, set())
+                    self._tx = tx
+                    try:
+                        yield self
+                    except BaseException:
+                        self._tx = None
+                        self._rollback(tx)
+                        raise
+                    finally:
+                        self._tx = None
+                        self._local.held = None
+                self._commit(tx)
+        finally:
+            self._sync_pending()
+
+    def may_block(self) -> bool:
+        # Każda operacja może czekać na blokadę tabeli trzymaną przez
+        # inny wątek (np. długi import w puli wątków).
+        return True
+
+    def snapshot(self) -> RepositorySnapshot:
+        # Pod blokadą pisarza żadna transakcja nie jest w toku,
+        # więc widok zaczyna od zatwierdzonego stanu.
+        with self._writer:
+            return super().snapshot()
+
+    def watch(self, watcher) -> None:
+        with self._writer:
+            super().watch(watcher)
+
+    def unwatch(self, watcher) -> None:
+        with self._writer:
+            super().unwatch(watcher)
+
+    def flush(self) -> List[Type]:
+        # Pod blokadą pisarza żadna transakcja nie zmienia tabel
+        # w trakcie zapisu.
+        if self._tx is not None:
+            raise RuntimeError("flush() cannot run inside a transaction")
+        with self._writer:
+            return super().flush()
+
+    def register_loader(self, cls: Type, loader) -> None:
+        with self._writer:
+            super().register_loader(cls, loader)
+
+    def create_index(self, cls: Type, attr: str) -> None:
+        with self._writing(cls):
+            super().create_index(cls, attr)
+
+    def create_text_index(self, cls: Type, attr: str) -> None:
+        with self._writing(cls):
+            super().create_text_index(cls, attr)
+
+    def create_sorted_index(self, cls: Type, attr: str, where=None) -> None:
+        with self._writing(cls):
+            super().create_sorted_index(cls, attr, where)
+
+    def explain(self, cls: Type, **filters) -> Dict[str, Any]:
+        lock = self._acquire_read(cls)
+        try:
+            return super().explain(cls, **filters)
+        finally:
+            lock.release_read()
+
+    def create_search_index(self, cls: Type, attrs: Iterable[str]):
+        with self._writing(cls):
+            return super().create_search_index(cls, attrs)
+
+    def attach_search_index(self, cls: Type, index) -> None:
+        with self._writing(cls):
+            super().attach_search_index(cls, index)
+
+    def search(self, cls: Type, query: str, limit: int = 10) -> List[Any]:
+        lock = self._acquire_read(cls)
+        try:
+            return super().search(cls, query, limit)
+        finally:
+            lock.release_read()
+
+    def add(self, obj: Any) -> None:
+        with self._writing(type(obj)):
+            super().add(obj)
+
+    def get(self, cls: Type, pk: str) -> Any:
+        lock = self._acquire_read(cls)
+        try:
+            return super().get(cls, pk)
+        finally:
+            lock.release_read()
+
+    def list(self, cls: Type, **filters) -> List[Any]:
+        lock = self._acquire_read(cls)
+        try:
+            return super().list(cls, **filters)
+        finally:
+            lock.release_read()
+
+    def iterate(self, cls: Type, **kwargs) -> Iterator[Any]:
+        # Strona jest kompletowana pod blokadą odczytu, bo generator
+        # nie może trzymać blokady między kolejnymi next().
+        lock = self._acquire_read(cls)
+        try:
+            return iter(list(super().iterate(cls, **kwargs)))
+        finally:
+            lock.release_read()
+
+    def update(self, obj: Any) -> None:
+        with self._writing(type(obj)):
+            super().update(obj)
+
+    def delete(self, cls: Type, pk: str) -> None:
+        with self._writing(cls):
+            super().delete(cls, pk)
+
+    def _bulk(self, cls: Type, *args) -> None:
+        # Sprawdzenie kluczy partii i zapis pod jedną blokadą tabeli.
+        with self._writing(cls):
+            super()._bulk(cls, *args)
+
+    def clear(self, cls: Type = None) -> None:
+        if cls:
+            with self._writing(cls):
+                super().clear(cls)
+            return
+        with self._writer, ExitStack() as stack:
+            for cls_ in self._known_classes():
+                stack.enter_context(self._lock(cls_).write())
+            super().clear()
+
+    def count(self, cls: Type = None) -> int:
+        if cls:
+            lock = self._acquire_read(cls)
+            try:
+                return super().count(cls)
+            finally:
+                lock.release_read()
+        return sum(self.count(cls_) for cls_ in self._known_classes())
+
+    def export_to_json(self, cls: Type, *args, **kwargs) -> None:
+        lock = self._acquire_read(cls)
+        try:
+            super().export_to_json(cls, *args, **kwargs)
+        finally:
+            lock.release_read()
+
+    def import_from_json(self, cls: Type, *args, **kwargs) -> None:
+        with self._writing(cls):
+            super().import_from_json(cls, *args, **kwargs)
+
+    def load_journaled(self, cls: Type, *args, **kwargs) -> None:
+        with self._writing(cls):
+            super().load_journaled(cls, *args, **kwargs)
+
+    def compact_journal(self, cls: Type, snapshot_path: str) -> None:
+        with self._writing(cls):
+            super().compact_journal(cls, snapshot_path)
+
+    def export_snapshot(self, cls: Type, filepath: str) -> None:
+        # Zapis snapshotu przepina tabelę na nowy plik (rebase).
+        with self._writing(cls):
+            super().export_snapshot(cls, filepath)
+
+    def load_snapshot(self, cls: Type, filepath: str) -> None:
+        with self._writing(cls):
+            super().load_snapshot(cls, filepath)
+
+    def export_columnar(self, cls: Type, *args, **kwargs) -> None:
+        lock = self._acquire_read(cls)
+        try:
+            super().export_columnar(cls, *args, **kwargs)
+        finally:
+            lock.release_read()
+
+    def import_columnar(self, cls: Type, filepath: str) -> None:
+        with self._writing(cls):
+            super().import_columnar(cls, filepath)
+
+    def export_sharded(self, cls: Type, *args, **kwargs) -> None:
+        lock = self._acquire_read(cls)
+        try:
+            super().export_sharded(cls, *args, **kwargs)
+        finally:
+            lock.release_read()
+
+    def load_sharded(self, cls: Type, *args, **kwargs) -> None:
+        with self._writing(cls):
+            super().load_sharded(cls, *args, **kwargs)
+
+    def find_by_pattern(self, cls: Type, attr: str, pattern: str) -> List[Any]:
+        lock = self._acquire_read(cls)
+        try:
+            return super().find_by_pattern(cls, attr, pattern)
+        finally:
+            lock.release_read()
+
+    def _release_snapshot(self, snap: RepositorySnapshot) -> None:
+        with self._writer:
+            super()._release_snapshot(snap)
+
+    def _snapshot_table(self, cls: Type) -> Dict[str, Any]:
+        lock = self._acquire_read(cls)
+        try:
+            return self._data.get(cls, {})
+        finally:
+            lock.release_read()
+
+    def _lock(self, cls: Type) -> RWLock:
+        lock = self._locks.get(cls)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(cls, RWLock())
+        return lock
+
+    def _known_classes(self) -> List[Type]:
+        return list(dict.fromkeys([*self._data, *self._loaders]))
+
+    def _ready(self, cls: Type) -> bool:
+        """
+        Czy tabelę cls można czytać bez żadnych zmian w strukturach
+        (wczytana, z aktualnymi indeksami)?
+        """
+        return (
+            cls in self._data
+            and cls not in self._loaders
+            and cls not in self._stale_indexes
+        )
+
+    def _acquire_read(self, cls: Type) -> RWLock:
+        """
+        Zajmuje blokadę odczytu tabeli cls i ją zwraca; wcześniej,
+        pod blokadą zapisu, wczytuje tabelę i przebudowuje jej
+        indeksy, jeśli trzeba.
+        """
+        lock = self._lock(cls)
+        while True:
+            if not self._ready(cls):
+                with self._writing(cls):
+                    self._table(cls)
+                    self._ensure_indexes(cls)
+            lock.acquire_read()
+            if self._ready(cls):
+                return lock
+            lock.release_read()
+
+    @contextmanager
+    def _writing(self, cls: Type) -> Iterator[None]:
+        """
+        Blokada pisarza repozytorium oraz blokada zapisu tabeli cls.
+        W transakcji blokada tabeli jest trzymana do końca transakcji.
+        """
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            stack, classes = held
+            if cls not in classes:
+                stack.enter_context(self._lock(cls).write())
+                classes.add(cls)
+            yield
+            return
+        try:
+            with self._writer, self._lock(cls).write():
+                yield
+        finally:
+            self._sync_pending()
+
+    def _sync_journal(self, journal, ticket: int) -> None:
+        # Utrwalenie odkładane jest do zwolnienia blokady pisarza
+        # (_sync_pending), aby inne wątki mogły w tym czasie pisać.
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = []
+        pending.append((journal, ticket))
+
+    def _sync_pending(self) -> None:
+        """
+        Czeka na utrwalenie zapisów dziennika wykonanych przez
+        bieżący wątek (po zwolnieniu blokady pisarza).
+        """
+        pending = getattr(self._local, "pending", None)
+        while pending:
+            journal, ticket = pending.pop(0)
+            journal.sync(ticket)
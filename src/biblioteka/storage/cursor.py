@@ -0,0 +1,62 @@
+from enum import Enum
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+import heapq
+
+
+def parse_order(order_by: Optional[str]) -> Tuple[Optional[str], bool]:
+    """
+    Rozbiera order_by na (atrybut, malejąco): "title" sortuje rosnąco,
+    "-title" malejąco; None oznacza kolejność tabeli.
+    """
+    if not order_by:
+        return None, False
+    if order_by.startswith("-"):
+        return order_by[1:], True
+    return order_by, False
+
+
+def sort_value(value: Any) -> Tuple[bool, Any]:
+    """
+    Klucz sortowania pojedynczej wartości: None na końcu,
+    enumy wg nazwy (tak jak w SQLiteRepository).
+    """
+    if isinstance(value, Enum):
+        value = value.name
+    return value is None, value
+
+
+def window(
+        items: Iterable[Any],
+        offset: int = 0,
+        limit: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Leniwie pomija offset elementów i zwraca co najwyżej limit kolejnych.
+    Podnosi ValueError dla ujemnego offset lub limit.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must not be negative")
+    stop = None if limit is None else offset + limit
+    return islice(items, offset, stop)
+
+
+def smallest(
+        items: Iterable[Any],
+        key: Callable[[Any], Any],
+        descending: bool,
+        offset: int = 0,
+        limit: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Zwraca okno [offset, offset+limit) posortowanych items.
+    Z limitem wybiera tylko offset+limit elementów kopcem (heapq),
+    więc pamięć zależy od rozmiaru strony, a nie od liczby items.
+    """
+    if limit is None:
+        ordered = sorted(items, key=key, reverse=descending)
+    elif descending:
+        ordered = heapq.nlargest(offset + limit, items, key=key)
+    else:
+        ordered = heapq.nsmallest(offset + limit, items, key=key)
+    return window(ordered, offset, limit)
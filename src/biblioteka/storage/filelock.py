@@ -0,0 +1,195 @@
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: brak blokad doradczych, patrz FileLock
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+
+class FileLock:
+    """
+    Doradcza blokada międzyprocesowa (fcntl.flock) pliku danych path,
+    zakładana na pliku path + ".lock": współdzielona (odczyt)
+    albo wyłączna (zapis).
+    Plik blokady przechowuje też numer generacji danych, zwiększany
+    przez każdy zapis (bump()) — proces, który wczytał dane
+    w generacji g, po zmianie generacji wie, że jego kopia jest
+    nieaktualna, bez porównywania samych danych.
+    Blokada jest wielobieżna w obrębie obiektu: ponowne zajęcie
+    trzymanej blokady niczego nie robi (wyłączna obejmuje
+    współdzieloną). Przejście ze współdzielonej na wyłączną podnosi
+    RuntimeError (zakleszczyłoby się przy dwóch takich procesach).
+    Na systemach bez fcntl (Windows) blokada niczego nie blokuje,
+    a działa tylko numer generacji.
+    """
+
+    def __init__(self, path: str):
+        self.path = path + LOCK_SUFFIX
+        self._fd: Optional[int] = None
+        self._exclusive = False
+        self._depth = 0
+
+    def acquire(self, exclusive: bool = False) -> None:
+        """
+        Zajmuje blokadę (czeka na procesy trzymające blokadę
+        w trybie z nią sprzecznym).
+        """
+        if self._depth:
+            if exclusive and not self._exclusive:
+                raise RuntimeError(
+                    f"Cannot upgrade shared lock on {self.path}"
+                )
+            self._depth += 1
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self._exclusive = exclusive
+        self._depth = 1
+
+    def release(self) -> None:
+        if not self._depth:
+            raise RuntimeError(f"Lock on {self.path} is not held")
+        self._depth -= 1
+        if self._depth:
+            return
+        fd, self._fd = self._fd, None
+        # Zamknięcie deskryptora zwalnia flock.
+        os.close(fd)
+
+    @contextmanager
+    def shared(self) -> Iterator["FileLock"]:
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    @contextmanager
+    def exclusive(self) -> Iterator["FileLock"]:
+        self.acquire(exclusive=True)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def generation(self) -> int:
+        """
+        Zwraca numer generacji danych (0 dla nowego pliku blokady).
+        Wymaga trzymania blokady.
+        """
+        self._require(exclusive=False)
+        raw = os.pread(self._fd, 32, 0).strip()
+        return int(raw) if raw else 0
+
+    def bump(self) -> int:
+        """
+        Zwiększa i zwraca numer generacji — wywoływane po zapisie
+        danych. Wymaga blokady wyłącznej.
+        """
+        self._require(exclusive=True)
+        generation = self.generation() + 1
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, str(generation).encode("ascii"), 0)
+        return generation
+
+    def _require(self, exclusive: bool) -> None:
+        if not self._depth or (exclusive and not self._exclusive):
+            mode = "exclusive" if exclusive else "a"
+            raise RuntimeError(f"{self.path}: {mode} lock is required")
+
+
+class TableLocks:
+    """
+    Blokady plików tabel jednego procesu (po jednej FileLock na plik)
+    i generacje, w których tabele zostały wczytane.
+    Umożliwia optymistyczny zapis: tabele wczytywane są pod krótką
+    blokadą współdzieloną (reading()), a zapis (committing())
+    zajmuje blokady wszystkich wczytanych tabel — wyłączne dla
+    zapisywanych, współdzielone dla pozostałych — i sprawdza,
+    czy od wczytania nikt ich nie zmienił (stale()).
+    Blokady zajmowane są zawsze w kolejności ścieżek, więc procesy
+    zapisujące różne zestawy tabel nie zakleszczają się.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, FileLock] = {}
+        self.versions: Dict[str, int] = {}
+        self.conflicts: List[str] = []
+
+    def lock(self, path: str) -> FileLock:
+        """
+        Zwraca blokadę pliku path (tworzy ją przy pierwszym użyciu).
+        """
+        lock = self._locks.get(path)
+        if lock is None:
+            lock = self._locks[path] = FileLock(path)
+        return lock
+
+    @contextmanager
+    def reading(self, path: str) -> Iterator[None]:
+        """
+        Blok wczytania tabeli z pliku path: trzyma blokadę
+        współdzieloną (zapis innego procesu nie podmieni pliku
+        w trakcie odczytu) i zapamiętuje generację wczytanych danych.
+        """
+        with self.lock(path).shared() as lock:
+            self.versions[path] = lock.generation()
+            yield
+
+    @contextmanager
+    def holding(
+            self,
+            exclusive: Iterable[str],
+            shared: Iterable[str] = (),
+    ) -> Iterator[None]:
+        """
+        Zajmuje blokady wyłączne plików exclusive i współdzielone
+        plików shared, w kolejności ścieżek.
+        """
+        modes = {path: False for path in shared}
+        modes.update((path, True) for path in exclusive)
+        with ExitStack() as stack:
+            for path in sorted(modes):
+                lock = self.lock(path)
+                lock.acquire(exclusive=modes[path])
+                stack.callback(lock.release)
+            yield
+
+    @contextmanager
+    def committing(self, written: Iterable[str]) -> Iterator[List[str]]:
+        """
+        Blok zapisu tabel written: zajmuje blokady (jak holding())
+        wszystkich wczytanych tabel i zwraca listę tych, które inny
+        proces zmienił od wczytania (pusta — można zapisywać);
+        są one też dopisywane do conflicts.
+        Po bloku zakończonym bez wyjątku (i bez konfliktu) generacja
+        zapisanych tabel jest zwiększana.
+        """
+        written = list(written)
+        with self.holding(written, self.versions):
+            stale = self.stale()
+            self.conflicts.extend(stale)
+            yield stale
+            if not stale:
+                for path in written:
+                    self.versions[path] = self.lock(path).bump()
+
+    def stale(self) -> List[str]:
+        """
+        Zwraca ścieżki wczytanych tabel, których generacja
+        zmieniła się od wczytania (wymaga trzymania ich blokad).
+        """
+        return [
+            path for path, version in self.versions.items()
+            if self.lock(path).generation() != version
+        ]
@@ -0,0 +1,193 @@
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import heapq
+import json
+import math
+import re
+import unicodedata
+
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.utils.exceptions import DataExportError
+
+# Litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny.
+_FOLD_EXTRA = str.maketrans({"ł": "l", "Ł": "l", "ß": "ss"})
+_TOKEN = re.compile(r"[^\W_]+")
+
+FORMAT_VERSION = 1
+
+
+def fold(text: str) -> str:
+    """
+    Sprowadza tekst do postaci porównywalnej przy wyszukiwaniu:
+    małe litery, bez polskich (i innych) znaków diakrytycznych,
+    np. "Żółć" -> "zolc".
+    """
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD_EXTRA))
+    return "".join(
+        ch for ch in text if not unicodedata.combining(ch)
+    ).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Dzieli tekst na słowa (ciągi liter i cyfr) po złożeniu
+    znaków diakrytycznych funkcją fold().
+    """
+    return _TOKEN.findall(fold(text))
+
+
+class FullTextIndex:
+    """
+    Odwrócony indeks pełnotekstowy nad kilkoma tekstowymi atrybutami
+    obiektów (np. tytuł, autor, opis) z rankingiem BM25.
+    Dla każdego słowa przechowuje mapowanie: klucz -> liczba wystąpień,
+    a dla każdego dokumentu jego długość, więc add/remove aktualizują
+    indeks przyrostowo.
+    search() zwraca k najlepszych wyników (heapq.nlargest),
+    bez sortowania wszystkich trafień.
+    Indeks można zapisać do pliku (save) i wczytać (load), zamiast
+    budować go od nowa przy każdym starcie.
+    """
+
+    def __init__(
+            self,
+            attrs: Iterable[str],
+            k1: float = 1.2,
+            b: float = 0.75,
+    ):
+        self.attrs = tuple(attrs)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, pk: str, obj: Any) -> None:
+        """
+        Indeksuje (lub ponownie indeksuje) obiekt o kluczu pk.
+        Niezmieniona treść nie rusza indeksu.
+        """
+        terms: Dict[str, int] = {}
+        for attr in self.attrs:
+            value = getattr(obj, attr, None)
+            if isinstance(value, str):
+                for term in tokenize(value):
+                    terms[term] = terms.get(term, 0) + 1
+        if self._docs.get(pk) == terms:
+            return
+        self.remove(pk)
+        self._insert(pk, terms)
+
+    def remove(self, pk: str) -> None:
+        """
+        Usuwa klucz pk z indeksu (jeśli był zaindeksowany).
+        """
+        terms = self._docs.pop(pk, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(pk)
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(pk, None)
+                if not posting:
+                    del self._postings[term]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Zwraca do k par (klucz, wynik BM25) dla dokumentów zawierających
+        co najmniej jedno słowo zapytania, od najlepiej dopasowanych.
+        """
+        if k <= 0 or not self._docs:
+            return []
+        n = len(self._docs)
+        avg_length = self._total_length / n or 1.0
+        scores: Dict[str, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for pk, tf in posting.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[pk] / avg_length
+                )
+                gain = idf * tf * (self.k1 + 1) / (tf + norm)
+                scores[pk] = scores.get(pk, 0.0) + gain
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+    def clear(self) -> None:
+        """
+        Usuwa wszystkie wpisy z indeksu.
+        """
+        self._postings.clear()
+        self._docs.clear()
+        self._lengths.clear()
+        self._total_length = 0
+
+    def save(self, path: str, source: Any = None) -> None:
+        """
+        Zapisuje indeks do pliku JSON (atomowo: plik tymczasowy,
+        fsync i os.replace — storage.atomic). source to dowolny
+        opis danych źródłowych (np. rozmiar i czas modyfikacji
+        plików), sprawdzany przez load().
+        Jeśli zapis się nie powiedzie, podnosi DataExportError.
+        """
+        payload = {
+            "version": FORMAT_VERSION,
+            "attrs": list(self.attrs),
+            "source": source,
+            "docs": self._docs,
+        }
+        try:
+            with atomic_write(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+        except Exception as e:
+            raise DataExportError(
+                f"Failed to save search index to {path}: {e}"
+            ) from e
+
+    @classmethod
+    def load(
+            cls,
+            path: str,
+            attrs: Iterable[str],
+            source: Any = None,
+    ) -> Optional["FullTextIndex"]:
+        """
+        Wczytuje indeks zapisany przez save().
+        Zwraca None, jeśli pliku nie ma, jest uszkodzony albo został
+        zapisany dla innych atrybutów lub innego source — wtedy
+        indeks trzeba zbudować od nowa.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        attrs = tuple(attrs)
+        if (
+                not isinstance(payload, dict)
+                or payload.get("version") != FORMAT_VERSION
+                or tuple(payload.get("attrs", ())) != attrs
+                or payload.get("source") != source
+                or not isinstance(payload.get("docs"), dict)
+        ):
+            return None
+        index = cls(attrs)
+        for pk, terms in payload["docs"].items():
+            index._insert(pk, terms)
+        return index
+
+    def _insert(self, pk: str, terms: Dict[str, int]) -> None:
+        self._docs[pk] = terms
+        length = sum(terms.values())
+        self._lengths[pk] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[pk] = tf
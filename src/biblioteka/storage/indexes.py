@@ -0,0 +1,388 @@
+from operator import itemgetter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import bisect
+
+from biblioteka.storage.cursor import sort_value
+
+
+class HashIndex:
+    """
+    Indeks pomocniczy (secondary index) dla jednego atrybutu jednej klasy.
+    Przechowuje mapowanie: wartość atrybutu -> zbiór kluczy głównych
+    oraz odwrotne mapowanie: klucz -> zaindeksowana wartość,
+    dzięki któremu aktualizacja obiektu zmienionego "w miejscu"
+    potrafi usunąć go ze starego koszyka.
+    Wartości niehaszowalne nie są indeksowane (trafiają do _unhashable).
+    """
+
+    def __init__(self, attr: str):
+        self.attr = attr
+        self._buckets: Dict[Hashable, Dict[str, None]] = {}
+        self._values: Dict[str, Any] = {}
+        self._unhashable: Dict[str, None] = {}
+
+    def add(self, pk: str, obj: Any) -> None:
+        """
+        Dodaje obiekt o kluczu pk do indeksu.
+        Jeśli klucz był już zaindeksowany z inną wartością,
+        najpierw go usuwa; niezmieniona wartość nie rusza indeksu.
+        """
+        value = getattr(obj, self.attr, None)
+        if pk in self._values:
+            if self._values[pk] == value:
+                return
+            self.remove(pk)
+        elif pk in self._unhashable:
+            self.remove(pk)
+        try:
+            bucket = self._buckets.setdefault(value, {})
+        except TypeError:
+            self._unhashable[pk] = None
+            return
+        bucket[pk] = None
+        self._values[pk] = value
+
+    def add_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Dodaje pary (klucz, obiekt) jak kolejne add().
+        """
+        for pk, obj in items:
+            self.add(pk, obj)
+
+    def remove_many(self, pks: Iterable[str]) -> None:
+        """
+        Usuwa klucze pks jak kolejne remove().
+        """
+        for pk in pks:
+            self.remove(pk)
+
+    def remove(self, pk: str) -> None:
+        """
+        Usuwa klucz pk z indeksu (jeśli był zaindeksowany).
+        """
+        self._unhashable.pop(pk, None)
+        if pk not in self._values:
+            return
+        value = self._values.pop(pk)
+        bucket = self._buckets.get(value)
+        if bucket is not None:
+            bucket.pop(pk, None)
+            if not bucket:
+                del self._buckets[value]
+
+    def lookup(self, value: Any) -> Iterable[str]:
+        """
+        Zwraca klucze obiektów, których atrybut był równy value
+        w chwili ostatniego add/update. Obiekty o wartościach
+        niehaszowalnych są zawsze zwracane jako kandydaci.
+        """
+        try:
+            bucket = self._buckets.get(value, {})
+        except TypeError:
+            bucket = {}
+        if not self._unhashable:
+            return bucket
+        return list(bucket) + list(self._unhashable)
+
+    def size_of(self, value: Any) -> int:
+        """
+        Zwraca (szacunkową) liczbę kandydatów dla wartości value.
+        Używane do wyboru najbardziej selektywnego indeksu.
+        """
+        try:
+            return len(self._buckets.get(value, ())) + len(self._unhashable)
+        except TypeError:
+            return len(self._unhashable)
+
+    def lookup_many(self, values: Iterable[Any]) -> List[str]:
+        """
+        Zwraca (bez powtórzeń) klucze obiektów, których atrybut
+        był równy jednej z wartości values.
+        """
+        keys: Dict[str, None] = {}
+        for value in values:
+            keys.update(dict.fromkeys(self.lookup(value)))
+        return list(keys)
+
+    def clear(self) -> None:
+        """
+        Usuwa wszystkie wpisy z indeksu.
+        """
+        self._buckets.clear()
+        self._values.clear()
+        self._unhashable.clear()
+
+
+class TrigramIndex:
+    """
+    Indeks trigramowy (n-gramy długości 3) dla tekstowego atrybutu.
+    Dla każdego trigramu małoliterowej wartości przechowuje zbiór
+    kluczy obiektów, co pozwala wyszukiwać fragmenty tekstu
+    (bez rozróżnienia wielkości liter) przez przecięcie list
+    i weryfikację tylko kandydatów, zamiast skanowania całej tabeli.
+    Wartości nietekstowe nie są indeksowane.
+    """
+
+    N = 3
+
+    def __init__(self, attr: str):
+        self.attr = attr
+        self._postings: Dict[str, Dict[str, None]] = {}
+        self._values: Dict[str, str] = {}
+
+    def add(self, pk: str, obj: Any) -> None:
+        """
+        Dodaje (lub aktualizuje) obiekt o kluczu pk.
+        Niezmieniona wartość nie rusza indeksu.
+        """
+        value = getattr(obj, self.attr, None)
+        if not isinstance(value, str):
+            self.remove(pk)
+            return
+        lowered = value.lower()
+        if self._values.get(pk) == lowered:
+            return
+        self.remove(pk)
+        self._values[pk] = lowered
+        for gram in self._grams(lowered):
+            self._postings.setdefault(gram, {})[pk] = None
+
+    def add_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Dodaje pary (klucz, obiekt) jak kolejne add().
+        """
+        for pk, obj in items:
+            self.add(pk, obj)
+
+    def remove_many(self, pks: Iterable[str]) -> None:
+        """
+        Usuwa klucze pks jak kolejne remove().
+        """
+        for pk in pks:
+            self.remove(pk)
+
+    def remove(self, pk: str) -> None:
+        """
+        Usuwa klucz pk z indeksu (jeśli był zaindeksowany).
+        """
+        lowered = self._values.pop(pk, None)
+        if lowered is None:
+            return
+        for gram in self._grams(lowered):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.pop(pk, None)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, fragment: str) -> List[str]:
+        """
+        Zwraca klucze obiektów, których wartość zawiera fragment
+        (porównanie bez rozróżnienia wielkości liter).
+        Fragmenty krótsze niż 3 znaki sprawdzane są na zapamiętanych
+        wartościach bez ponownego zamieniania liter.
+        """
+        needle = fragment.lower()
+        grams = self._grams(needle)
+        if not grams:
+            return [pk for pk, v in self._values.items() if needle in v]
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+        return [
+            pk for pk in smallest
+            if all(pk in p for p in rest) and needle in self._values[pk]
+        ]
+
+    def clear(self) -> None:
+        """
+        Usuwa wszystkie wpisy z indeksu.
+        """
+        self._postings.clear()
+        self._values.clear()
+
+    @classmethod
+    def _grams(cls, text: str) -> Set[str]:
+        return {text[i:i + cls.N] for i in range(len(text) - cls.N + 1)}
+
+
+class SortedIndex:
+    """
+    Indeks posortowany dla jednego atrybutu: lista par
+    (wartość, klucz) utrzymywana w porządku rosnącym, dzięki czemu
+    zapytania zakresowe (lt/between/...) i równościowe wyznaczają
+    kandydatów wyszukiwaniem binarnym (bisect), a ich liczbę
+    w O(log n) — bez przeglądania całej tabeli.
+    Wartości None nie są indeksowane (nie pasują do zakresów),
+    a nieporównywalne z resztą trafiają do _unsortable
+    i są zawsze zwracane jako kandydaci.
+    Indeks częściowy (where={atrybut: wartość, ...}) obejmuje tylko
+    obiekty spełniające te równości, np. aktywne wypożyczenia
+    (returned_on=None) — jego rozmiar nie rośnie wraz z historią.
+    """
+
+    def __init__(self, attr: str, where: Optional[Dict[str, Any]] = None):
+        self.attr = attr
+        self.where = dict(where or {})
+        self._entries: List[Tuple[Any, str]] = []
+        self._values: Dict[str, Tuple[Any, str]] = {}
+        self._unsortable: Dict[str, None] = {}
+
+    def add(self, pk: str, obj: Any) -> None:
+        """
+        Dodaje (lub aktualizuje) obiekt o kluczu pk.
+        Niezmieniona wartość nie rusza indeksu.
+        Wstawienie w środek listy kosztuje O(n) — przy budowie
+        indeksu lub imporcie należy użyć add_many().
+        """
+        value = self._value(obj)
+        entry = (sort_value(value), pk)
+        if self._values.get(pk) == entry:
+            return
+        self.remove(pk)
+        if value is not None:
+            self._insert(entry)
+
+    def add_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Dodaje (lub aktualizuje) wiele obiektów naraz: stare wpisy
+        zmienionych kluczy usuwane są jednym przejściem, a nowe
+        dołączane i sortowane raz — O((n + k) log(n + k)) zamiast
+        O(n) na każde z k wstawień add().
+        """
+        added: Dict[str, Tuple[Any, str]] = {}
+        for pk, obj in items:
+            value = self._value(obj)
+            entry = (sort_value(value), pk)
+            if self._values.get(pk) == entry:
+                added.pop(pk, None)
+                continue
+            added[pk] = entry if value is not None else None
+        if not added:
+            return
+        changed = [
+            pk for pk in added if pk in self._values or pk in self._unsortable
+        ]
+        if changed:
+            for pk in changed:
+                self._unsortable.pop(pk, None)
+                self._values.pop(pk, None)
+            self._entries = [
+                entry for entry in self._entries if entry[1] not in added
+            ]
+        entries = [entry for entry in added.values() if entry is not None]
+        try:
+            merged = self._entries + entries
+            merged.sort()
+        except TypeError:
+            # Wartości nieporównywalne: wstawianie po jednej
+            # odsiewa je do _unsortable.
+            for entry in entries:
+                self._insert(entry)
+            return
+        self._entries = merged
+        for entry in entries:
+            self._values[entry[1]] = entry
+
+    def remove(self, pk: str) -> None:
+        """
+        Usuwa klucz pk z indeksu (jeśli był zaindeksowany).
+        """
+        self._unsortable.pop(pk, None)
+        entry = self._values.pop(pk, None)
+        if entry is None:
+            return
+        i = bisect.bisect_left(self._entries, entry)
+        del self._entries[i]
+
+    def remove_many(self, pks: Iterable[str]) -> None:
+        """
+        Usuwa wiele kluczy jednym przejściem listy (zamiast O(n)
+        na każde remove()).
+        """
+        removed = set()
+        for pk in pks:
+            self._unsortable.pop(pk, None)
+            if self._values.pop(pk, None) is not None:
+                removed.add(pk)
+        if removed:
+            self._entries = [
+                entry for entry in self._entries if entry[1] not in removed
+            ]
+
+    def range(
+            self,
+            lower: Optional[Tuple[Any, bool]] = None,
+            upper: Optional[Tuple[Any, bool]] = None,
+    ) -> List[str]:
+        """
+        Zwraca klucze obiektów o wartościach z zakresu (granice jak
+        w storage.query.Range), w porządku wartości.
+        Podnosi TypeError, gdy granica jest nieporównywalna z wartościami.
+        """
+        start, stop = self._span(lower, upper)
+        keys = [pk for _, pk in self._entries[start:stop]]
+        return keys + list(self._unsortable)
+
+    def size_of_range(
+            self,
+            lower: Optional[Tuple[Any, bool]] = None,
+            upper: Optional[Tuple[Any, bool]] = None,
+    ) -> int:
+        """
+        Zwraca liczbę kandydatów dla zakresu, w O(log n).
+        Podnosi TypeError jak range().
+        """
+        start, stop = self._span(lower, upper)
+        return max(stop - start, 0) + len(self._unsortable)
+
+    def _value(self, obj: Any) -> Any:
+        """
+        Zwraca indeksowaną wartość obiektu (None — obiekt spoza
+        indeksu częściowego albo bez wartości).
+        """
+        value = getattr(obj, self.attr, None)
+        if value is not None and self.where and not all(
+                getattr(obj, attr, None) == expected
+                for attr, expected in self.where.items()
+        ):
+            return None
+        return value
+
+    def _insert(self, entry: Tuple[Any, str]) -> None:
+        try:
+            bisect.insort(self._entries, entry)
+        except TypeError:
+            self._unsortable[entry[1]] = None
+            return
+        self._values[entry[1]] = entry
+
+    def clear(self) -> None:
+        """
+        Usuwa wszystkie wpisy z indeksu.
+        """
+        self._entries.clear()
+        self._values.clear()
+        self._unsortable.clear()
+
+    def _span(
+            self,
+            lower: Optional[Tuple[Any, bool]],
+            upper: Optional[Tuple[Any, bool]],
+    ) -> Tuple[int, int]:
+        key = itemgetter(0)
+        start, stop = 0, len(self._entries)
+        if lower is not None:
+            value, inclusive = lower
+            find = bisect.bisect_left if inclusive else bisect.bisect_right
+            start = find(self._entries, sort_value(value), key=key)
+        if upper is not None:
+            value, inclusive = upper
+            find = bisect.bisect_right if inclusive else bisect.bisect_left
+            stop = find(self._entries, sort_value(value), key=key)
+        return start, stop
@@ -0,0 +1,189 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+
+class Journal:
+    """
+    Dziennik zmian (write-ahead journal) jednej tabeli repozytorium.
+    Każda mutacja dopisywana jest na końcu pliku jako jedna linia JSON:
+    {"op": "add"|"update"|"delete", "key": ..., "data": {...}}.
+    Koszt zapisu jest proporcjonalny do zmiany, a nie do rozmiaru tabeli.
+    Kompakcja (Repository.compact_journal) zapisuje pełny snapshot
+    i opróżnia dziennik.
+    Tryb grupowego zatwierdzania (group_commit) łączy fsync wielu
+    zapisów z krótkiego okna czasu w jeden — przy wielu wątkach
+    piszących równocześnie (ConcurrentRepository) każdy zapis nadal
+    wraca dopiero po utrwaleniu, ale dysk synchronizowany jest raz
+    na okno, a nie raz na operację.
+    """
+
+    OPS = ("add", "update", "delete")
+
+    def __init__(
+            self,
+            path: str,
+            fsync: bool = False,
+            group_commit: float = 0.0,
+    ):
+        """
+        Tworzy dziennik w pliku path.
+        Jeśli fsync=True, każdy wpis jest dodatkowo utrwalany na dysku.
+        group_commit > 0 (w sekundach) włącza grupowe zatwierdzanie:
+        pierwszy czekający na utrwalenie zapis czeka group_commit
+        sekund na kolejne, po czym jeden fsync utrwala je wszystkie.
+        """
+        self.path = path
+        self.fsync = fsync
+        self.group_commit = group_commit
+        self._length: Optional[int] = None
+        # Numer ostatniego zapisu i ostatniego utrwalonego zapisu.
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._written = 0
+        self._durable = 0
+        self._syncing = False
+
+    def append(self, op: str, key: str, data: Optional[Dict] = None) -> None:
+        """
+        Dopisuje pojedynczy wpis do dziennika.
+        Podnosi ValueError dla nieznanej operacji.
+        """
+        self.append_many([(op, key, data)])
+
+    def append_many(
+            self,
+            entries: Iterable[Tuple[str, str, Optional[Dict]]],
+    ) -> None:
+        """
+        Dopisuje wiele wpisów (op, key, data) jednym zapisem
+        (jedno otwarcie pliku i co najwyżej jeden fsync)
+        i wraca po ich utrwaleniu (jeśli fsync=True).
+        Podnosi ValueError dla nieznanej operacji, niczego nie zapisując.
+        """
+        self.sync(self.write(entries))
+
+    def write(
+            self,
+            entries: Iterable[Tuple[str, str, Optional[Dict]]],
+    ) -> int:
+        """
+        Dopisuje wpisy do pliku (bez czekania na grupowe utrwalenie)
+        i zwraca numer zapisu dla sync(). Bez group_commit
+        i z fsync=True wpisy są utrwalane od razu.
+        Podnosi ValueError dla nieznanej operacji, niczego nie zapisując.
+        """
+        lines = []
+        for op, key, data in entries:
+            if op not in self.OPS:
+                raise ValueError(f"Unsupported journal operation: {op}")
+            record = {"op": op, "key": key}
+            if data is not None:
+                record["data"] = data
+            lines.append(
+                json.dumps(record, default=str, separators=(",", ":"))
+            )
+        with self._lock:
+            if not lines:
+                return self._written
+            length = len(self)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                if self.fsync and not self.group_commit:
+                    f.flush()
+                    self._fsync(f)
+            self._length = length + len(lines)
+            self._written += 1
+            return self._written
+
+    def sync(self, ticket: int) -> None:
+        """
+        Czeka, aż zapis o numerze ticket (z write()) zostanie
+        utrwalony. W trybie group_commit pierwszy czekający wątek
+        odczekuje okno i jednym fsync utrwala wszystkie zapisy
+        do tej chwili; pozostałe czekają na jego wynik.
+        """
+        if not (self.fsync and self.group_commit):
+            return
+        with self._synced:
+            while self._durable < ticket:
+                if self._syncing:
+                    self._synced.wait()
+                    continue
+                self._syncing = True
+                self._synced.release()
+                durable = None
+                try:
+                    time.sleep(self.group_commit)
+                    with self._lock:
+                        target = self._written
+                    with open(self.path, "ab") as f:
+                        self._fsync(f)
+                    durable = target
+                finally:
+                    self._synced.acquire()
+                    self._syncing = False
+                    if durable is not None:
+                        self._durable = max(self._durable, durable)
+                    self._synced.notify_all()
+
+    def _fsync(self, f) -> None:
+        """
+        Utrwala na dysku zapisy pliku f (jedyne miejsce wywołania fsync).
+        """
+        os.fsync(f.fileno())
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Zwraca kolejne wpisy dziennika.
+        Ostatnia, niedokończona linia (np. po awarii w trakcie zapisu)
+        jest pomijana.
+        """
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                if line.strip():
+                    yield json.loads(line)
+
+    def truncate(self) -> None:
+        """
+        Opróżnia dziennik (po zapisaniu snapshotu).
+        """
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8"):
+                pass
+            self._length = 0
+
+    def __len__(self) -> int:
+        """
+        Zwraca liczbę wpisów od ostatniej kompakcji.
+        """
+        if self._length is None:
+            self._length = self._scan()
+        return self._length
+
+    def _scan(self) -> int:
+        """
+        Liczy kompletne wpisy i obcina niedokończoną końcówkę pliku,
+        aby kolejne append() nie skleiły się z uszkodzoną linią.
+        """
+        if not os.path.isfile(self.path):
+            return 0
+        count = 0
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                valid_size += len(line)
+                if line.strip():
+                    count += 1
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+        return count
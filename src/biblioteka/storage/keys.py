@@ -0,0 +1,58 @@
+from dataclasses import fields, is_dataclass
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Type
+
+# Atrybuty sprawdzane (w tej kolejności) u modeli, które
+# nie deklarują klucza głównego przez PRIMARY_KEY_ATTR.
+PK_CANDIDATES = (
+    "loan_id",
+    "reservation_id",
+    "user_id",
+    "member_id",
+    "isbn",
+)
+PRIMARY_KEY_ATTR = "__primary_key__"
+
+_PK_FIELDS: Dict[Type, str] = {}
+_KEY_GETTERS: Dict[Type, Callable[[Any], str]] = {}
+
+
+def primary_key(cls: Type, sample: Optional[Any] = None) -> str:
+    """
+    Zwraca nazwę atrybutu klucza głównego klasy cls.
+    Pierwszeństwo ma jawna deklaracja w modelu (__primary_key__),
+    a bez niej sprawdzane są kolejno PK_CANDIDATES: wśród pól
+    dataclassy albo, dla zwykłych klas, na przykładowym obiekcie sample.
+    Wynik jest zapamiętywany per klasa.
+    Podnosi ValueError, jeśli klucza nie da się wyznaczyć.
+    """
+    name = _PK_FIELDS.get(cls)
+    if name is not None:
+        return name
+    name = getattr(cls, PRIMARY_KEY_ATTR, None)
+    if name is None:
+        if is_dataclass(cls):
+            names = {f.name for f in fields(cls)}
+            found = (attr for attr in PK_CANDIDATES if attr in names)
+        elif sample is not None:
+            found = (a for a in PK_CANDIDATES if hasattr(sample, a))
+        else:
+            found = iter(())
+        name = next(found, None)
+    if name is None:
+        raise ValueError(f"Unsupported object type {cls.__name__}")
+    _PK_FIELDS[cls] = name
+    return name
+
+
+def get_key(obj: Any) -> str:
+    """
+    Zwraca wartość klucza głównego obiektu.
+    Getter (operator.attrgetter) jest wyznaczany raz na klasę,
+    więc kolejne wywołania to jedno wyszukanie w słowniku.
+    """
+    getter = _KEY_GETTERS.get(type(obj))
+    if getter is None:
+        getter = attrgetter(primary_key(type(obj), obj))
+        _KEY_GETTERS[type(obj)] = getter
+    return getter(obj)
@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import threading
+
+
+class RWLock:
+    """
+    Blokada czytelników/pisarzy (reader/writer lock):
+    wielu czytelników naraz albo jeden pisarz.
+    Oczekujący pisarz blokuje nowych czytelników, więc pisarze
+    nie są zagładzani przy ciągłym odczycie.
+    Blokada jest wielobieżna: wątek trzymający zapis może czytać
+    i ponownie pisać, a wątek trzymający odczyt może czytać dalej.
+    Próba przejścia z odczytu do zapisu podnosi RuntimeError
+    (zakleszczyłaby się przy dwóch takich wątkach).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """
+        Zajmuje blokadę do odczytu (czeka na pisarza).
+        """
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers.get(me, 0)
+            if depth == 0 and self._writer != me:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+            self._readers[me] = depth + 1
+
+    def release_read(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+            else:
+                del self._readers[me]
+                if not self._readers and self._waiting_writers:
+                    self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Zajmuje wyłączną blokadę do zapisu (czeka, aż odejdą
+        czytelnicy i inny pisarz).
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                if me in self._readers:
+                    raise RuntimeError(
+                        "Cannot upgrade a read lock to a write lock"
+                    )
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+            self._write_depth += 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Blok z blokadą do odczytu.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Blok z wyłączną blokadą do zapisu.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,226 @@
+from typing import Any, Callable, Dict, List, Optional, Type
+import copy
+import threading
+
+from biblioteka.models.book import Book
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.storage.codecs import Codec
+from biblioteka.storage.query import compile_filters, matches_all
+from biblioteka.storage.transaction import (
+    MISSING,
+    restore_state,
+    snapshot_state,
+)
+from biblioteka.utils.exceptions import DataExportError
+
+_LIVE = object()
+
+
+class RepositorySnapshot:
+    """
+    Spójny widok repozytorium tylko do odczytu z chwili wywołania
+    Repository.snapshot() (MVCC z kopiowaniem przy zapisie):
+    - utworzenie widoku niczego nie kopiuje — widok czyta bieżące tabele,
+    - zanim pisarz zmieni rekord (pierwsze dotknięcie w transakcji,
+      add/update/delete, clear), repozytorium przekazuje widokom
+      jego poprzednią wersję, którą widok czyta od tej pory,
+    - zwracane obiekty są kopiami: późniejsze zatwierdzenia ich nie
+      zmieniają, a ich zmiany nie trafiają do repozytorium.
+    Interfejs odczytu jest taki jak w Repository (get/list/count/
+    find_by_pattern/export_to_json), więc widok można przekazać do
+    serwisu, np. LoanService(repo.snapshot()).list_overdue_loans().
+    Zmiany obiektów "w miejscu" są izolowane, gdy pisarz pobrał
+    obiekt w transakcji (tak działają serwisy) albo przez get().
+    Po zakończeniu raportu należy wywołać close() (lub użyć with),
+    aby repozytorium przestało przekazywać poprzednie wersje.
+    """
+
+    def __init__(self, repo: Any, version: int):
+        self.version = version
+        self._repo = repo
+        self._lock = threading.Lock()
+        # Poprzednie wersje rekordów zmienionych po utworzeniu widoku
+        # (MISSING — rekord dodany później).
+        self._before: Dict[Type, Dict[str, Any]] = {}
+        # Całe tabele odłączone od repozytorium przez clear().
+        self._detached: Dict[Type, Any] = {}
+        self._closed = False
+
+    def __enter__(self) -> "RepositorySnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """
+        Zamyka widok i zwalnia zapamiętane wersje rekordów.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._repo._release_snapshot(self)
+        with self._lock:
+            self._before.clear()
+            self._detached.clear()
+
+    def get(self, cls: Type, pk: str) -> Any:
+        """
+        Zwraca kopię obiektu o kluczu pk z chwili utworzenia widoku
+        lub None, jeśli wtedy nie istniał.
+        """
+        table = self._live_table(cls)
+        with self._lock:
+            obj = self._read(cls, pk, table)
+            return freeze(obj) if obj is not None else None
+
+    def list(self, cls: Type, **filters) -> List[Any]:
+        """
+        Zwraca kopie obiektów klasy cls z chwili utworzenia widoku,
+        opcjonalnie filtrowane jak w Repository.list().
+        Widok przegląda całą tabelę (indeksy opisują bieżący stan).
+        """
+        predicates = compile_filters(filters)
+        return self._scan(cls, lambda obj: matches_all(obj, predicates))
+
+    def list_books(self) -> List[Book]:
+        """
+        Alias dla list(Book).
+        """
+        return self.list(Book)
+
+    def count(self, cls: Type = None) -> int:
+        """
+        Zwraca liczbę rekordów klasy cls (lub wszystkich klas)
+        z chwili utworzenia widoku.
+        """
+        if cls:
+            return len(self._keys(cls))
+        return sum(self.count(cls_) for cls_ in self._classes())
+
+    def find_by_pattern(self, cls: Type, attr: str, pattern: str) -> List[Any]:
+        """
+        Jak Repository.find_by_pattern(), na stanie z chwili
+        utworzenia widoku.
+        """
+        pattern = pattern.lower()
+        return self._scan(cls, lambda obj: (
+            isinstance(getattr(obj, attr, ""), str)
+            and pattern in getattr(obj, attr).lower()
+        ))
+
+    def export_to_json(
+            self,
+            cls: Type,
+            filepath: str,
+            codec: Optional[Codec] = None,
+    ) -> None:
+        """
+        Eksportuje obiekty klasy cls z chwili utworzenia widoku
+        do pliku (format jak Repository.export_to_json(), domyślnie
+        kodekiem repozytorium).
+        Jeśli wystąpi błąd operacji, podnosi DataExportError.
+        """
+        codec = codec or self._repo.codec
+        try:
+            data = [codec.encode(obj) for obj in self.list(cls)]
+            with atomic_write(filepath, "wb") as f:
+                codec.dump(data, f)
+        except Exception as e:
+            raise DataExportError(
+                f"Failed to export {cls.__name__} "
+                f"to {filepath}: {e}"
+            ) from e
+
+    def _preserve(self, cls: Type, key: str, obj: Any) -> None:
+        """
+        Wywoływane przez repozytorium przed zmianą rekordu:
+        zapamiętuje jego wersję, jeśli widok jeszcze jej nie ma.
+        """
+        with self._lock:
+            if self._closed or cls in self._detached:
+                return
+            before = self._before.setdefault(cls, {})
+            if key not in before:
+                before[key] = obj if obj is MISSING else freeze(obj)
+
+    def _detach(self, cls: Type, table: Any) -> None:
+        """
+        Wywoływane przez repozytorium przed wyczyszczeniem tabeli cls:
+        widok przejmuje całą dotychczasową tabelę.
+        """
+        with self._lock:
+            if not self._closed and cls not in self._detached:
+                self._detached[cls] = table
+
+    def _scan(self, cls: Type, match: Callable[[Any], bool]) -> List[Any]:
+        table = self._live_table(cls)
+        result = []
+        for key in self._keys(cls, table):
+            with self._lock:
+                obj = self._read(cls, key, table)
+                if obj is not None and match(obj):
+                    result.append(freeze(obj))
+        return result
+
+    def _keys(self, cls: Type, table: Optional[Any] = None) -> List[str]:
+        """
+        Zwraca klucze rekordów istniejących w chwili utworzenia widoku.
+        """
+        if table is None:
+            table = self._live_table(cls)
+        with self._lock:
+            self._check_open()
+            source = self._detached.get(cls, table)
+            before = self._before.get(cls, {})
+            keys = [
+                key for key in list(source)
+                if before.get(key) is not MISSING
+            ]
+            keys.extend(
+                key for key, obj in before.items()
+                if obj is not MISSING and key not in source
+            )
+            return keys
+
+    def _read(self, cls: Type, key: str, table: Any) -> Any:
+        """
+        Zwraca (bez kopiowania) wersję rekordu widzianą przez widok.
+        Wywoływane pod blokadą widoku.
+        """
+        self._check_open()
+        obj = self._before.get(cls, {}).get(key, _LIVE)
+        if obj is MISSING:
+            return None
+        if obj is _LIVE:
+            obj = self._detached.get(cls, table).get(key)
+        return obj
+
+    def _live_table(self, cls: Type) -> Any:
+        self._check_open()
+        return self._repo._snapshot_table(cls)
+
+    def _classes(self) -> List[Type]:
+        with self._lock:
+            classes = [*self._detached, *self._before]
+        return list(dict.fromkeys([*self._repo._snapshot_classes(), *classes]))
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError("Snapshot is closed")
+
+
+def freeze(obj: Any, state: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Zwraca niezależną kopię obiektu (z kopiami kontenerów) — obecnego
+    stanu albo, jeśli podano, stanu state zapamiętanego w transakcji.
+    """
+    clone = copy.copy(obj)
+    if state is not None:
+        restore_state(clone, state)
+    restore_state(clone, snapshot_state(clone))
+    return clone
@@ -0,0 +1,171 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from biblioteka.storage.cursor import sort_value
+
+# Granice zakresu: (wartość, czy włącznie); None — brak ograniczenia.
+Bound = Optional[Tuple[Any, bool]]
+
+
+class Predicate(ABC):
+    """
+    Warunek na wartości atrybutu, przekazywany jako wartość filtra
+    do Repository.list()/iterate(), np.
+    repo.list(Book, publication_year=between(1990, 2000)).
+    Zwykła wartość filtra oznacza równość (eq).
+    Planista zapytań pyta warunek o wartości (indeks haszujący)
+    lub zakres (indeks posortowany), które może obsłużyć indeks.
+    """
+
+    @abstractmethod
+    def matches(self, value: Any) -> bool:
+        """
+        Czy wartość atrybutu spełnia warunek.
+        """
+
+    def values(self) -> Optional[Tuple[Any, ...]]:
+        """
+        Skończony zbiór pasujących wartości albo None.
+        """
+        return None
+
+    def bounds(self) -> Optional[Tuple[Bound, Bound]]:
+        """
+        Zakres pasujących wartości (dolna, górna granica) albo None.
+        """
+        return None
+
+
+class Eq(Predicate):
+    """Atrybut równy value."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def matches(self, value: Any) -> bool:
+        return value == self.value
+
+    def values(self) -> Tuple[Any, ...]:
+        return (self.value,)
+
+    def bounds(self) -> Optional[Tuple[Bound, Bound]]:
+        if self.value is None:
+            return None
+        return (self.value, True), (self.value, True)
+
+    def __repr__(self) -> str:
+        return f"eq({self.value!r})"
+
+
+class In(Predicate):
+    """Atrybut równy jednej z wartości."""
+
+    def __init__(self, values: Iterable[Any]):
+        self.options = tuple(values)
+
+    def matches(self, value: Any) -> bool:
+        return value in self.options
+
+    def values(self) -> Tuple[Any, ...]:
+        return self.options
+
+    def __repr__(self) -> str:
+        return f"in_({list(self.options)!r})"
+
+
+class Range(Predicate):
+    """
+    Atrybut w zakresie lower..upper (granice opcjonalne,
+    włącznie lub nie). Wartości porównywane są jak w SortedIndex
+    (cursor.sort_value() — enumy wg nazwy), więc wynik nie zależy
+    od planu zapytania. Wartości None i nieporównywalne nie pasują.
+    """
+
+    def __init__(self, lower: Bound = None, upper: Bound = None):
+        self.lower = lower
+        self.upper = upper
+        self._low = _sort_bound(lower)
+        self._high = _sort_bound(upper)
+
+    def matches(self, value: Any) -> bool:
+        if value is None:
+            return False
+        key = sort_value(value)
+        try:
+            if self._low is not None:
+                low, inclusive = self._low
+                if key < low or (key == low and not inclusive):
+                    return False
+            if self._high is not None:
+                high, inclusive = self._high
+                if key > high or (key == high and not inclusive):
+                    return False
+        except TypeError:
+            return False
+        return True
+
+    def bounds(self) -> Tuple[Bound, Bound]:
+        return self.lower, self.upper
+
+    def __repr__(self) -> str:
+        return f"Range({self.lower!r}, {self.upper!r})"
+
+
+def _sort_bound(bound: Bound) -> Bound:
+    """
+    Granica z wartością zamienioną na klucz sortowania (sort_value()).
+    """
+    if bound is None:
+        return None
+    value, inclusive = bound
+    return sort_value(value), inclusive
+
+
+def eq(value: Any) -> Predicate:
+    return Eq(value)
+
+
+def lt(value: Any) -> Predicate:
+    return Range(upper=(value, False))
+
+
+def le(value: Any) -> Predicate:
+    return Range(upper=(value, True))
+
+
+def gt(value: Any) -> Predicate:
+    return Range(lower=(value, False))
+
+
+def ge(value: Any) -> Predicate:
+    return Range(lower=(value, True))
+
+
+def between(low: Any, high: Any) -> Predicate:
+    """Zakres low..high, obie granice włącznie."""
+    return Range(lower=(low, True), upper=(high, True))
+
+
+def in_(values: Iterable[Any]) -> Predicate:
+    return In(values)
+
+
+def as_predicate(value: Any) -> Predicate:
+    """
+    Zamienia wartość filtra na warunek (zwykła wartość — równość).
+    """
+    return value if isinstance(value, Predicate) else Eq(value)
+
+
+def compile_filters(filters: Dict[str, Any]) -> List[Tuple[str, Predicate]]:
+    """
+    Zwraca filtry jako listę (atrybut, warunek).
+    """
+    return [(attr, as_predicate(value)) for attr, value in filters.items()]
+
+
+def matches_all(obj: Any, predicates: List[Tuple[str, Predicate]]) -> bool:
+    """
+    Sprawdza, czy obiekt spełnia wszystkie warunki.
+    """
+    return all(pred.matches(getattr(obj, attr)) for attr, pred in predicates)
@@ -1,9 +1,58 @@
-from typing import Any, Type, Dict, List, Callable
-import json
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from typing import (
+    Any, Type, Dict, List, Callable, Iterable, Iterator, Optional, Tuple,
+)
 import os
+import weakref
 
 from biblioteka.utils.exceptions import DataImportError, DataExportError
 from biblioteka.models.book import Book
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.storage.bulk import (
+    BatchItem,
+    BulkResult,
+    check_batch,
+    group_batch,
+)
+from biblioteka.storage.changes import (
+    ChangeBus,
+    ChangeEvent,
+    CLEAR,
+    DELETE,
+    INSERT,
+    UPDATE,
+)
+from biblioteka.storage.codecs import Codec, JsonCodec
+from biblioteka.storage.columnar import read_columnar, write_columnar
+from biblioteka.storage.cursor import (
+    parse_order,
+    smallest,
+    sort_value,
+    window,
+)
+from biblioteka.storage.fulltext import FullTextIndex
+from biblioteka.storage.indexes import HashIndex, SortedIndex, TrigramIndex
+from biblioteka.storage.journal import Journal
+from biblioteka.storage.keys import get_key
+from biblioteka.storage.mvcc import RepositorySnapshot, freeze
+from biblioteka.storage.query import Predicate, compile_filters, matches_all
+from biblioteka.storage.sharding import ShardedTable, write_sharded
+from biblioteka.storage.snapshot import (
+    SnapshotTable,
+    encode_record,
+    write_snapshot,
+)
+from biblioteka.storage.transaction import (
+    MISSING,
+    Transaction,
+    restore_state,
+)
+
+
+# Liczba rekordów importu dodawanych jednym add_many().
+IMPORT_BATCH_SIZE = 1000
 
 
 class Repository:
@@ -11,43 +60,493 @@ class Repository:
     Prosta warstwa dostępu do danych w pamięci,
     z możliwością eksportu/importu do pliku JSON.
     Przechowuje dane w strukturze: {Klasa: {klucz: obiekt, ...}, ...}
+    Opcjonalnie utrzymuje indeksy pomocnicze (HashIndex) dla wybranych
+    atrybutów, z których korzysta list() przy filtrach równościowych,
+    indeksy posortowane (SortedIndex) dla warunków zakresowych
+    (storage.query: lt/between/in_...), indeksy trigramowe
+    (TrigramIndex) dla find_by_pattern() i pełnotekstowe
+    (FullTextIndex) dla search().
+    snapshot() zwraca spójny widok do odczytu (RepositorySnapshot).
+    codec (storage.codecs, domyślnie zwarty JsonCodec) określa format
+    plików export_to_json()/import_from_json() i kodowanie wartości
+    typowanych (daty, enumy).
+    Zmiany rekordów publikowane są subskrybentom jako zdarzenia
+    (subscribe(), storage.changes).
     """
 
-    def __init__(self):
+    def __init__(
+            self,
+            indexes: Optional[Dict[Type, Iterable[str]]] = None,
+            text_indexes: Optional[Dict[Type, Iterable[str]]] = None,
+            sorted_indexes: Optional[Dict[Type, Iterable[str]]] = None,
+            codec: Optional[Codec] = None,
+    ):
         # Inicjalizuje puste repozytorium
+        self.codec: Codec = codec if codec is not None else JsonCodec()
         self._data: Dict[Type, Dict[str, Any]] = {}
+        self._indexes: Dict[Type, Dict[str, HashIndex]] = {}
+        self._text_indexes: Dict[Type, Dict[str, TrigramIndex]] = {}
+        self._sorted_indexes: Dict[Type, Dict[str, SortedIndex]] = {}
+        self._search_indexes: Dict[Type, FullTextIndex] = {}
+        self._journals: Dict[Type, Journal] = {}
+        self._loaders: Dict[Type, Callable[[], None]] = {}
+        # Klasy, których indeksy trzeba przebudować przed użyciem
+        # (np. po leniwym wczytaniu snapshotu binarnego).
+        self._stale_indexes: set = set()
+        self._tx: Optional[Transaction] = None
+        # Otwarte widoki snapshot() (słabe referencje) oraz numer
+        # wersji rosnący z każdą zatwierdzoną zmianą.
+        self._snapshots: tuple = ()
+        self._loading: set = set()
+        self._version = 0
+        # Obserwatorzy zmian rekordów (słabe referencje), np. ArrayTable.
+        self._watchers: tuple = ()
+        # Zdarzenia zmian dla subskrybentów subscribe().
+        self.changes = ChangeBus(self.codec)
+        # Zmiany od ostatniego flush(): klucze zmienionych rekordów
+        # oraz tabele do zapisania w całości (po clear()).
+        self._dirty: Dict[Type, Dict[str, None]] = {}
+        self._dirty_tables: Dict[Type, None] = {}
+        self._writers: Dict[Type, Tuple[Callable, bool]] = {}
+        for cls_, attrs in (indexes or {}).items():
+            for attr in attrs:
+                self.create_index(cls_, attr)
+        for cls_, attrs in (text_indexes or {}).items():
+            for attr in attrs:
+                self.create_text_index(cls_, attr)
+        for cls_, attrs in (sorted_indexes or {}).items():
+            for attr in attrs:
+                self.create_sorted_index(cls_, attr)
+
+    def register_loader(self, cls: Type, loader: Callable[[], None]) -> None:
+        """
+        Rejestruje leniwe wczytanie tabeli klasy cls:
+        loader() zostanie wywołany jednokrotnie, przy pierwszym
+        dostępie do tej tabeli (get/list/add/count/...).
+        Tabele, do których nikt nie sięga, nie są wczytywane.
+        """
+        self._loaders[cls] = loader
+
+    def is_loaded(self, cls: Type) -> bool:
+        """
+        Zwraca False, jeśli tabela klasy cls czeka jeszcze
+        na leniwe wczytanie.
+        """
+        return cls not in self._loaders
+
+    def needs_io(self) -> bool:
+        """
+        Zwraca True, jeśli kolejne operacje mogą czytać lub pisać pliki:
+        są tabele czekające na leniwe wczytanie albo podłączone dzienniki.
+        """
+        return bool(self._loaders or self._journals)
+
+    def may_block(self) -> bool:
+        """
+        Zwraca True, jeśli kolejne operacje mogą wstrzymać wywołujący
+        wątek (np. pętlę zdarzeń AsyncRepository): tu — gdy potrzebują
+        plików (needs_io()).
+        """
+        return self.needs_io()
+
+    @property
+    def version(self) -> int:
+        """
+        Numer wersji danych: rośnie o jeden z każdą zmianą poza
+        transakcją i z każdym commitem transakcji.
+        """
+        return self._version
+
+    def snapshot(self) -> RepositorySnapshot:
+        """
+        Zwraca spójny widok repozytorium tylko do odczytu,
+        z bieżącej (zatwierdzonej) wersji danych.
+        Utworzenie widoku nie kopiuje tabel: poprzednie wersje rekordów
+        trafiają do widoku dopiero przy ich zmianie, więc raport
+        czytający widok nie blokuje pisarzy i nie widzi ich zmian.
+        Wywołany w transakcji widok pomija jej niezatwierdzone zmiany.
+        """
+        snap = RepositorySnapshot(self, self._version)
+        if self._tx is not None:
+            for (cls, key), (orig, state) in self._tx.saved.items():
+                if orig is MISSING:
+                    snap._preserve(cls, key, MISSING)
+                else:
+                    snap._preserve(cls, key, freeze(orig, state))
+        self._snapshots = tuple(
+            ref for ref in self._snapshots if ref() is not None
+        ) + (weakref.ref(snap),)
+        return snap
+
+    def register_writer(
+            self,
+            cls: Type,
+            writer: Callable[[Optional[Dict[str, Any]]], None],
+            delta: bool = False,
+    ) -> None:
+        """
+        Rejestruje zapis tabeli klasy cls używany przez flush():
+        writer(None) zapisuje całą tabelę. Writer z delta=True
+        (np. dopisujący do dziennika) dostaje zamiast tego tylko
+        zmienione rekordy: {klucz: obiekt albo None dla usuniętego},
+        chyba że tabela była od ostatniego zapisu czyszczona.
+        """
+        self._writers[cls] = (writer, delta)
+
+    def is_dirty(self, cls: Type = None) -> bool:
+        """
+        Zwraca True, jeśli tabela klasy cls (lub dowolna tabela)
+        zmieniła się od ostatniego flush().
+        Zmiany w transakcji liczą się dopiero po jej zatwierdzeniu.
+        """
+        if cls:
+            return cls in self._dirty or cls in self._dirty_tables
+        return bool(self._dirty or self._dirty_tables)
+
+    def dirty_keys(self, cls: Type) -> List[str]:
+        """
+        Zwraca klucze rekordów klasy cls dodanych, zmienionych
+        lub usuniętych od ostatniego flush(), w kolejności zmian.
+        """
+        return list(self._dirty.get(cls, ()))
+
+    def flush(self) -> List[Type]:
+        """
+        Zapisuje tylko to, co się zmieniło od poprzedniego flush():
+        tabele bez zmian są pomijane, a writer z delta=True dostaje
+        wyłącznie zmienione rekordy (patrz register_writer()).
+        Tabele bez zarejestrowanego writera pozostają oznaczone
+        jako zmienione. Jeśli writer podniesie wyjątek, flush()
+        przerywa pracę, a niezapisane tabele pozostają zmienione.
+        Zwraca listę zapisanych klas.
+        Podnosi RuntimeError, jeśli wywołano ją w transakcji.
+        """
+        if self._tx is not None:
+            raise RuntimeError("flush() cannot run inside a transaction")
+        flushed = []
+        for cls in list(dict.fromkeys([*self._dirty, *self._dirty_tables])):
+            entry = self._writers.get(cls)
+            if entry is None:
+                continue
+            writer, delta = entry
+            if delta and cls not in self._dirty_tables:
+                table = self._table(cls)
+                writer({key: table.get(key) for key in self._dirty[cls]})
+            else:
+                writer(None)
+            self._dirty.pop(cls, None)
+            self._dirty_tables.pop(cls, None)
+            flushed.append(cls)
+        return flushed
+
+    def mark_clean(self, cls: Type = None) -> None:
+        """
+        Zapomina zmiany tabeli klasy cls (lub wszystkich tabel),
+        np. gdy zostały utrwalone poza flush().
+        """
+        if cls:
+            self._dirty.pop(cls, None)
+            self._dirty_tables.pop(cls, None)
+        else:
+            self._dirty.clear()
+            self._dirty_tables.clear()
+
+    def watch(self, watcher: Any) -> None:
+        """
+        Rejestruje obserwatora zmian (trzymanego przez słabą
+        referencję): po każdej zmianie rekordu (add/update/delete,
+        także wycofanej przez rollback transakcji) repozytorium
+        wywołuje watcher._changed(cls, key), a po wyczyszczeniu tabeli
+        watcher._cleared(cls) (cls None — wszystkie tabele).
+        Leniwe wczytywanie tabel nie jest zgłaszane.
+        """
+        self._watchers = tuple(
+            ref for ref in self._watchers if ref() is not None
+        ) + (weakref.ref(watcher),)
+
+    def unwatch(self, watcher: Any) -> None:
+        """
+        Wyrejestrowuje obserwatora zarejestrowanego przez watch().
+        """
+        self._watchers = tuple(
+            ref for ref in self._watchers
+            if ref() is not None and ref() is not watcher
+        )
+
+    def subscribe(
+            self,
+            callback: Callable[[ChangeEvent], None],
+            classes: Optional[Iterable[Type]] = None,
+    ) -> None:
+        """
+        Subskrybuje zdarzenia zmian (storage.changes.ChangeEvent)
+        rekordów wszystkich klas albo klas classes: po każdym
+        add/update/delete (w transakcji — po zatwierdzeniu, jedno
+        zdarzenie na rekord ze stanem sprzed i po transakcji;
+        wycofana transakcja niczego nie publikuje) oraz po clear().
+        old to stan rekordu sprzed zmiany: w transakcji — z chwili
+        pierwszego odczytu lub zmiany rekordu w niej, a poza nią —
+        obiekt zastąpiony przez update()/delete(); zmiana "w miejscu"
+        poza transakcją (ten sam obiekt zmieniony i przekazany
+        do update()) ma old None.
+        Leniwe wczytywanie tabel nie jest zgłaszane, a wczytanie
+        tabeli z pliku poza nim (load_snapshot(), import_columnar(),
+        load_sharded()) zgłaszane jest jako CLEAR.
+        EventLog(path) zapisuje zdarzenia do pliku.
+        """
+        self.changes.subscribe(callback, classes)
+
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        """
+        Wyrejestrowuje subskrybenta zarejestrowanego przez subscribe().
+        """
+        self.changes.unsubscribe(callback)
+
+    def create_index(self, cls: Type, attr: str) -> None:
+        """
+        Deklaruje indeks pomocniczy dla atrybutu attr klasy cls.
+        Indeks jest od razu budowany z istniejących obiektów,
+        a następnie utrzymywany przez add/update/delete/clear.
+        """
+        cls_indexes = self._indexes.setdefault(cls, {})
+        if attr in cls_indexes:
+            return
+        index = HashIndex(attr)
+        if cls not in self._stale_indexes:
+            for key, obj in self._data.get(cls, {}).items():
+                index.add(key, obj)
+        cls_indexes[attr] = index
+
+    def create_text_index(self, cls: Type, attr: str) -> None:
+        """
+        Deklaruje indeks trigramowy dla tekstowego atrybutu attr
+        klasy cls, używany przez find_by_pattern().
+        Utrzymywany tak jak indeksy z create_index().
+        """
+        cls_indexes = self._text_indexes.setdefault(cls, {})
+        if attr in cls_indexes:
+            return
+        index = TrigramIndex(attr)
+        if cls not in self._stale_indexes:
+            for key, obj in self._data.get(cls, {}).items():
+                index.add(key, obj)
+        cls_indexes[attr] = index
+
+    def create_sorted_index(
+            self,
+            cls: Type,
+            attr: str,
+            where: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Deklaruje indeks posortowany dla atrybutu attr klasy cls,
+        używany przez list()/iterate() przy warunkach zakresowych
+        i równościowych. Utrzymywany tak jak indeksy z create_index().
+        Z where={atrybut: wartość} indeks jest częściowy: obejmuje
+        tylko pasujące obiekty, a planista używa go wyłącznie
+        w zapytaniach zawierających te same filtry równościowe.
+        Ponowna deklaracja z tym samym where niczego nie zmienia;
+        z innym where podnosi ValueError (atrybut ma jeden indeks
+        posortowany).
+        """
+        cls_indexes = self._sorted_indexes.setdefault(cls, {})
+        existing = cls_indexes.get(attr)
+        if existing is not None:
+            if existing.where != dict(where or {}):
+                raise ValueError(
+                    f"Sorted index on {cls.__name__}.{attr} already exists "
+                    f"with where={existing.where!r}"
+                )
+            return
+        index = SortedIndex(attr, where)
+        if cls not in self._stale_indexes:
+            index.add_many(self._data.get(cls, {}).items())
+        cls_indexes[attr] = index
+
+    def create_search_index(
+            self,
+            cls: Type,
+            attrs: Iterable[str],
+    ) -> FullTextIndex:
+        """
+        Buduje indeks pełnotekstowy klasy cls nad atrybutami attrs
+        z bieżącej zawartości tabeli i zwraca go.
+        Dalej indeks jest aktualizowany przy add/update/delete.
+        """
+        index = FullTextIndex(attrs)
+        for key, obj in self._table(cls).items():
+            index.add(key, obj)
+        self._search_indexes[cls] = index
+        return index
+
+    def attach_search_index(self, cls: Type, index: FullTextIndex) -> None:
+        """
+        Podłącza gotowy indeks pełnotekstowy (np. wczytany
+        FullTextIndex.load()) bez przebudowy. Indeks musi odpowiadać
+        bieżącej zawartości tabeli klasy cls.
+        """
+        self._table(cls)
+        self._search_indexes[cls] = index
+
+    def search_index(self, cls: Type) -> Optional[FullTextIndex]:
+        """
+        Zwraca indeks pełnotekstowy klasy cls lub None.
+        """
+        return self._search_indexes.get(cls)
+
+    def search(self, cls: Type, query: str, limit: int = 10) -> List[Any]:
+        """
+        Wyszukiwanie pełnotekstowe: zwraca do limit obiektów klasy cls
+        najlepiej pasujących do query (ranking BM25).
+        Podnosi KeyError, jeśli klasa nie ma indeksu pełnotekstowego.
+        """
+        index = self._search_indexes.get(cls)
+        if index is None:
+            raise KeyError(f"No search index for {cls.__name__}")
+        table = self._table(cls)
+        keys = [key for key, _ in index.search(query, limit) if key in table]
+        for key in keys:
+            self._track(cls, key, table[key])
+        return [table[key] for key in keys]
+
+    def indexed_attrs(self, cls: Type) -> List[str]:
+        """
+        Zwraca listę atrybutów klasy cls, dla których istnieje indeks.
+        """
+        return list(self._indexes.get(cls, {}))
 
     def add(self, obj: Any) -> None:
         """
         Dodaje nowy obiekt do repozytorium.
-        Klucz wyznaczany jest dynamicznie (_get_pk).
+        Klucz wyznaczany jest przez storage.keys.get_key().
         Podnosi KeyError, jeśli rekord o tym kluczu już istnieje.
         """
         cls_ = type(obj)
-        table = self._data.setdefault(cls_, {})
-        key = self._get_pk(obj)
+        table = self._table(cls_)
+        key = get_key(obj)
         if key in table:
             raise KeyError(f"{cls_.__name__} with key {key} already exists")
+        self._track(cls_, key, MISSING)
+        self._journal_append(cls_, "add", key, obj)
         table[key] = obj
+        self._index_add(cls_, key, obj)
+        self._notify(cls_, key)
+        self._publish(INSERT, cls_, key, None, obj)
 
     def get(self, cls: Type, pk: str) -> Any:
         """
         Zwraca obiekt danego typu o podanym kluczu.
         Jeśli nie istnieje, zwraca None.
         """
-        return self._data.get(cls, {}).get(pk)
+        obj = self._table(cls).get(pk)
+        if obj is not None:
+            self._track(cls, pk, obj)
+        return obj
 
     def list(self, cls: Type, **filters) -> List[Any]:
         """
         Zwraca wszystkie obiekty danego typu.
-        Jeśli podano filtry (atrybut=wartość), zwraca tylko obiekty,
-        których atrybuty dokładnie pasują do filtrów.
+        Jeśli podano filtry, zwraca tylko obiekty, których atrybuty
+        pasują do filtrów: zwykła wartość oznacza równość, a warunek
+        z storage.query (lt, between, in_, ...) — porównanie lub zakres.
+        Planista (explain()) wybiera indeks o najmniejszej szacowanej
+        liczbie kandydatów; pozostałe warunki sprawdzane są
+        tylko na kandydatach, a bez indeksu — na całej tabeli.
         """
-        result = list(self._data.get(cls, {}).values())
-        for attr, value in filters.items():
-            result = [obj for obj in result if getattr(obj, attr) == value]
+        table = self._table(cls)
+        predicates = compile_filters(filters)
+        keys = self._index_candidates(cls, predicates)
+        if keys is not None:
+            result = [table[key] for key in keys if key in table]
+        else:
+            result = list(table.values())
+        # Warunek obsłużony przez indeks też jest sprawdzany: obiekt
+        # zmieniony "w miejscu" bez update() ma w indeksie starą wartość.
+        for attr, pred in predicates:
+            result = [obj for obj in result if pred.matches(getattr(obj, attr))]
+        if self._tx is not None:
+            for obj in result:
+                self._track(cls, get_key(obj), obj)
         return result
 
+    def explain(self, cls: Type, **filters) -> Dict[str, Any]:
+        """
+        Opisuje plan zapytania list(cls, **filters):
+        {"index": atrybut lub None, "kind": "hash" / "sorted" / "scan",
+        "candidates": szacowana liczba sprawdzanych obiektów}.
+        """
+        plan = self._plan(cls, compile_filters(filters))
+        if plan is None:
+            return {
+                "index": None,
+                "kind": "scan",
+                "candidates": len(self._table(cls)),
+            }
+        size, attr, kind, _ = plan
+        return {"index": attr, "kind": kind, "candidates": size}
+
+    def iterate(
+            self,
+            cls: Type,
+            *,
+            order_by: Optional[str] = None,
+            after_key: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            **filters,
+    ) -> Iterator[Any]:
+        """
+        Leniwa iteracja (kursor) po obiektach klasy cls pasujących
+        do filtrów, tak jak w list():
+        - order_by — atrybut sortowania ("-atrybut" malejąco, None na
+          końcu); bez order_by i after_key obowiązuje kolejność tabeli,
+        - after_key — klucz ostatniego obiektu poprzedniej strony:
+          iteracja zaczyna się tuż za nim w porządku order_by
+          (domyślnie wg klucza), więc strony nie przesuwają się
+          przy dodawaniu i usuwaniu rekordów,
+        - offset — liczba pomijanych obiektów, limit — maksymalna
+          liczba zwracanych.
+        Pamięć zależy od offset+limit, a nie od rozmiaru tabeli:
+        w kolejności tabeli obiekty pobierane są na bieżąco,
+        a przy sortowaniu wybierane kopcem.
+        Tabeli nie należy zmieniać przed wyczerpaniem iteratora.
+        Podnosi KeyError, jeśli rekord after_key nie istnieje,
+        i ValueError dla ujemnego offset lub limit.
+        """
+        table = self._table(cls)
+        attr, descending = parse_order(order_by)
+        if attr is None and after_key is None:
+            if filters:
+                pairs = window(self._select(cls, filters), offset, limit)
+            else:
+                pairs = (
+                    (key, table[key])
+                    for key in window(iter(table), offset, limit)
+                )
+        else:
+            def sort_key(pair: Tuple[str, Any]) -> Tuple:
+                key, obj = pair
+                if attr is None:
+                    return (key,)
+                return sort_value(getattr(obj, attr)), key
+
+            pairs = self._select(cls, filters)
+            if after_key is not None:
+                if after_key not in table:
+                    raise KeyError(
+                        f"{cls.__name__} with key {after_key} not found"
+                    )
+                bound = sort_key((after_key, table[after_key]))
+                pairs = (
+                    pair for pair in pairs
+                    if (sort_key(pair) < bound if descending
+                        else sort_key(pair) > bound)
+                )
+            pairs = smallest(pairs, sort_key, descending, offset, limit)
+        if self._tx is None:
+            return (obj for _, obj in pairs)
+        return self._tracked(cls, pairs)
+
     def list_books(self) -> List[Book]:
         """
         Zwraca wszystkie obiekty Book z repozytorium.
@@ -62,32 +561,139 @@ class Repository:
         Podnosi KeyError, jeśli obiekt nie istnieje.
         """
         cls_ = type(obj)
-        table = self._data.get(cls_, {})
-        key = self._get_pk(obj)
+        table = self._table(cls_)
+        key = get_key(obj)
         if key not in table:
             raise KeyError(f"{cls_.__name__} with key {key} not found")
+        prev = table[key]
+        self._track(cls_, key, prev)
+        self._journal_append(cls_, "update", key, obj)
         table[key] = obj
+        self._index_add(cls_, key, obj)
+        self._notify(cls_, key)
+        self._publish(UPDATE, cls_, key, prev, obj)
 
     def delete(self, cls: Type, pk: str) -> None:
         """
         Usuwa obiekt danego typu o kluczu pk.
         Podnosi KeyError, jeśli rekord nie istnieje.
         """
-        table = self._data.get(cls, {})
+        table = self._table(cls)
         if pk not in table:
             raise KeyError(f"{cls.__name__} with key {pk} not found")
+        prev = table[pk]
+        self._track(cls, pk, prev)
+        self._journal_append(cls, "delete", pk)
         del table[pk]
+        self._index_remove(cls, pk)
+        self._notify(cls, pk)
+        self._publish(DELETE, cls, pk, prev, None)
+
+    def add_many(self, objs: Iterable[Any]) -> BulkResult:
+        """
+        Dodaje wiele obiektów (także różnych klas) naraz — jak add()
+        w pętli, ale klucze partii sprawdzane są jednym przejściem,
+        dziennik dostaje jeden zapis na tabelę, a indeksy aktualizowane
+        są zbiorczo (add_many()).
+        Obiekty bez klucza, z kluczem powtórzonym w partii lub już
+        istniejącym są odrzucane (BulkResult.errors), a pozostałe
+        dodawane. Poza transakcją wersja rośnie o jeden na tabelę.
+        """
+        result = BulkResult()
+        for cls, items in group_batch(objs, result).items():
+            self._bulk(cls, "add", items, result)
+        result.errors.sort(key=lambda error: error[0])
+        return result
+
+    def update_many(self, objs: Iterable[Any]) -> BulkResult:
+        """
+        Nadpisuje wiele istniejących obiektów naraz, jak add_many();
+        obiekty nieistniejące trafiają do BulkResult.errors.
+        """
+        result = BulkResult()
+        for cls, items in group_batch(objs, result).items():
+            self._bulk(cls, "update", items, result)
+        result.errors.sort(key=lambda error: error[0])
+        return result
+
+    def delete_many(self, cls: Type, pks: Iterable[str]) -> BulkResult:
+        """
+        Usuwa obiekty klasy cls o kluczach pks naraz, jak add_many();
+        nieistniejące klucze trafiają do BulkResult.errors.
+        """
+        result = BulkResult()
+        items = [(pos, pk, None) for pos, pk in enumerate(pks)]
+        self._bulk(cls, "delete", items, result)
+        return result
+
+    @contextmanager
+    def transaction(self) -> Iterator["Repository"]:
+        """
+        Unit of work dla operacji obejmujących wiele obiektów:
+        - obiekty pobrane (get/list) lub zmienione (add/update/delete)
+          w bloku są zapamiętywane przy pierwszym dotknięciu,
+        - wyjątek w bloku wycofuje stan w pamięci (atrybuty obiektów,
+          zawartość tabel i indeksów) i jest przekazywany dalej,
+        - po sukcesie wszystkie zmienione rekordy zapisywane są
+          do dzienników jednym zbiorczym zapisem na tabelę.
+        Zagnieżdżona transakcja dołącza do zewnętrznej.
+        """
+        if self._tx is not None:
+            yield self
+            return
+        tx = Transaction()
+        self._tx = tx
+        try:
+            yield self
+        except BaseException:
+            self._tx = None
+            self._rollback(tx)
+            raise
+        self._tx = None
+        self._commit(tx)
 
     def clear(self, cls: Type = None) -> None:
         """
         Czyści repozytorium:
         - Jeśli podano cls, usuwa tylko dane dla tej klasy.
         - W przeciwnym razie czyści wszystkie dane.
+        Zadeklarowane indeksy pozostają, ale są opróżniane.
         """
+        if cls not in self._loading:
+            self._version += 1
+            for cls_ in [cls] if cls else self._snapshot_classes():
+                self._dirty.pop(cls_, None)
+                self._dirty_tables[cls_] = None
         if cls:
+            self._detach(cls)
             self._data.pop(cls, None)
+            self._loaders.pop(cls, None)
+            self._stale_indexes.discard(cls)
+            for index in self._all_indexes(cls):
+                index.clear()
+            if cls in self._search_indexes:
+                self._search_indexes[cls].clear()
+            self._notify_cleared(cls)
         else:
+            for cls_ in self._snapshot_classes():
+                self._detach(cls_)
             self._data.clear()
+            self._loaders.clear()
+            self._stale_indexes.clear()
+            for cls_ in (
+                    set(self._indexes)
+                    | set(self._sorted_indexes)
+                    | set(self._text_indexes)
+            ):
+                for index in self._all_indexes(cls_):
+                    index.clear()
+            for index in self._search_indexes.values():
+                index.clear()
+            self._notify_cleared(None)
+        if self.changes.active and cls not in self._loading:
+            self.changes.publish(
+                ChangeEvent(CLEAR, cls, None, None, None, self._version)
+            )
 
     def count(self, cls: Type = None) -> int:
         """
@@ -96,26 +702,30 @@ class Repository:
         - lub rekordów danej klasy, jeśli cls podano.
         """
         if cls:
-            return len(self._data.get(cls, {}))
+            return len(self._table(cls))
+        for cls_ in list(self._loaders):
+            self._table(cls_)
         return sum(len(tbl) for tbl in self._data.values())
 
-    def export_to_json(self, cls: Type, filepath: str) -> None:
+    def export_to_json(
+            self,
+            cls: Type,
+            filepath: str,
+            codec: Optional[Codec] = None,
+    ) -> None:
         """
-        Eksportuje wszystkie obiekty danej klasy do pliku JSON.
+        Eksportuje wszystkie obiekty danej klasy do pliku
+        w formacie kodeka codec (domyślnie self.codec).
         Obiekt musi być dataclassą lub mieć __dict__.
+        Zapis jest atomowy (storage.atomic): przerwany eksport
+        zostawia poprzednią wersję pliku.
         Jeśli wystąpi błąd operacji, podnosi DataExportError.
         """
+        codec = codec or self.codec
         try:
-            data = []
-            for obj in self.list(cls):
-                if hasattr(obj, "__dict__"):
-                    data.append(obj.__dict__)
-                else:
-                    raise TypeError(
-                        f"Cannot serialize object of type {type(obj).__name__}"
-                    )
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, default=str, indent=2)
+            data = [codec.encode(obj) for obj in self.list(cls)]
+            with atomic_write(filepath, "wb") as f:
+                codec.dump(data, f)
         except Exception as e:
             raise DataExportError(
                 f"Failed to export {cls.__name__} "
@@ -126,37 +736,319 @@ class Repository:
             self,
             cls: Type,
             filepath: str,
-            factory: Callable[[dict], Any],
+            factory: Optional[Callable[[dict], Any]] = None,
+            progress: Optional[Callable[[int, int, int], None]] = None,
+            codec: Optional[Codec] = None,
     ) -> None:
         """
-        Importuje dane z pliku JSON:
+        Importuje dane z pliku w formacie kodeka codec
+        (domyślnie self.codec):
         - Sprawdza istnienie pliku, inaczej podnosi DataImportError.
-        - Wczytuje listę słowników, tworzy obiekty przez factory(rec).
-        - Czyści wcześniejsze dane i dodaje nowe.
+        - Czyści wcześniejsze dane.
+        - Parsuje plik rekord po rekordzie (strumieniowo, jeśli kodek
+          na to pozwala): słowniki zamieniane są przez factory(rec)
+          na obiekty i dodawane porcjami po IMPORT_BATCH_SIZE
+          (add_many()). Bez factory obiekty tworzy kodek
+          (Codec.decode()) wg schematu klasy cls.
+        - Jeśli podano progress, wywołuje progress(rekordy, bajty, rozmiar)
+          po każdej wczytanej porcji pliku oraz na końcu importu.
         Jeśli wystąpi błąd parsowania lub
         tworzenia obiektów, podnosi DataImportError.
         """
         if not os.path.isfile(filepath):
             raise DataImportError(f"No such file: {filepath}")
+        codec = codec or self.codec
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                records = json.load(f)
-            self.clear(cls)
-            for rec in records:
-                obj = factory(rec)
-                self.add(obj)
+            if factory is None:
+                factory = codec.factory(cls)
+            total = os.path.getsize(filepath)
+            with open(filepath, "rb") as f:
+                records = codec.load(f)
+                self.clear(cls)
+                # Indeksy budowane są raz, po imporcie (add_many()),
+                # a nie rekord po rekordzie.
+                if self._all_indexes(cls):
+                    self._stale_indexes.add(cls)
+                count = 0
+                reported = 0
+                while True:
+                    batch = [
+                        factory(rec)
+                        for rec in islice(records, IMPORT_BATCH_SIZE)
+                    ]
+                    if not batch:
+                        break
+                    self.add_many(batch).raise_first()
+                    count += len(batch)
+                    if progress and f.tell() != reported:
+                        reported = f.tell()
+                        progress(count, reported, total)
+            if progress:
+                progress(count, total, total)
         except Exception as e:
             raise DataImportError(
                 f"Failed to import {cls.__name__} "
                 f"from {filepath}: {e}"
             ) from e
 
+    def attach_journal(self, cls: Type, journal: Journal) -> None:
+        """
+        Włącza tryb dziennika dla klasy cls:
+        każda kolejna mutacja add/update/delete
+        jest najpierw dopisywana do journal.
+        """
+        self._journals[cls] = journal
+
+    def detach_journal(self, cls: Type) -> Optional[Journal]:
+        """
+        Wyłącza tryb dziennika dla klasy cls.
+        Zwraca odłączony dziennik lub None.
+        """
+        return self._journals.pop(cls, None)
+
+    def journal_for(self, cls: Type) -> Optional[Journal]:
+        """
+        Zwraca dziennik przypisany do klasy cls lub None.
+        """
+        return self._journals.get(cls)
+
+    def load_journaled(
+            self,
+            cls: Type,
+            snapshot_path: str,
+            journal: Journal,
+            factory: Callable[[dict], Any],
+    ) -> None:
+        """
+        Odtwarza tabelę klasy cls w trybie dziennika:
+        - wczytuje snapshot JSON (jeśli istnieje),
+        - odtwarza kolejno wpisy dziennika,
+        - podłącza dziennik do dalszych mutacji.
+        Jeśli snapshot lub dziennik są uszkodzone, podnosi DataImportError.
+        """
+        self.detach_journal(cls)
+        if os.path.isfile(snapshot_path):
+            self.import_from_json(cls, snapshot_path, factory)
+        else:
+            self.clear(cls)
+        try:
+            table = self._table(cls)
+            for rec in journal.records():
+                key = rec["key"]
+                if rec["op"] == "delete":
+                    if table.pop(key, None) is not None:
+                        self._index_remove(cls, key)
+                else:
+                    table[key] = factory(rec["data"])
+                    self._index_add(cls, key, table[key])
+        except Exception as e:
+            raise DataImportError(
+                f"Failed to replay journal {journal.path} "
+                f"for {cls.__name__}: {e}"
+            ) from e
+        self.attach_journal(cls, journal)
+
+    def compact_journal(self, cls: Type, snapshot_path: str) -> None:
+        """
+        Kompakcja dziennika: zapisuje pełny snapshot tabeli
+        do snapshot_path i opróżnia dziennik klasy cls.
+        Podnosi KeyError, jeśli klasa nie ma podłączonego dziennika.
+        """
+        journal = self._journals.get(cls)
+        if journal is None:
+            raise KeyError(f"No journal attached for {cls.__name__}")
+        self.export_to_json(cls, snapshot_path)
+        journal.truncate()
+
+    def export_snapshot(self, cls: Type, filepath: str) -> None:
+        """
+        Zapisuje tabelę klasy cls do snapshotu binarnego
+        (format z modułu storage.snapshot).
+        Jeśli tabela pochodzi ze snapshotu, niezmienione rekordy
+        kopiowane są bez dekodowania, a tabela przełącza się
+        na nowy plik.
+        Jeśli wystąpi błąd operacji, podnosi DataExportError.
+        """
+        table = self._table(cls)
+        try:
+            if isinstance(table, SnapshotTable):
+                # Na POSIX stare mapowanie pozostaje ważne po podmianie
+                # pliku, więc tabela przełącza się na nowy plik dopiero
+                # po udanym zapisie. Windows nie podmieni zmapowanego
+                # pliku: tam mapowanie zamykane jest tuż przed podmianą
+                # i odtwarzane, jeśli zapis się nie powiódł.
+                posix = os.name == "posix"
+                try:
+                    write_snapshot(
+                        filepath, cls, table.encoded_records(),
+                        before_replace=None if posix else table.close,
+                    )
+                except BaseException:
+                    if table.closed:
+                        table.reopen()
+                    raise
+                table.rebase(filepath)
+            else:
+                write_snapshot(filepath, cls, (
+                    (key, encode_record(cls, key, obj))
+                    for key, obj in table.items()
+                ))
+        except Exception as e:
+            raise DataExportError(
+                f"Failed to export {cls.__name__} "
+                f"snapshot to {filepath}: {e}"
+            ) from e
+
+    def load_snapshot(self, cls: Type, filepath: str) -> None:
+        """
+        Podpina snapshot binarny jako tabelę klasy cls.
+        Plik jest mapowany w pamięci (mmap) i czytany leniwie:
+        rekord dekodowany jest dopiero przy pierwszym dostępie,
+        a indeksy budowane przy pierwszym zapytaniu z filtrem.
+        Istniejący indeks pełnotekstowy jest przebudowywany od razu.
+        Jeśli plik nie istnieje lub jest niepoprawny,
+        podnosi DataImportError.
+        """
+        if not os.path.isfile(filepath):
+            raise DataImportError(f"No such file: {filepath}")
+        try:
+            table = SnapshotTable(filepath, cls)
+        except Exception as e:
+            raise DataImportError(
+                f"Failed to import {cls.__name__} "
+                f"snapshot from {filepath}: {e}"
+            ) from e
+        self.clear(cls)
+        self._data[cls] = table
+        if self._all_indexes(cls):
+            self._stale_indexes.add(cls)
+        search_index = self._search_indexes.get(cls)
+        if search_index is not None:
+            for key, obj in table.items():
+                search_index.add(key, obj)
+
+    def export_columnar(
+            self,
+            cls: Type,
+            filepath: str,
+            compression: str = "zlib",
+    ) -> None:
+        """
+        Zapisuje tabelę klasy cls w formacie kolumnowym
+        (moduł storage.columnar), skompresowanym kodekiem
+        compression: "zlib" (domyślnie), "lzma" lub "none".
+        Jeśli wystąpi błąd operacji, podnosi DataExportError.
+        """
+        try:
+            write_columnar(
+                filepath, cls, self._table(cls).items(), compression,
+            )
+        except Exception as e:
+            raise DataExportError(
+                f"Failed to export {cls.__name__} "
+                f"columns to {filepath}: {e}"
+            ) from e
+
+    def import_columnar(self, cls: Type, filepath: str) -> None:
+        """
+        Importuje tabelę klasy cls z pliku kolumnowego
+        (zapisanego przez export_columnar()), zastępując
+        wcześniejsze dane. Obiekty odtwarzane są z zapisanych
+        wartości, bez fabryki i walidacji konstruktora.
+        Jeśli plik nie istnieje lub jest niepoprawny,
+        podnosi DataImportError.
+        """
+        if not os.path.isfile(filepath):
+            raise DataImportError(f"No such file: {filepath}")
+        try:
+            records = read_columnar(filepath, cls)
+        except Exception as e:
+            raise DataImportError(
+                f"Failed to import {cls.__name__} "
+                f"columns from {filepath}: {e}"
+            ) from e
+        self.clear(cls)
+        for _, obj in records:
+            self.add(obj)
+
+    def export_sharded(
+            self,
+            cls: Type,
+            directory: str,
+            shards: Optional[int] = None,
+            keys: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Zapisuje tabelę klasy cls do katalogu shardów
+        (storage.sharding): rekordy rozdzielane są na shards plików
+        JSON wg skrótu klucza, a manifest opisuje podział.
+        Z keys (np. dirty_keys()) przepisywane są tylko shardy
+        zawierające te klucze.
+        Jeśli wystąpi błąd operacji, podnosi DataExportError.
+        """
+        try:
+            write_sharded(
+                directory, cls, self._table(cls), self._serialize,
+                shards, keys,
+            )
+        except Exception as e:
+            raise DataExportError(
+                f"Failed to export {cls.__name__} "
+                f"shards to {directory}: {e}"
+            ) from e
+
+    def load_sharded(
+            self,
+            cls: Type,
+            directory: str,
+            factory: Callable[[dict], Any],
+            workers: int = 1,
+    ) -> None:
+        """
+        Podpina katalog shardów jako tabelę klasy cls
+        (ShardedTable): shard wczytywany jest przy pierwszym dostępie
+        do jego klucza, więc get() jednego rekordu parsuje jeden plik.
+        Z workers > 1 wszystkie shardy wczytywane są od razu,
+        parsowane równolegle w workers procesach.
+        Indeksy budowane są przy pierwszym zapytaniu z filtrem,
+        a istniejący indeks pełnotekstowy przebudowywany od razu.
+        Jeśli manifestu nie ma lub shardy są niepoprawne,
+        podnosi DataImportError.
+        """
+        try:
+            table = ShardedTable(directory, cls, factory)
+            if workers > 1:
+                table.load_all(workers)
+        except Exception as e:
+            raise DataImportError(
+                f"Failed to import {cls.__name__} "
+                f"shards from {directory}: {e}"
+            ) from e
+        self.clear(cls)
+        self._data[cls] = table
+        if self._all_indexes(cls):
+            self._stale_indexes.add(cls)
+        search_index = self._search_indexes.get(cls)
+        if search_index is not None:
+            for key, obj in table.items():
+                search_index.add(key, obj)
+
     def find_by_pattern(self, cls: Type, attr: str, pattern: str) -> List[Any]:
         """
         Wyszukuje obiekty, których wartość
         atrybutu attr (str) zawiera fragment pattern.
         Porównanie ignoruje wielkość liter.
+        Jeśli dla attr istnieje indeks trigramowy, sprawdzani są
+        tylko kandydaci z przecięcia list trigramów.
         """
+        index = self._text_indexes.get(cls, {}).get(attr)
+        if index is not None:
+            table = self._table(cls)
+            self._ensure_indexes(cls)
+            keys = [key for key in index.search(pattern) if key in table]
+            for key in keys:
+                self._track(cls, key, table[key])
+            return [table[key] for key in keys]
         result = []
         for obj in self.list(cls):
             value = getattr(obj, attr, "")
@@ -164,21 +1056,457 @@ class Repository:
                 result.append(obj)
         return result
 
-    @staticmethod
-    def _get_pk(obj: Any) -> str:
-        """
-        Wydobywa wartość klucza głównego z obiektu:
-        próbuje kolejno atrybuty: loan_id,
-        reservation_id, user_id, member_id, isbn.
-        Podnosi ValueError, jeśli żaden klucz nie istnieje.
-        """
-        for attr in (
-                "loan_id",
-                "reservation_id",
-                "user_id",
-                "member_id",
-                "isbn",
+    def _table(self, cls: Type) -> Dict[str, Any]:
+        """
+        Zwraca tabelę klasy cls, uruchamiając najpierw jej
+        zarejestrowany loader (jeśli tabela nie była jeszcze wczytana).
+        """
+        loader = self._loaders.pop(cls, None)
+        if loader is not None:
+            # Wczytanie odtwarza istniejący stan, więc nie jest
+            # zmianą widoczną dla snapshot().
+            self._loading.add(cls)
+            try:
+                loader()
+            finally:
+                self._loading.discard(cls)
+        return self._data.setdefault(cls, {})
+
+    def _plan(
+            self,
+            cls: Type,
+            predicates: List[Tuple[str, Predicate]],
+    ) -> Optional[Tuple[int, str, str, Callable[[], List[str]]]]:
+        """
+        Planista zapytań: dla każdego warunku, który może obsłużyć
+        indeks (haszujący — skończony zbiór wartości, posortowany —
+        zakres), szacuje liczbę kandydatów i wybiera najmniejszą.
+        Zwraca (liczba, atrybut, rodzaj indeksu, pobranie kluczy)
+        albo None, gdy żaden warunek nie ma indeksu.
+        """
+        hash_indexes = self._indexes.get(cls, {})
+        sorted_indexes = self._sorted_indexes.get(cls, {})
+        if not any(
+                attr in hash_indexes or attr in sorted_indexes
+                for attr, _ in predicates
         ):
-            if hasattr(obj, attr):
-                return getattr(obj, attr)
-        raise ValueError(f"Unsupported object type {type(obj).__name__}")
+            return None
+        self._ensure_indexes(cls)
+        equal = {attr: pred.values() for attr, pred in predicates}
+        best = None
+        for attr, pred in predicates:
+            values = pred.values()
+            if values is not None and attr in hash_indexes:
+                index = hash_indexes[attr]
+                size = sum(index.size_of(value) for value in values)
+                if best is None or size < best[0]:
+                    best = (size, attr, "hash", partial(
+                        index.lookup_many, values,
+                    ))
+            bounds = pred.bounds()
+            if bounds is not None and attr in sorted_indexes:
+                index = sorted_indexes[attr]
+                if any(
+                        equal.get(name) != (value,)
+                        for name, value in index.where.items()
+                ):
+                    continue
+                try:
+                    size = index.size_of_range(*bounds)
+                except TypeError:
+                    continue
+                if best is None or size < best[0]:
+                    best = (size, attr, "sorted", partial(
+                        index.range, *bounds,
+                    ))
+        return best
+
+    def _index_candidates(
+            self,
+            cls: Type,
+            predicates: List[Tuple[str, Predicate]],
+    ) -> Optional[List[str]]:
+        """
+        Zwraca klucze kandydatów z indeksu wybranego przez planistę
+        albo None, gdy żaden z warunków nie ma indeksu.
+        """
+        plan = self._plan(cls, predicates)
+        return plan[3]() if plan is not None else None
+
+    def _select(
+            self,
+            cls: Type,
+            filters: Dict[str, Any],
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Leniwie zwraca pary (klucz, obiekt) pasujące do filtrów;
+        kandydaci pochodzą z indeksu, jeśli jest dostępny.
+        """
+        table = self._table(cls)
+        predicates = compile_filters(filters)
+        keys = self._index_candidates(cls, predicates)
+        for key in table if keys is None else keys:
+            obj = table.get(key)
+            if obj is not None and matches_all(obj, predicates):
+                yield key, obj
+
+    def _tracked(
+            self,
+            cls: Type,
+            pairs: Iterable[Tuple[str, Any]],
+    ) -> Iterator[Any]:
+        """
+        Zwraca obiekty z par (klucz, obiekt), rejestrując je
+        w bieżącej transakcji.
+        """
+        for key, obj in pairs:
+            self._track(cls, key, obj)
+            yield obj
+
+    def _journal_append(
+            self,
+            cls: Type,
+            op: str,
+            key: str,
+            obj: Any = None,
+    ) -> None:
+        """
+        Dopisuje mutację do dziennika klasy cls (jeśli jest podłączony).
+        W transakcji zapis jest odkładany do commitu.
+        """
+        if self._tx is not None:
+            self._tx.mark_dirty(cls, key)
+            return
+        if cls not in self._loading:
+            self._version += 1
+            self._mark_dirty(cls, key)
+        journal = self._journals.get(cls)
+        if journal is None:
+            return
+        data = self._serialize(obj) if obj is not None else None
+        self._sync_journal(journal, journal.write([(op, key, data)]))
+
+    def _bulk(
+            self,
+            cls: Type,
+            op: str,
+            items: List[BatchItem],
+            result: BulkResult,
+    ) -> None:
+        """
+        Wykonuje operację op ("add", "update", "delete") na tych
+        elementach partii klasy cls, które przechodzą check_batch(),
+        i dopisuje ich klucze do result.
+        """
+        table = self._table(cls)
+        valid = check_batch(cls, items, table, op != "add", result)
+        if not valid:
+            return
+        pairs = [(key, obj) for _, key, obj in valid]
+        prevs = [MISSING if op == "add" else table[key] for key, _ in pairs]
+        if self._tx is not None or self._snapshots:
+            for (key, _), prev in zip(pairs, prevs):
+                self._track(cls, key, prev)
+        self._journal_many(cls, op, pairs)
+        if op == "delete":
+            keys = [key for key, _ in pairs]
+            for key in keys:
+                del table[key]
+            self._index_remove_many(cls, keys)
+        else:
+            for key, obj in pairs:
+                table[key] = obj
+            self._index_add_many(cls, pairs)
+        if self._watchers or self.changes.active:
+            event = {"add": INSERT, "update": UPDATE, "delete": DELETE}[op]
+            for (key, obj), prev in zip(pairs, prevs):
+                self._notify(cls, key)
+                self._publish(event, cls, key, prev, obj)
+        result.keys.extend(key for key, _ in pairs)
+
+    def _journal_many(
+            self,
+            cls: Type,
+            op: str,
+            pairs: List[Tuple[str, Any]],
+    ) -> None:
+        """
+        Jak _journal_append() dla wielu rekordów jednej operacji:
+        jeden zapis do dziennika i jeden wzrost wersji.
+        """
+        if self._tx is not None:
+            for key, _ in pairs:
+                self._tx.mark_dirty(cls, key)
+            return
+        if cls not in self._loading:
+            self._version += 1
+            if cls not in self._dirty_tables:
+                self._dirty.setdefault(cls, {}).update(
+                    (key, None) for key, _ in pairs
+                )
+        journal = self._journals.get(cls)
+        if journal is None:
+            return
+        entries = [
+            (op, key, self._serialize(obj) if obj is not None else None)
+            for key, obj in pairs
+        ]
+        self._sync_journal(journal, journal.write(entries))
+
+    def _track(self, cls: Type, key: str, obj: Any) -> None:
+        """
+        W trakcie transakcji zapamiętuje pierwotny stan rekordu,
+        a otwartym widokom snapshot() przekazuje jego wersję
+        sprzed pierwszej zmiany.
+        """
+        if self._tx is not None:
+            self._tx.track(cls, key, obj)
+        if self._snapshots and cls not in self._loading:
+            for ref in self._snapshots:
+                snap = ref()
+                if snap is not None:
+                    snap._preserve(cls, key, obj)
+
+    def _detach(self, cls: Type) -> None:
+        """
+        Przed wyczyszczeniem tabeli cls przekazuje ją w całości
+        otwartym widokom snapshot() (tabela czekająca na leniwe
+        wczytanie jest najpierw wczytywana).
+        """
+        if not self._snapshots or cls in self._loading:
+            return
+        table = self._table(cls)
+        for ref in self._snapshots:
+            snap = ref()
+            if snap is not None:
+                snap._detach(cls, table)
+
+    def _mark_dirty(self, cls: Type, key: str) -> None:
+        """
+        Oznacza rekord jako zmieniony od ostatniego flush()
+        (tabela do zapisania w całości nie potrzebuje kluczy).
+        """
+        if cls not in self._dirty_tables:
+            self._dirty.setdefault(cls, {})[key] = None
+
+    def _notify(self, cls: Type, key: str) -> None:
+        """
+        Zgłasza obserwatorom z watch() zmianę rekordu.
+        """
+        if not self._watchers or cls in self._loading:
+            return
+        for ref in self._watchers:
+            watcher = ref()
+            if watcher is not None:
+                watcher._changed(cls, key)
+
+    def _notify_cleared(self, cls: Optional[Type]) -> None:
+        if cls in self._loading:
+            return
+        for ref in self._watchers:
+            watcher = ref()
+            if watcher is not None:
+                watcher._cleared(cls)
+
+    def _release_snapshot(self, snap: RepositorySnapshot) -> None:
+        """
+        Wyrejestrowuje zamknięty widok snapshot().
+        """
+        self._snapshots = tuple(
+            ref for ref in self._snapshots
+            if ref() is not None and ref() is not snap
+        )
+
+    def _snapshot_table(self, cls: Type) -> Dict[str, Any]:
+        """
+        Zwraca bieżącą tabelę klasy cls do odczytu przez widok.
+        """
+        return self._table(cls)
+
+    def _snapshot_classes(self) -> List[Type]:
+        """
+        Zwraca klasy wszystkich tabel (także czekających na wczytanie).
+        """
+        return list(dict.fromkeys([*self._data, *self._loaders]))
+
+    def _rollback(self, tx: Transaction) -> None:
+        """
+        Przywraca tabele, obiekty i indeksy do stanu sprzed transakcji.
+        """
+        for (cls, key), (orig, state) in reversed(tx.saved.items()):
+            table = self._data.get(cls, {})
+            if orig is MISSING:
+                if key in table:
+                    del table[key]
+                    self._index_remove(cls, key)
+            else:
+                restore_state(orig, state)
+                table[key] = orig
+                self._index_add(cls, key, orig)
+            self._notify(cls, key)
+
+    def _commit(self, tx: Transaction) -> None:
+        """
+        Zapisuje zmienione rekordy do dzienników:
+        stan końcowy każdego rekordu, jednym zapisem na tabelę.
+        """
+        if tx.dirty:
+            self._version += 1
+        batches: Dict[Type, List] = {}
+        for cls, key in tx.dirty:
+            self._mark_dirty(cls, key)
+            journal = self._journals.get(cls)
+            if journal is None:
+                continue
+            existed = tx.saved[(cls, key)][0] is not MISSING
+            obj = self._data.get(cls, {}).get(key)
+            if obj is not None:
+                op = "update" if existed else "add"
+                entry = (op, key, self._serialize(obj))
+            elif existed:
+                entry = ("delete", key, None)
+            else:
+                continue
+            batches.setdefault(cls, []).append(entry)
+        for cls, entries in batches.items():
+            journal = self._journals[cls]
+            self._sync_journal(journal, journal.write(entries))
+        if self.changes.active:
+            self._publish_tx(tx)
+
+    def _publish(
+            self,
+            op: str,
+            cls: Type,
+            key: str,
+            prev: Any,
+            obj: Any,
+    ) -> None:
+        """
+        Publikuje subskrybentom zmianę rekordu poza transakcją
+        (zmiany transakcji publikuje _publish_tx() po zatwierdzeniu).
+        prev to obiekt, który był w tabeli przed zmianą.
+        """
+        bus = self.changes
+        if not bus.active or self._tx is not None or cls in self._loading:
+            return
+        # Stan sprzed zmiany "w miejscu" (prev is obj) nie jest znany.
+        old = None
+        if op != INSERT and prev is not obj:
+            old = bus.image(prev)
+        new = bus.image(obj) if obj is not None else None
+        bus.publish(ChangeEvent(op, cls, key, old, new, self._version))
+
+    def _publish_tx(self, tx: Transaction) -> None:
+        """
+        Publikuje zatwierdzone zmiany transakcji: jedno zdarzenie
+        na rekord, ze stanem sprzed transakcji i końcowym.
+        """
+        bus = self.changes
+        for cls, key in tx.dirty:
+            orig, state = tx.saved[(cls, key)]
+            obj = self._data.get(cls, {}).get(key)
+            if orig is MISSING:
+                if obj is None:
+                    continue
+                op, old = INSERT, None
+            else:
+                op = UPDATE if obj is not None else DELETE
+                old = bus.image_of(state)
+            new = bus.image(obj) if obj is not None else None
+            bus.publish(ChangeEvent(op, cls, key, old, new, self._version))
+
+    def _sync_journal(self, journal: Journal, ticket: int) -> None:
+        """
+        Czeka na utrwalenie zapisu dziennika (Journal.sync()).
+        """
+        journal.sync(ticket)
+
+    @staticmethod
+    def _serialize(obj: Any) -> dict:
+        """
+        Zwraca słownik atrybutów obiektu do zapisu w JSON.
+        Podnosi TypeError, jeśli obiekt nie ma __dict__.
+        """
+        if not hasattr(obj, "__dict__"):
+            raise TypeError(
+                f"Cannot serialize object of type {type(obj).__name__}"
+            )
+        return obj.__dict__
+
+    def _index_add(self, cls: Type, key: str, obj: Any) -> None:
+        """
+        Aktualizuje wszystkie indeksy klasy cls dla obiektu o kluczu key.
+        Indeks pełnotekstowy jest aktualny także przy leniwym snapshocie.
+        """
+        if cls in self._search_indexes:
+            self._search_indexes[cls].add(key, obj)
+        if cls in self._stale_indexes:
+            return
+        for index in self._all_indexes(cls):
+            index.add(key, obj)
+
+    def _index_add_many(
+            self,
+            cls: Type,
+            pairs: List[Tuple[str, Any]],
+    ) -> None:
+        """
+        Jak _index_add() dla wielu par (klucz, obiekt) naraz.
+        """
+        if cls in self._search_indexes:
+            search_index = self._search_indexes[cls]
+            for key, obj in pairs:
+                search_index.add(key, obj)
+        if cls in self._stale_indexes:
+            return
+        for index in self._all_indexes(cls):
+            index.add_many(pairs)
+
+    def _index_remove_many(self, cls: Type, keys: List[str]) -> None:
+        """
+        Jak _index_remove() dla wielu kluczy naraz.
+        """
+        if cls in self._search_indexes:
+            search_index = self._search_indexes[cls]
+            for key in keys:
+                search_index.remove(key)
+        if cls in self._stale_indexes:
+            return
+        for index in self._all_indexes(cls):
+            index.remove_many(keys)
+
+    def _index_remove(self, cls: Type, key: str) -> None:
+        """
+        Usuwa klucz key ze wszystkich indeksów klasy cls.
+        """
+        if cls in self._search_indexes:
+            self._search_indexes[cls].remove(key)
+        if cls in self._stale_indexes:
+            return
+        for index in self._all_indexes(cls):
+            index.remove(key)
+
+    def _all_indexes(self, cls: Type) -> List[Any]:
+        """
+        Zwraca wszystkie indeksy (równościowe, posortowane
+        i trigramowe) klasy cls.
+        """
+        return (
+            list(self._indexes.get(cls, {}).values())
+            + list(self._sorted_indexes.get(cls, {}).values())
+            + list(self._text_indexes.get(cls, {}).values())
+        )
+
+    def _ensure_indexes(self, cls: Type) -> None:
+        """
+        Przebudowuje indeksy klasy cls, jeśli zostały oznaczone
+        jako nieaktualne.
+        """
+        if cls not in self._stale_indexes:
+            return
+        self._stale_indexes.discard(cls)
+        items = list(self._table(cls).items())
+        for index in self._all_indexes(cls):
+            index.clear()
+            index.add_many(items)
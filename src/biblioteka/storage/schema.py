@@ -0,0 +1,105 @@
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import (
+    Any, Dict, List, Optional, Type, Union,
+    get_args, get_origin, get_type_hints,
+)
+import json
+
+KIND_STR = "str"
+KIND_INT = "int"
+KIND_FLOAT = "float"
+KIND_BOOL = "bool"
+KIND_DATE = "date"
+KIND_DATETIME = "datetime"
+KIND_ENUM = "enum"
+KIND_JSON = "json"
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    Opis jednego pola modelu na potrzeby zapisu binarnego/SQL:
+    nazwa, rodzaj wartości (KIND_*) i ewentualna klasa Enum.
+    """
+    name: str
+    kind: str
+    enum: Optional[Type[Enum]] = None
+
+
+_SCHEMAS: Dict[Type, List[Field]] = {}
+
+
+def fields_of(cls: Type) -> List[Field]:
+    """
+    Zwraca listę pól dataclassy cls wraz z rodzajami wartości.
+    Wynik jest zapamiętywany per klasa.
+    Podnosi TypeError, jeśli cls nie jest dataclassą.
+    """
+    schema = _SCHEMAS.get(cls)
+    if schema is not None:
+        return schema
+    if not is_dataclass(cls):
+        raise TypeError(f"{cls.__name__} is not a dataclass")
+    hints = get_type_hints(cls)
+    schema = [
+        _field_for(f.name, hints.get(f.name, Any)) for f in fields(cls)
+    ]
+    _SCHEMAS[cls] = schema
+    return schema
+
+
+def build(cls: Type, values: Dict[str, Any]) -> Any:
+    """
+    Tworzy obiekt cls z gotowych (już zdekodowanych) wartości pól,
+    z pominięciem __init__/__post_init__ — wartości pochodzą
+    z wcześniej zapisanego, poprawnego obiektu.
+    """
+    obj = cls.__new__(cls)
+    obj.__dict__.update(values)
+    return obj
+
+
+def schema_bytes(cls: Type) -> bytes:
+    """
+    Zwraca opis schematu cls (nazwy i rodzaje pól, nazwy wartości
+    enumów) jako zwarty JSON zapisywany w nagłówku plików binarnych;
+    pozwala przy odczycie wykryć plik zapisany dla innego schematu.
+    """
+    schema = []
+    for field in fields_of(cls):
+        entry = {"name": field.name, "kind": field.kind}
+        if field.enum is not None:
+            entry["enum"] = [m.name for m in field.enum]
+        schema.append(entry)
+    return json.dumps(
+        {"class": cls.__name__, "fields": schema},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _field_for(name: str, hint: Any) -> Field:
+    """
+    Wyznacza rodzaj pola na podstawie adnotacji typu
+    (Optional[X] jest traktowane jak X).
+    """
+    if get_origin(hint) is Union:
+        args = [a for a in get_args(hint) if a is not type(None)]
+        hint = args[0] if len(args) == 1 else Any
+    if isinstance(hint, type):
+        if issubclass(hint, Enum):
+            return Field(name, KIND_ENUM, hint)
+        if issubclass(hint, bool):
+            return Field(name, KIND_BOOL)
+        if issubclass(hint, datetime):
+            return Field(name, KIND_DATETIME)
+        if issubclass(hint, date):
+            return Field(name, KIND_DATE)
+        if issubclass(hint, int):
+            return Field(name, KIND_INT)
+        if issubclass(hint, float):
+            return Field(name, KIND_FLOAT)
+        if issubclass(hint, str):
+            return Field(name, KIND_STR)
+    return Field(name, KIND_JSON)
@@ -0,0 +1,241 @@
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Type,
+)
+import json
+import os
+import threading
+import zlib
+
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.storage.keys import get_key
+
+FORMAT = 1
+DEFAULT_SHARDS = 16
+MANIFEST = "manifest.json"
+
+
+def shard_of(key: str, shards: int) -> int:
+    """
+    Zwraca numer shardu klucza: crc32 klucza modulo shards
+    (stabilny między procesami, w przeciwieństwie do hash()).
+    """
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+def shard_path(directory: str, shard: int) -> str:
+    """
+    Zwraca ścieżkę pliku shardu o numerze shard.
+    """
+    return os.path.join(directory, f"{shard:04d}.json")
+
+
+def read_manifest(directory: str, cls: Type) -> Dict[str, Any]:
+    """
+    Wczytuje manifest katalogu shardów:
+    {"format", "class", "shards": liczba shardów,
+    "counts": liczba rekordów w każdym shardzie}.
+    Podnosi OSError, jeśli manifestu nie ma, a ValueError, jeśli
+    jest niepoprawny lub opisuje inną klasę.
+    """
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT:
+        raise ValueError(f"{directory} has no valid shard manifest")
+    if manifest.get("class") != cls.__name__:
+        raise ValueError(
+            f"{directory} holds {manifest.get('class')}, "
+            f"not {cls.__name__}"
+        )
+    shards = manifest.get("shards")
+    counts = manifest.get("counts")
+    if (
+            not isinstance(shards, int) or shards < 1
+            or not isinstance(counts, list) or len(counts) != shards
+    ):
+        raise ValueError(f"{directory} has a corrupted shard manifest")
+    return manifest
+
+
+def read_shard(path: str) -> List[dict]:
+    """
+    Wczytuje rekordy (słowniki) z pliku shardu; brak pliku
+    oznacza pusty shard. Funkcja modułu, więc może działać
+    w procesie potomnym (ProcessPoolExecutor).
+    """
+    if not os.path.isfile(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    if not isinstance(records, list):
+        raise ValueError(f"{path} is not a shard file")
+    return records
+
+
+def write_sharded(
+        directory: str,
+        cls: Type,
+        table: Mapping[str, Any],
+        serialize: Callable[[Any], dict],
+        shards: Optional[int] = None,
+        keys: Optional[Iterable[str]] = None,
+) -> List[int]:
+    """
+    Zapisuje tabelę (słownik klucz -> obiekt) do katalogu shardów:
+    rekord trafia do shardu shard_of(klucz), a każdy shard
+    to osobny plik JSON, zapisywany atomowo; manifest zapisywany
+    jest na końcu.
+    Z keys przepisywane są tylko shardy zawierające te klucze
+    (np. zmienione od ostatniego zapisu), o ile katalog ma już
+    manifest z tą samą liczbą shardów — inaczej zapisywane są
+    wszystkie. shards domyślnie jak w istniejącym manifeście
+    (albo DEFAULT_SHARDS). Zwraca numery zapisanych shardów.
+    """
+    try:
+        manifest = read_manifest(directory, cls)
+    except (OSError, ValueError):
+        manifest = None
+    if shards is None:
+        shards = manifest["shards"] if manifest else DEFAULT_SHARDS
+    if shards < 1:
+        raise ValueError("shards must be positive")
+    if keys is None or manifest is None or manifest["shards"] != shards:
+        targets = list(range(shards))
+        counts = [0] * shards
+    else:
+        targets = sorted({shard_of(key, shards) for key in keys})
+        counts = list(manifest["counts"])
+    if isinstance(table, ShardedTable) and table.shards == shards:
+        # Zmienione shardy są już wczytane; pozostałych nie trzeba
+        # przeglądać.
+        buckets = {i: list(table.shard(i).items()) for i in targets}
+    else:
+        buckets = {i: [] for i in targets}
+        for key, obj in table.items():
+            bucket = buckets.get(shard_of(key, shards))
+            if bucket is not None:
+                bucket.append((key, obj))
+    os.makedirs(directory, exist_ok=True)
+    for i in targets:
+        records = [serialize(obj) for _, obj in buckets[i]]
+        with atomic_write(
+                shard_path(directory, i), "w", encoding="utf-8",
+        ) as f:
+            json.dump(records, f, default=str)
+        counts[i] = len(records)
+    if manifest is not None:
+        # Pliki shardów spoza nowego podziału (zmniejszona liczba).
+        for i in range(shards, manifest["shards"]):
+            if os.path.exists(shard_path(directory, i)):
+                os.remove(shard_path(directory, i))
+    manifest_path = os.path.join(directory, MANIFEST)
+    with atomic_write(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "format": FORMAT,
+            "class": cls.__name__,
+            "shards": shards,
+            "counts": counts,
+        }, f)
+    return targets
+
+
+class ShardedTable(MutableMapping):
+    """
+    Tabela repozytorium oparta na katalogu shardów (write_sharded()).
+    Otwarcie czyta tylko manifest (podnosi OSError/ValueError, jeśli
+    go brak lub jest niepoprawny); shard wczytywany jest w całości
+    przy pierwszym dostępie do któregokolwiek z jego kluczy,
+    więc get() jednego rekordu parsuje jeden plik, a len() nie
+    parsuje żadnego. Iteracja przechodzi shardy po kolei (kolejność
+    tabeli to kolejność shardów, a nie dodawania), wczytując je.
+    Zmiany trzymane są we wczytanych shardach aż do zapisu.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            cls: Type,
+            factory: Callable[[dict], Any],
+    ):
+        manifest = read_manifest(directory, cls)
+        self.directory = directory
+        self.cls = cls
+        self.factory = factory
+        self.shards: int = manifest["shards"]
+        self._counts: List[int] = manifest["counts"]
+        self._loaded: Dict[int, Dict[str, Any]] = {}
+        # Wczytanie shardu przy odczycie zmienia stan tabeli,
+        # także pod blokadą czytelnika (ConcurrentRepository).
+        self._lock = threading.Lock()
+
+    def shard(self, i: int) -> Dict[str, Any]:
+        """
+        Zwraca shard i jako słownik klucz -> obiekt (wczytując go).
+        """
+        table = self._loaded.get(i)
+        if table is None:
+            with self._lock:
+                table = self._loaded.get(i)
+                if table is None:
+                    table = self._fill(
+                        i, read_shard(shard_path(self.directory, i)),
+                    )
+        return table
+
+    def loaded_shards(self) -> List[int]:
+        """
+        Zwraca numery wczytanych shardów.
+        """
+        return sorted(self._loaded)
+
+    def load_all(self, workers: int = 1) -> None:
+        """
+        Wczytuje wszystkie shardy; z workers > 1 pliki parsowane są
+        równolegle w workers procesach (obiekty tworzy factory
+        w bieżącym procesie, więc nie musi się ona dać serializować).
+        """
+        pending = [i for i in range(self.shards) if i not in self._loaded]
+        if workers <= 1 or len(pending) < 2:
+            for i in pending:
+                self.shard(i)
+            return
+        paths = [shard_path(self.directory, i) for i in pending]
+        with ProcessPoolExecutor(min(workers, len(pending))) as pool:
+            parsed = list(pool.map(read_shard, paths))
+        with self._lock:
+            for i, records in zip(pending, parsed):
+                if i not in self._loaded:
+                    self._fill(i, records)
+
+    def _fill(self, i: int, records: List[dict]) -> Dict[str, Any]:
+        table = {}
+        for rec in records:
+            obj = self.factory(rec)
+            table[get_key(obj)] = obj
+        self._loaded[i] = table
+        return table
+
+    def __getitem__(self, key: str) -> Any:
+        return self.shard(shard_of(key, self.shards))[key]
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return key in self.shard(shard_of(key, self.shards))
+
+    def __setitem__(self, key: str, obj: Any) -> None:
+        self.shard(shard_of(key, self.shards))[key] = obj
+
+    def __delitem__(self, key: str) -> None:
+        del self.shard(shard_of(key, self.shards))[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self.shards):
+            yield from list(self.shard(i))
+
+    def __len__(self) -> int:
+        return sum(
+            len(self._loaded[i]) if i in self._loaded else self._counts[i]
+            for i in range(self.shards)
+        )
@@ -0,0 +1,345 @@
+from collections.abc import MutableMapping
+from datetime import date, datetime, timedelta, timezone
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type,
+)
+import json
+import mmap
+import os
+import struct
+
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.storage.schema import (
+    Field,
+    fields_of,
+    build,
+    schema_bytes,
+    KIND_BOOL,
+    KIND_DATE,
+    KIND_DATETIME,
+    KIND_ENUM,
+    KIND_FLOAT,
+    KIND_INT,
+    KIND_JSON,
+    KIND_STR,
+)
+
+MAGIC = b"BIBSNAP1"
+
+# magic | liczba rekordów | pozycja tabeli offsetów |
+# pozycja indeksu posortowanego po kluczu | długość schematu
+_HEADER = struct.Struct("<8sQQQI")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_I32 = struct.Struct("<i")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_DATETIME = struct.Struct("<qB")
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_record(cls: Type, key: str, obj: Any) -> bytes:
+    """
+    Koduje jeden obiekt jako rekord binarny:
+    klucz (długość + UTF-8), bitmapa wartości None, a następnie
+    niepuste pola: int jako int64, daty jako ordinal (int32),
+    datetime jako mikrosekundy od epoki, enumy jako numer (uint8),
+    napisy i JSON z prefiksem długości.
+    """
+    if not isinstance(key, str):
+        raise TypeError(
+            f"Snapshot keys must be str, got {type(key).__name__}"
+        )
+    schema = fields_of(cls)
+    key_bytes = key.encode("utf-8")
+    parts = [_U32.pack(len(key_bytes)), key_bytes]
+    nulls = bytearray((len(schema) + 7) // 8)
+    values = []
+    for i, field in enumerate(schema):
+        value = getattr(obj, field.name)
+        if value is None:
+            nulls[i // 8] |= 1 << (i % 8)
+        else:
+            values.append(_encode_value(field, value))
+    parts.append(bytes(nulls))
+    parts.extend(values)
+    return b"".join(parts)
+
+
+def write_snapshot(
+        path: str,
+        cls: Type,
+        records: Iterable[Tuple[str, bytes]],
+        before_replace: Optional[Callable[[], None]] = None,
+) -> int:
+    """
+    Zapisuje snapshot klasy cls z gotowych rekordów (klucz, bajty)
+    do pliku path. Zapis jest atomowy (storage.atomic.atomic_write).
+    before_replace (np. zamknięcie mmap starego pliku) wywoływane jest
+    tuż przed podmianą pliku.
+    Zwraca liczbę zapisanych rekordów.
+    """
+    schema = schema_bytes(cls)
+    offsets: List[int] = []
+    keys: List[str] = []
+    with atomic_write(path, "wb", before_replace=before_replace) as f:
+        f.write(_HEADER.pack(MAGIC, 0, 0, 0, len(schema)))
+        f.write(schema)
+        pos = _HEADER.size + len(schema)
+        for key, data in records:
+            offsets.append(pos)
+            keys.append(key)
+            f.write(data)
+            pos += len(data)
+        offsets_pos = pos
+        f.write(b"".join(_U64.pack(o) for o in offsets))
+        sorted_pos = offsets_pos + _U64.size * len(offsets)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        f.write(b"".join(_U32.pack(i) for i in order))
+        f.seek(0)
+        f.write(_HEADER.pack(
+            MAGIC, len(offsets), offsets_pos, sorted_pos, len(schema),
+        ))
+    return len(offsets)
+
+
+class SnapshotTable(MutableMapping):
+    """
+    Tabela repozytorium oparta na snapshocie binarnym mapowanym
+    w pamięci (mmap). Otwarcie czyta tylko nagłówek i schemat
+    (podnosi ValueError, jeśli plik lub schemat są niepoprawne); rekordy
+    dekodowane są dopiero przy pierwszym dostępie i zapamiętywane,
+    więc kolejne get() zwracają ten sam obiekt.
+    Zmiany (dodanie, nadpisanie, usunięcie) trzymane są w pamięci
+    ponad niezmienionym plikiem aż do kolejnego zapisu snapshotu.
+    """
+
+    def __init__(self, path: str, cls: Type):
+        self.path = path
+        self.cls = cls
+        self._cache: Dict[str, Any] = {}
+        self._extra: Dict[str, None] = {}
+        self._deleted: set = set()
+        self._open()
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{self.path} is too short")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, offsets_pos, sorted_pos, schema_len = (
+            _HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a snapshot file")
+        schema = bytes(self._mm[_HEADER.size:_HEADER.size + schema_len])
+        if schema != schema_bytes(self.cls):
+            self.close()
+            raise ValueError(
+                f"{self.path} schema does not match {self.cls.__name__}"
+            )
+        self._count = count
+        self._offsets_pos = offsets_pos
+        self._sorted_pos = sorted_pos
+
+    def close(self) -> None:
+        """Zamyka mapowanie pliku."""
+        self._mm.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._mm.closed
+
+    def reopen(self) -> None:
+        """
+        Ponownie mapuje plik path po close() (np. gdy podmiana pliku
+        po close() się nie powiodła); zmiany w pamięci pozostają.
+        """
+        self._open()
+
+    def rebase(self, path: str) -> None:
+        """
+        Przełącza tabelę (zamykając stare mapowanie) na nowo zapisany
+        snapshot o identycznej zawartości. Zdekodowane obiekty
+        pozostają w pamięci, więc ich tożsamość się nie zmienia.
+        """
+        self.close()
+        self.path = path
+        self._extra.clear()
+        self._deleted.clear()
+        self._open()
+
+    def encoded_records(self) -> Iterator[Tuple[str, bytes]]:
+        """
+        Zwraca rekordy w postaci binarnej (klucz, bajty) w kolejności
+        tabeli. Rekordy, których nie dekodowano, są kopiowane z pliku
+        bez dekodowania; pozostałe są kodowane ponownie.
+        """
+        for i in range(self._count):
+            start = self._offset(i)
+            key, _ = self._key_at(start)
+            if key in self._deleted:
+                continue
+            if key in self._cache:
+                yield key, encode_record(self.cls, key, self._cache[key])
+            else:
+                yield key, bytes(self._mm[start:self._record_end(i)])
+        for key in self._extra:
+            yield key, encode_record(self.cls, key, self._cache[key])
+
+    def __getitem__(self, key: str) -> Any:
+        obj = self._cache.get(key)
+        if obj is not None:
+            return obj
+        if key in self._deleted:
+            raise KeyError(key)
+        start = self._find(key)
+        if start is None:
+            raise KeyError(key)
+        obj = self._decode(start)
+        self._cache[key] = obj
+        return obj
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._cache:
+            return True
+        if key in self._deleted or not isinstance(key, str):
+            return False
+        return self._find(key) is not None
+
+    def __setitem__(self, key: str, obj: Any) -> None:
+        if key in self._deleted:
+            self._deleted.discard(key)
+        elif (
+                key not in self._cache
+                and key not in self._extra
+                and self._find(key) is None
+        ):
+            self._extra[key] = None
+        self._cache[key] = obj
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._extra:
+            del self._extra[key]
+            del self._cache[key]
+            return
+        if key in self._deleted or self._find(key) is None:
+            raise KeyError(key)
+        self._deleted.add(key)
+        self._cache.pop(key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            key, _ = self._key_at(self._offset(i))
+            if key not in self._deleted:
+                yield key
+        yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return self._count - len(self._deleted) + len(self._extra)
+
+    def _offset(self, i: int) -> int:
+        return _U64.unpack_from(self._mm, self._offsets_pos + i * 8)[0]
+
+    def _record_end(self, i: int) -> int:
+        if i + 1 < self._count:
+            return self._offset(i + 1)
+        return self._offsets_pos
+
+    def _key_at(self, pos: int) -> Tuple[str, int]:
+        (length,) = _U32.unpack_from(self._mm, pos)
+        pos += _U32.size
+        return self._mm[pos:pos + length].decode("utf-8"), pos + length
+
+    def _find(self, key: str) -> Any:
+        """
+        Wyszukiwanie binarne klucza w indeksie posortowanym.
+        Zwraca pozycję rekordu w pliku lub None.
+        """
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (i,) = _U32.unpack_from(self._mm, self._sorted_pos + mid * 4)
+            start = self._offset(i)
+            found, _ = self._key_at(start)
+            if found == key:
+                return start
+            if found < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _decode(self, pos: int) -> Any:
+        schema = fields_of(self.cls)
+        _, pos = self._key_at(pos)
+        nulls_len = (len(schema) + 7) // 8
+        nulls = self._mm[pos:pos + nulls_len]
+        pos += nulls_len
+        values = {}
+        for i, field in enumerate(schema):
+            if nulls[i // 8] & (1 << (i % 8)):
+                values[field.name] = None
+            else:
+                values[field.name], pos = _decode_value(field, self._mm, pos)
+        return build(self.cls, values)
+
+
+def _pack_bytes(data: bytes) -> bytes:
+    return _U32.pack(len(data)) + data
+
+
+def _encode_value(field: Field, value: Any) -> bytes:
+    kind = field.kind
+    if kind == KIND_STR:
+        return _pack_bytes(str(value).encode("utf-8"))
+    if kind == KIND_INT:
+        return _I64.pack(value)
+    if kind == KIND_FLOAT:
+        return _F64.pack(value)
+    if kind == KIND_BOOL:
+        return _U8.pack(1 if value else 0)
+    if kind == KIND_ENUM:
+        if isinstance(value, str):
+            value = field.enum[value.split(".")[-1]]
+        return _U8.pack(list(field.enum).index(value))
+    if kind == KIND_DATETIME:
+        if value.tzinfo is None:
+            delta, aware = value - _EPOCH, 0
+        else:
+            delta, aware = value - _EPOCH_UTC, 1
+        return _DATETIME.pack(delta // _MICROSECOND, aware)
+    if kind == KIND_DATE:
+        return _I32.pack(value.toordinal())
+    return _pack_bytes(json.dumps(value, default=str).encode("utf-8"))
+
+
+def _decode_value(field: Field, buf: Any, pos: int) -> Tuple[Any, int]:
+    kind = field.kind
+    if kind in (KIND_STR, KIND_JSON):
+        (length,) = _U32.unpack_from(buf, pos)
+        pos += _U32.size
+        text = buf[pos:pos + length].decode("utf-8")
+        pos += length
+        return (text if kind == KIND_STR else json.loads(text)), pos
+    if kind == KIND_INT:
+        return _I64.unpack_from(buf, pos)[0], pos + _I64.size
+    if kind == KIND_FLOAT:
+        return _F64.unpack_from(buf, pos)[0], pos + _F64.size
+    if kind == KIND_BOOL:
+        return bool(_U8.unpack_from(buf, pos)[0]), pos + _U8.size
+    if kind == KIND_ENUM:
+        (i,) = _U8.unpack_from(buf, pos)
+        return list(field.enum)[i], pos + _U8.size
+    if kind == KIND_DATETIME:
+        micros, aware = _DATETIME.unpack_from(buf, pos)
+        base = _EPOCH_UTC if aware else _EPOCH
+        return base + micros * _MICROSECOND, pos + _DATETIME.size
+    (ordinal,) = _I32.unpack_from(buf, pos)
+    return date.fromordinal(ordinal), pos + _I32.size
@@ -0,0 +1,669 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type,
+)
+import json
+import sqlite3
+
+from biblioteka.models.book import Book
+from biblioteka.storage.bulk import (
+    BatchItem,
+    BulkResult,
+    check_batch,
+    group_batch,
+)
+from biblioteka.storage.cursor import parse_order
+from biblioteka.storage.fulltext import FullTextIndex
+from biblioteka.storage.keys import get_key, primary_key
+from biblioteka.storage.query import Range, compile_filters
+from biblioteka.storage.schema import (
+    Field,
+    fields_of,
+    build,
+    KIND_BOOL,
+    KIND_DATE,
+    KIND_DATETIME,
+    KIND_ENUM,
+    KIND_FLOAT,
+    KIND_INT,
+    KIND_JSON,
+    KIND_STR,
+)
+
+# Maksymalna liczba parametrów jednego zapytania (limit starszych
+# wersji SQLite to 999).
+_MAX_PARAMS = 500
+
+_SQL_TYPES = {
+    KIND_STR: "TEXT",
+    KIND_INT: "INTEGER",
+    KIND_FLOAT: "REAL",
+    KIND_BOOL: "INTEGER",
+    KIND_DATE: "TEXT",
+    KIND_DATETIME: "TEXT",
+    KIND_ENUM: "TEXT",
+    KIND_JSON: "TEXT",
+}
+
+
+class SQLiteRepository:
+    """
+    Repozytorium oparte na bazie SQLite (moduł sqlite3),
+    z tym samym interfejsem co Repository:
+    add/get/list/update/delete/clear/count/find_by_pattern/search.
+    Każdy model (dataclassa) ma własną tabelę z kluczem głównym,
+    a zadeklarowane indeksy są prawdziwymi indeksami SQL.
+    Filtry i zliczanie wykonywane są po stronie bazy, więc dane
+    nie muszą mieścić się w pamięci.
+    Zwracane obiekty są kopiami wierszy — po zmianie należy
+    wywołać update(), tak jak robią to serwisy.
+    """
+
+    def __init__(
+            self,
+            path: str = ":memory:",
+            indexes: Optional[Dict[Type, Iterable[str]]] = None,
+    ):
+        """
+        Otwiera (lub tworzy) bazę w pliku path.
+        indexes ma ten sam format co w Repository.
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.create_function(
+            "py_lower", 1, _py_lower, deterministic=True,
+        )
+        self._tables: Dict[Type, str] = {}
+        self._indexes: Dict[Type, List[str]] = {}
+        self._search_indexes: Dict[Type, FullTextIndex] = {}
+        self._in_tx = False
+        for cls_, attrs in (indexes or {}).items():
+            for attr in attrs:
+                self.create_index(cls_, attr)
+
+    def close(self) -> None:
+        """Zamyka połączenie z bazą."""
+        self._conn.close()
+
+    def __enter__(self) -> "SQLiteRepository":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteRepository"]:
+        """
+        Transakcja SQLite obejmująca wszystkie operacje w bloku:
+        po sukcesie jeden COMMIT, po wyjątku ROLLBACK
+        (wyjątek jest przekazywany dalej).
+        Zagnieżdżona transakcja dołącza do zewnętrznej.
+        """
+        if self._in_tx:
+            yield self
+            return
+        self._in_tx = True
+        try:
+            yield self
+        except BaseException:
+            self._in_tx = False
+            self._conn.rollback()
+            # CREATE TABLE z wycofanej transakcji też zostało cofnięte.
+            self._tables.clear()
+            for cls, index in list(self._search_indexes.items()):
+                self.create_search_index(cls, index.attrs)
+            raise
+        self._in_tx = False
+        self._conn.commit()
+
+    def flush(self) -> List[Type]:
+        """
+        Zgodność z Repository.flush(): każda zmiana poza transakcją
+        jest od razu zatwierdzana w bazie, więc nie ma czego zapisać.
+        """
+        return []
+
+    def create_index(self, cls: Type, attr: str) -> None:
+        """
+        Deklaruje indeks SQL na kolumnie attr tabeli klasy cls.
+        Podnosi AttributeError, jeśli model nie ma takiego pola.
+        """
+        self._field(cls, attr)
+        attrs = self._indexes.setdefault(cls, [])
+        if attr not in attrs:
+            attrs.append(attr)
+        if cls in self._tables:
+            self._create_sql_index(cls, attr)
+
+    def create_sorted_index(
+            self,
+            cls: Type,
+            attr: str,
+            where: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Indeksy SQL są B-drzewami i obsługują też zakresy,
+        więc to samo co create_index() (where jest pomijane —
+        planista SQLite sam łączy warunki).
+        """
+        self.create_index(cls, attr)
+
+    def create_search_index(
+            self,
+            cls: Type,
+            attrs: Iterable[str],
+    ) -> FullTextIndex:
+        """
+        Buduje (w pamięci) indeks pełnotekstowy klasy cls nad atrybutami
+        attrs z zawartości tabeli; dalej aktualizowany przy zapisach.
+        """
+        index = FullTextIndex(attrs)
+        for obj in self.list(cls):
+            index.add(get_key(obj), obj)
+        self._search_indexes[cls] = index
+        return index
+
+    def attach_search_index(self, cls: Type, index: FullTextIndex) -> None:
+        """
+        Podłącza gotowy indeks pełnotekstowy bez przebudowy.
+        """
+        self._search_indexes[cls] = index
+
+    def search_index(self, cls: Type) -> Optional[FullTextIndex]:
+        """
+        Zwraca indeks pełnotekstowy klasy cls lub None.
+        """
+        return self._search_indexes.get(cls)
+
+    def search(self, cls: Type, query: str, limit: int = 10) -> List[Any]:
+        """
+        Wyszukiwanie pełnotekstowe (BM25), jak Repository.search().
+        Podnosi KeyError, jeśli klasa nie ma indeksu pełnotekstowego.
+        """
+        index = self._search_indexes.get(cls)
+        if index is None:
+            raise KeyError(f"No search index for {cls.__name__}")
+        found = (self.get(cls, key) for key, _ in index.search(query, limit))
+        return [obj for obj in found if obj is not None]
+
+    def indexed_attrs(self, cls: Type) -> List[str]:
+        """
+        Zwraca listę atrybutów klasy cls, dla których istnieje indeks.
+        """
+        return list(self._indexes.get(cls, []))
+
+    def add(self, obj: Any) -> None:
+        """
+        Dodaje nowy obiekt (INSERT).
+        Podnosi KeyError, jeśli rekord o tym kluczu już istnieje.
+        """
+        cls_ = type(obj)
+        table = self._table(cls_)
+        schema = fields_of(cls_)
+        columns = ", ".join(_quote(f.name) for f in schema)
+        marks = ", ".join("?" for _ in schema)
+        try:
+            with self._write():
+                self._conn.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES ({marks})",
+                    self._row(obj, schema),
+                )
+        except sqlite3.IntegrityError:
+            key = get_key(obj)
+            raise KeyError(
+                f"{cls_.__name__} with key {key} already exists"
+            ) from None
+        if cls_ in self._search_indexes:
+            self._search_indexes[cls_].add(get_key(obj), obj)
+
+    def get(self, cls: Type, pk: str) -> Any:
+        """
+        Zwraca obiekt danego typu o podanym kluczu lub None.
+        """
+        pk_col = _quote(primary_key(cls))
+        row = self._conn.execute(
+            f"{self._select(cls)} WHERE {pk_col} = ?", (pk,),
+        ).fetchone()
+        return self._object(cls, row) if row is not None else None
+
+    def list(self, cls: Type, **filters) -> List[Any]:
+        """
+        Zwraca obiekty danego typu (w kolejności dodania),
+        opcjonalnie filtrowane w SQL: atrybut=wartość lub warunek
+        z storage.query (lt, between, in_, ...), jak w Repository.list().
+        Podnosi AttributeError dla nieznanego atrybutu filtra.
+        """
+        where, params = self._where(cls, filters)
+        sql = self._select(cls)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY rowid"
+        return [
+            self._object(cls, row)
+            for row in self._conn.execute(sql, params)
+        ]
+
+    def iterate(
+            self,
+            cls: Type,
+            *,
+            order_by: Optional[str] = None,
+            after_key: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            **filters,
+    ) -> Iterator[Any]:
+        """
+        Kursor jak Repository.iterate(): sortowanie, after_key,
+        OFFSET i LIMIT wykonywane są w SQL, a wiersze zamieniane
+        na obiekty dopiero przy odczycie z iteratora.
+        Podnosi KeyError, jeśli rekord after_key nie istnieje,
+        i ValueError dla ujemnego offset lub limit.
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative")
+        attr, descending = parse_order(order_by)
+        where, params = self._where(cls, filters)
+        pk_col = _quote(primary_key(cls))
+        direction = "DESC" if descending else "ASC"
+        if attr is None and after_key is None:
+            order = "rowid"
+        elif attr is None:
+            order = f"{pk_col} {direction}"
+        else:
+            self._field(cls, attr)
+            col = _quote(attr)
+            order = (
+                f"{col} IS NULL {direction}, {col} {direction}, "
+                f"{pk_col} {direction}"
+            )
+        if after_key is not None:
+            cursor_obj = self.get(cls, after_key)
+            if cursor_obj is None:
+                raise KeyError(
+                    f"{cls.__name__} with key {after_key} not found"
+                )
+            clause, values = _after(
+                pk_col, after_key, descending,
+                None if attr is None else (
+                    _quote(attr),
+                    _encode(self._field(cls, attr),
+                            getattr(cursor_obj, attr)),
+                ),
+            )
+            where.append(clause)
+            params.extend(values)
+        sql = self._select(cls)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        rows = self._conn.execute(sql, params)
+        return (self._object(cls, row) for row in rows)
+
+    def list_books(self) -> List[Book]:
+        """
+        Zwraca wszystkie obiekty Book. Alias dla list(Book).
+        """
+        return self.list(Book)
+
+    def update(self, obj: Any) -> None:
+        """
+        Nadpisuje istniejący obiekt (UPDATE po kluczu głównym).
+        Podnosi KeyError, jeśli obiekt nie istnieje.
+        """
+        cls_ = type(obj)
+        table = self._table(cls_)
+        schema = fields_of(cls_)
+        pk_col = primary_key(cls_)
+        key = get_key(obj)
+        assignments = ", ".join(f"{_quote(f.name)} = ?" for f in schema)
+        with self._write():
+            cursor = self._conn.execute(
+                f"UPDATE {table} SET {assignments} "
+                f"WHERE {_quote(pk_col)} = ?",
+                self._row(obj, schema) + [key],
+            )
+        if cursor.rowcount == 0:
+            raise KeyError(f"{cls_.__name__} with key {key} not found")
+        if cls_ in self._search_indexes:
+            self._search_indexes[cls_].add(key, obj)
+
+    def delete(self, cls: Type, pk: str) -> None:
+        """
+        Usuwa obiekt danego typu o kluczu pk.
+        Podnosi KeyError, jeśli rekord nie istnieje.
+        """
+        table = self._table(cls)
+        pk_col = _quote(primary_key(cls))
+        with self._write():
+            cursor = self._conn.execute(
+                f"DELETE FROM {table} WHERE {pk_col} = ?", (pk,),
+            )
+        if cursor.rowcount == 0:
+            raise KeyError(f"{cls.__name__} with key {pk} not found")
+        if cls in self._search_indexes:
+            self._search_indexes[cls].remove(pk)
+
+    def add_many(self, objs: Iterable[Any]) -> BulkResult:
+        """
+        Dodaje wiele obiektów naraz (executemany), jak
+        Repository.add_many(): istniejące klucze sprawdzane są
+        zapytaniami IN, a odrzucone obiekty trafiają
+        do BulkResult.errors.
+        """
+        result = BulkResult()
+        for cls, items in group_batch(objs, result).items():
+            self._bulk(cls, "add", items, result)
+        result.errors.sort(key=lambda error: error[0])
+        return result
+
+    def update_many(self, objs: Iterable[Any]) -> BulkResult:
+        """
+        Nadpisuje wiele istniejących obiektów naraz (executemany).
+        """
+        result = BulkResult()
+        for cls, items in group_batch(objs, result).items():
+            self._bulk(cls, "update", items, result)
+        result.errors.sort(key=lambda error: error[0])
+        return result
+
+    def delete_many(self, cls: Type, pks: Iterable[str]) -> BulkResult:
+        """
+        Usuwa obiekty klasy cls o kluczach pks naraz (executemany).
+        """
+        result = BulkResult()
+        items = [(pos, pk, None) for pos, pk in enumerate(pks)]
+        self._bulk(cls, "delete", items, result)
+        return result
+
+    def clear(self, cls: Type = None) -> None:
+        """
+        Czyści tabelę klasy cls albo wszystkie tabele modeli.
+        """
+        tables = [self._table(cls)] if cls else self._all_tables()
+        with self._write():
+            for table in tables:
+                self._conn.execute(f"DELETE FROM {table}")
+        for cls_, index in self._search_indexes.items():
+            if cls is None or cls_ is cls:
+                index.clear()
+
+    def count(self, cls: Type = None) -> int:
+        """
+        Zwraca liczbę rekordów klasy cls lub wszystkich rekordów
+        (COUNT(*) wykonywany w bazie).
+        """
+        tables = [self._table(cls)] if cls else self._all_tables()
+        return sum(
+            self._conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in tables
+        )
+
+    def find_by_pattern(self, cls: Type, attr: str, pattern: str) -> List[Any]:
+        """
+        Wyszukuje obiekty, których tekstowy atrybut attr zawiera
+        fragment pattern (bez rozróżnienia wielkości liter, także
+        dla polskich znaków). Dla pól nietekstowych zwraca [].
+        """
+        field = next((f for f in fields_of(cls) if f.name == attr), None)
+        if field is None or field.kind != KIND_STR:
+            return []
+        sql = (
+            f"{self._select(cls)} "
+            f"WHERE instr(py_lower({_quote(attr)}), ?) > 0 ORDER BY rowid"
+        )
+        return [
+            self._object(cls, row)
+            for row in self._conn.execute(sql, (pattern.lower(),))
+        ]
+
+    def _table(self, cls: Type) -> str:
+        """
+        Zwraca nazwę tabeli dla klasy cls, tworząc ją
+        (wraz z zadeklarowanymi indeksami) przy pierwszym użyciu.
+        """
+        table = self._tables.get(cls)
+        if table is not None:
+            return table
+        table = _quote(cls.__name__.lower())
+        pk_col = primary_key(cls)
+        columns = ", ".join(
+            f"{_quote(f.name)} {_SQL_TYPES[f.kind]}"
+            + (" PRIMARY KEY" if f.name == pk_col else "")
+            for f in fields_of(cls)
+        )
+        with self._write():
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({columns})"
+            )
+        self._tables[cls] = table
+        for attr in self._indexes.get(cls, []):
+            self._create_sql_index(cls, attr)
+        return table
+
+    def _bulk(
+            self,
+            cls: Type,
+            op: str,
+            items: List[BatchItem],
+            result: BulkResult,
+    ) -> None:
+        """
+        Wykonuje operację op ("add", "update", "delete") na elementach
+        partii klasy cls, które przechodzą check_batch(),
+        jednym executemany w jednej transakcji zapisu.
+        """
+        table = self._table(cls)
+        schema = fields_of(cls)
+        pk_col = _quote(primary_key(cls))
+        with self._write():
+            existing = self._existing(cls, [key for _, key, _ in items])
+            valid = check_batch(cls, items, existing, op != "add", result)
+            if not valid:
+                return
+            if op == "add":
+                columns = ", ".join(_quote(f.name) for f in schema)
+                marks = ", ".join("?" for _ in schema)
+                sql = f"INSERT INTO {table} ({columns}) VALUES ({marks})"
+                rows = [self._row(obj, schema) for _, _, obj in valid]
+            elif op == "update":
+                assignments = ", ".join(
+                    f"{_quote(f.name)} = ?" for f in schema
+                )
+                sql = f"UPDATE {table} SET {assignments} WHERE {pk_col} = ?"
+                rows = [
+                    self._row(obj, schema) + [key] for _, key, obj in valid
+                ]
+            else:
+                sql = f"DELETE FROM {table} WHERE {pk_col} = ?"
+                rows = [(key,) for _, key, _ in valid]
+            try:
+                self._conn.executemany(sql, rows)
+            except sqlite3.IntegrityError as e:
+                raise KeyError(f"{cls.__name__}: {e}") from None
+        index = self._search_indexes.get(cls)
+        if index is not None:
+            for _, key, obj in valid:
+                if op == "delete":
+                    index.remove(key)
+                else:
+                    index.add(key, obj)
+        result.keys.extend(key for _, key, _ in valid)
+
+    def _existing(self, cls: Type, keys: List[str]) -> set:
+        """
+        Zwraca te z kluczy keys, które są już w tabeli klasy cls.
+        """
+        table = self._table(cls)
+        pk_col = _quote(primary_key(cls))
+        found = set()
+        for start in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[start:start + _MAX_PARAMS]
+            marks = ", ".join("?" for _ in chunk)
+            found.update(row[0] for row in self._conn.execute(
+                f"SELECT {pk_col} FROM {table} WHERE {pk_col} IN ({marks})",
+                chunk,
+            ))
+        return found
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """
+        Zatwierdza pojedynczą operację zapisu,
+        chyba że trwa transakcja (wtedy commit robi transaction()).
+        """
+        if self._in_tx:
+            yield
+        else:
+            with self._conn:
+                yield
+
+    def _where(
+            self,
+            cls: Type,
+            filters: Dict[str, Any],
+    ) -> Tuple[List[str], List[Any]]:
+        """
+        Zamienia filtry (wartości i warunki z storage.query)
+        na warunki WHERE i parametry.
+        """
+        where, params = [], []
+        for attr, pred in compile_filters(filters):
+            field = self._field(cls, attr)
+            col = _quote(attr)
+            if isinstance(pred, Range):
+                for bound, ops in ((pred.lower, (">", ">=")),
+                                   (pred.upper, ("<", "<="))):
+                    if bound is not None:
+                        value, inclusive = bound
+                        where.append(f"{col} {ops[inclusive]} ?")
+                        params.append(_encode(field, value))
+                continue
+            values = pred.values()
+            if values is None:
+                raise TypeError(f"Unsupported filter {pred!r} for {attr}")
+            present = [v for v in values if v is not None]
+            clauses = []
+            if present:
+                marks = ", ".join("?" for _ in present)
+                clauses.append(f"{col} IN ({marks})")
+                params.extend(_encode(field, v) for v in present)
+            if len(present) < len(values):
+                clauses.append(f"{col} IS NULL")
+            where.append("(" + " OR ".join(clauses or ["0"]) + ")")
+        return where, params
+
+    def _select(self, cls: Type) -> str:
+        """
+        Zwraca początek zapytania SELECT z jawną listą kolumn
+        w kolejności pól modelu.
+        """
+        columns = ", ".join(_quote(f.name) for f in fields_of(cls))
+        return f"SELECT {columns} FROM {self._table(cls)}"
+
+    def _create_sql_index(self, cls: Type, attr: str) -> None:
+        name = _quote(f"ix_{cls.__name__.lower()}_{attr}")
+        with self._write():
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} "
+                f"ON {self._tables[cls]} ({_quote(attr)})"
+            )
+
+    def _all_tables(self) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+        return [_quote(name) for (name,) in rows]
+
+    @staticmethod
+    def _field(cls: Type, attr: str) -> Field:
+        for field in fields_of(cls):
+            if field.name == attr:
+                return field
+        raise AttributeError(f"{cls.__name__} has no attribute {attr!r}")
+
+    @staticmethod
+    def _row(obj: Any, schema: List[Field]) -> List[Any]:
+        return [_encode(f, getattr(obj, f.name)) for f in schema]
+
+    @staticmethod
+    def _object(cls: Type, row: tuple) -> Any:
+        return build(cls, {
+            f.name: _decode(f, value)
+            for f, value in zip(fields_of(cls), row)
+        })
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _after(
+        pk_col: str,
+        key: str,
+        descending: bool,
+        ordered: Optional[Tuple[str, Any]],
+) -> Tuple[str, List[Any]]:
+    """
+    Warunek WHERE wybierający wiersze za kursorem (rekord key)
+    w porządku ORDER BY z Repository.iterate: wartości NULL
+    kolumny ordered=(kolumna, wartość kursora) są na końcu
+    porządku rosnącego.
+    """
+    op = "<" if descending else ">"
+    if ordered is None:
+        return f"{pk_col} {op} ?", [key]
+    col, value = ordered
+    if value is None:
+        if descending:
+            return f"({col} IS NOT NULL OR {pk_col} < ?)", [key]
+        return f"({col} IS NULL AND {pk_col} > ?)", [key]
+    after = (
+        f"({col} {op} ? OR ({col} = ? AND {pk_col} {op} ?))"
+    )
+    if descending:
+        return f"({col} IS NOT NULL AND {after})", [value, value, key]
+    return f"({col} IS NULL OR {after})", [value, value, key]
+
+
+def _py_lower(value: Any) -> Any:
+    return value.lower() if isinstance(value, str) else value
+
+
+def _encode(field: Field, value: Any) -> Any:
+    """
+    Zamienia wartość pola na typ obsługiwany przez SQLite.
+    """
+    if value is None:
+        return None
+    if field.kind == KIND_ENUM:
+        return value.name if isinstance(value, field.enum) else str(value)
+    if field.kind in (KIND_DATE, KIND_DATETIME):
+        return value.isoformat() if isinstance(value, date) else str(value)
+    if field.kind == KIND_BOOL:
+        return int(bool(value))
+    if field.kind == KIND_JSON:
+        return json.dumps(value, default=str)
+    return value
+
+
+def _decode(field: Field, value: Any) -> Any:
+    """
+    Odtwarza wartość pola z wartości zapisanej w SQLite.
+    """
+    if value is None:
+        return None
+    if field.kind == KIND_ENUM:
+        return field.enum[value.split(".")[-1]]
+    if field.kind == KIND_DATE:
+        return date.fromisoformat(value)
+    if field.kind == KIND_DATETIME:
+        return datetime.fromisoformat(value)
+    if field.kind == KIND_BOOL:
+        return bool(value)
+    if field.kind == KIND_JSON:
+        return json.loads(value)
+    return value
@@ -0,0 +1,139 @@
+from typing import Any, BinaryIO, Iterator
+import codecs
+import json
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+# Najdłuższy token JSON (-Infinity), który ucięty na granicy porcji
+# daje błąd składni przed końcem bufora.
+_TRUNCATION_MARGIN = len("-Infinity")
+
+
+class JsonArrayReader:
+    """
+    Strumieniowy parser pliku JSON zawierającego tablicę rekordów.
+    Czyta plik porcjami (chunk_size bajtów) i zwraca kolejne elementy
+    tablicy, nie budując w pamięci całej listy.
+    Atrybut bytes_read pozwala raportować postęp importu.
+    Błędy składni zgłaszane są jako json.JSONDecodeError / ValueError.
+    """
+
+    def __init__(self, f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        f musi być plikiem otwartym w trybie binarnym.
+        """
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            self._expect_end()
+            return
+        while True:
+            yield self._next_value()
+            sep = self._peek()
+            if sep == ",":
+                self._pos += 1
+            elif sep == "]":
+                self._pos += 1
+                self._expect_end()
+                return
+            else:
+                raise ValueError(
+                    f"Expected ',' or ']' in JSON array, got {sep!r}"
+                )
+
+    def _next_value(self) -> Any:
+        """
+        Dekoduje jeden element tablicy, doczytując kolejne porcje,
+        dopóki element nie jest kompletny. Błąd składni w środku
+        bufora (a nie przy jego końcu, gdzie element mógł zostać
+        ucięty) zgłaszany jest od razu, bez czytania reszty pliku.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof or not self._truncated(e):
+                    raise
+                self._fill()
+                continue
+            if end == len(self._buf) and not self._eof:
+                # Liczba mogła zostać ucięta na granicy porcji.
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def _truncated(self, error: json.JSONDecodeError) -> bool:
+        """
+        True, jeśli błąd dekodowania może wynikać z ucięcia elementu
+        na końcu bufora: wystąpił przy jego końcu albo łańcuch
+        nie został zamknięty.
+        """
+        return (
+            len(self._buf) - error.pos <= _TRUNCATION_MARGIN
+            or error.msg.startswith("Unterminated string")
+        )
+
+    def _peek(self) -> str:
+        """
+        Pomija białe znaki i zwraca następny znak ("" na końcu pliku).
+        """
+        while True:
+            while (
+                    self._pos < len(self._buf)
+                    and self._buf[self._pos] in _WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return ""
+            self._fill()
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(
+                f"Expected {char!r} in JSON array, got {found!r}"
+            )
+        self._pos += 1
+
+    def _expect_end(self) -> None:
+        found = self._peek()
+        if found:
+            raise ValueError(f"Unexpected data after JSON array: {found!r}")
+
+    def _fill(self) -> None:
+        """
+        Doczytuje kolejną porcję pliku, odrzucając już
+        przetworzony początek bufora.
+        """
+        raw = self._f.read(self._chunk_size)
+        self.bytes_read += len(raw)
+        if not raw:
+            self._eof = True
+        text = self._text.decode(raw, final=not raw)
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+
+
+def iter_json_array(
+        f: BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """
+    Skrót: zwraca iterator po elementach tablicy JSON z pliku f.
+    """
+    return iter(JsonArrayReader(f, chunk_size))
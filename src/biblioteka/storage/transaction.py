@@ -0,0 +1,59 @@
+from typing import Any, Dict, Optional, Tuple, Type
+import copy
+
+MISSING = object()
+
+TxKey = Tuple[Type, str]
+
+
+class Transaction:
+    """
+    Stan jednej transakcji (unit of work) repozytorium:
+    - saved: pierwotny obiekt z tabeli (lub MISSING) i kopia jego
+      atrybutów z chwili pierwszego dotknięcia w transakcji,
+    - dirty: klucze zmienione przez add/update/delete, w kolejności.
+    Na tej podstawie Repository wycofuje zmiany w pamięci
+    albo zapisuje je jednym, zbiorczym zapisem.
+    """
+
+    def __init__(self):
+        self.saved: Dict[TxKey, Tuple[Any, Optional[Dict[str, Any]]]] = {}
+        self.dirty: Dict[TxKey, None] = {}
+
+    def track(self, cls: Type, key: str, obj: Any) -> None:
+        """
+        Zapamiętuje stan obiektu przed pierwszą zmianą w transakcji.
+        obj=MISSING oznacza, że rekord wcześniej nie istniał.
+        """
+        tx_key = (cls, key)
+        if tx_key in self.saved:
+            return
+        if obj is MISSING:
+            self.saved[tx_key] = (MISSING, None)
+        else:
+            self.saved[tx_key] = (obj, snapshot_state(obj))
+
+    def mark_dirty(self, cls: Type, key: str) -> None:
+        """
+        Oznacza rekord jako zmieniony w tej transakcji.
+        """
+        self.dirty[(cls, key)] = None
+
+
+def snapshot_state(obj: Any) -> Dict[str, Any]:
+    """
+    Zwraca kopię atrybutów obiektu; kontenery (np. Member.current_loans)
+    są kopiowane, aby zmiany "w miejscu" nie psuły zapamiętanego stanu.
+    """
+    return {
+        name: copy.copy(value)
+        for name, value in getattr(obj, "__dict__", {}).items()
+    }
+
+
+def restore_state(obj: Any, state: Dict[str, Any]) -> None:
+    """
+    Przywraca atrybuty obiektu (z zachowaniem jego tożsamości).
+    """
+    obj.__dict__.clear()
+    obj.__dict__.update(state)
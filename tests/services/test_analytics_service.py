@@ -0,0 +1,73 @@
+import pytest
+from datetime import date
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.storage.repository import Repository
+
+pytest.importorskip("numpy")
+
+from biblioteka.services.analytics_service import AnalyticsService  # noqa: E402
+
+
+@pytest.fixture
+def repo():
+    repo = Repository()
+    repo.add(Book("1", "A", "X", publication_year=1995, genre="Sci-Fi"))
+    repo.add(Book("2", "B", "Y", publication_year=2003, genre="Kryminał"))
+    repo.add(Book("3", "C", "X", publication_year=1999, genre="Sci-Fi"))
+    repo.add(Book("4", "D", "Z"))
+    repo.add(Loan("L1", "M1", "1", date(2024, 1, 3), date(2024, 1, 17)))
+    repo.add(Loan("L2", "M1", "3", date(2024, 1, 9), date(2024, 1, 23)))
+    repo.add(Loan(
+        "L3", "M2", "2", date(2024, 2, 1), date(2024, 2, 15),
+        returned_on=date(2024, 2, 10),
+    ))
+    repo.add(Loan("L4", "M2", "4", date(2024, 2, 20), date(2024, 3, 5)))
+    return repo
+
+
+@pytest.fixture
+def stats(repo):
+    service = AnalyticsService(repo)
+    yield service
+    service.close()
+
+
+def test_catalog_statistics(stats):
+    assert stats.books_per_genre() == {"Sci-Fi": 2, "Kryminał": 1, None: 1}
+    assert stats.books_per_author() == {"X": 2, "Y": 1, "Z": 1}
+    assert stats.books_per_decade() == {1990: 2, 2000: 1}
+    assert stats.books_per_status() == {BookStatus.AVAILABLE: 4}
+
+
+def test_loan_statistics(stats):
+    assert stats.loans_per_genre() == {"Sci-Fi": 2, "Kryminał": 1, None: 1}
+    assert stats.loans_per_month() == {"2024-01": 2, "2024-02": 2}
+    ratio = stats.overdue_ratio(as_of=date(2024, 1, 20))
+    assert ratio == pytest.approx(1 / 3)
+    assert stats.overdue_ratio(as_of=date(2024, 1, 1)) == 0.0
+
+
+def test_statistics_follow_repository_changes(stats, repo):
+    assert stats.loans_per_genre()["Sci-Fi"] == 2
+
+    book = repo.get(Book, "4")
+    book.genre = "Sci-Fi"
+    repo.update(book)
+    loan = repo.get(Loan, "L1")
+    loan.mark_returned(date(2024, 1, 10))
+    repo.update(loan)
+    repo.delete(Book, "2")
+
+    assert stats.loans_per_genre() == {"Sci-Fi": 3, None: 1}
+    assert stats.books_per_genre() == {"Sci-Fi": 3}
+    assert stats.overdue_ratio(as_of=date(2024, 3, 31)) == pytest.approx(1.0)
+
+
+def test_empty_repository():
+    service = AnalyticsService(Repository())
+    assert service.books_per_genre() == {}
+    assert service.books_per_decade() == {}
+    assert service.loans_per_genre() == {}
+    assert service.loans_per_month() == {}
+    assert service.overdue_ratio() == 0.0
@@ -0,0 +1,47 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.member import Member
+from biblioteka.services import (
+    AsyncCatalogService,
+    AsyncLoanService,
+    AsyncMemberService,
+)
+from biblioteka.storage.async_repository import AsyncRepository
+from biblioteka.utils.exceptions import BookNotAvailable
+
+
+def test_async_services_share_sync_logic():
+    async def scenario():
+        repo = AsyncRepository()
+        catalog = AsyncCatalogService(repo)
+        members = AsyncMemberService(repo)
+        loans = AsyncLoanService(repo)
+
+        await catalog.add_book(Book(isbn="1", title="Lalka", author="Prus"))
+        for i in range(3):
+            await members.register_member(
+                Member(member_id=f"M{i}", name="N", registered_on=date.today())
+            )
+        results = await asyncio.gather(
+            *(loans.loan_book(f"M{i}", "1") for i in range(3)),
+            return_exceptions=True,
+        )
+        found = await catalog.search("lalka")
+        return repo, results, found
+
+    repo, results, found = asyncio.run(scenario())
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert len(errors) == 2
+    assert all(isinstance(e, BookNotAvailable) for e in errors)
+    assert repo.repo.get(Book, "1").status is BookStatus.LOANED
+    assert [b.isbn for b in found] == ["1"]
+
+
+def test_unknown_method_raises_attribute_error():
+    service = AsyncCatalogService(AsyncRepository())
+    with pytest.raises(AttributeError):
+        service.no_such_method
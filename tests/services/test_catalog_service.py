@@ -84,3 +84,40 @@ def test_list_and_search(catalog, sample_book):
 
     match = catalog.search_title_contains("Pan")
     assert match and match[0].isbn == "ISBN123"
+
+
+def test_search_ranks_books_and_follows_updates(catalog, sample_book):
+    catalog.add_book(sample_book)
+    catalog.add_book(Book(isbn="2", title="Lalka", author="Bolesław Prus"))
+
+    assert catalog.search("tadeusz") == [sample_book]
+    assert catalog.search("BOLESLAW")[0].isbn == "2"
+
+    catalog.update_book_info("2", title="Faraon")
+    assert catalog.search("lalka") == []
+    assert [b.isbn for b in catalog.search("faraon")] == ["2"]
+
+
+def test_iter_books_pages(catalog):
+    for i in range(5):
+        catalog.add_book(Book(isbn=f"B{i}", title=f"T{i}", author="A"))
+
+    assert [b.isbn for b in catalog.iter_books(limit=2, page=3)] == ["B4"]
+    assert [b.isbn for b in catalog.iter_books(limit=2, page=4)] == []
+    assert len(list(catalog.iter_books())) == 5
+    with pytest.raises(ValueError):
+        catalog.iter_books(limit=0)
+    with pytest.raises(ValueError, match="page requires limit"):
+        catalog.iter_books(page=2)
+
+
+def test_add_books_reports_duplicates(catalog, repo, sample_book):
+    catalog.add_book(sample_book)
+    other = Book(isbn="ISBN456", title="Lalka", author="Prus")
+    result = catalog.add_books([other, sample_book], user_role="ADMIN")
+    assert result.keys == ["ISBN456"]
+    assert [pos for pos, _ in result.errors] == [1]
+    assert repo.count(Book) == 2
+    with pytest.raises(PermissionDenied):
+        catalog.add_books([other], user_role="STUDENT")
+
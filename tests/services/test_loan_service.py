@@ -2,7 +2,9 @@ import pytest
 from datetime import date, timedelta
 from biblioteka.models.book import Book
 from biblioteka.models.member import Member
+from biblioteka.models.loan import Loan
 from biblioteka.services.loan_service import LoanService
+from biblioteka.storage.query import lt
 from biblioteka.storage.repository import Repository
 from biblioteka.utils.exceptions import (
     BookNotAvailable,
@@ -71,3 +73,43 @@ def test_renew_exceeds_limit(loan_svc, repo, setup_book_member):
     loan.renew_count = 2
     with pytest.raises(MaxRenewalsExceeded):
         loan_svc.renew_loan(loan.loan_id)
+
+
+def test_loan_book_failure_leaves_no_partial_state(loan_svc, repo):
+    """
+    Błąd w trakcie wypożyczenia (limit członka) wycofuje
+    zmianę statusu książki i nie zostawia rekordu Loan.
+    """
+    book = Book(isbn="B9", title="T", author="A")
+    member = Member(
+        member_id="M9", name="N", registered_on=date.today(), max_books=0,
+    )
+    repo.add(book)
+    repo.add(member)
+
+    with pytest.raises(ValueError):
+        loan_svc.loan_book("M9", "B9")
+    assert repo.get(Book, "B9").is_available()
+    assert repo.count(Loan) == 0
+    assert member.current_loans == []
+
+
+def test_overdue_and_due_within_use_active_due_index(loan_svc, repo):
+    loan_svc.enable_due_index()
+    today = date(2024, 5, 10)
+    for i, due in enumerate((3, 9, 10, 12, 20)):
+        repo.add(Loan(
+            loan_id=f"L{i}", member_id="M1", isbn=f"B{i}",
+            loan_date=date(2024, 4, 1), due_date=date(2024, 5, due),
+        ))
+    returned = repo.get(Loan, "L0")
+    returned.mark_returned(today)
+    repo.update(returned)
+
+    plan = repo.explain(Loan, returned_on=None, due_date=lt(today))
+    assert plan == {"index": "due_date", "kind": "sorted", "candidates": 1}
+    overdue = loan_svc.list_overdue_loans(as_of=today)
+    assert [l.loan_id for l in overdue] == ["L1"]
+    due_soon = loan_svc.list_due_within(2, as_of=today)
+    assert [l.loan_id for l in due_soon] == ["L2", "L3"]
+    assert repo.explain(Loan, due_date=lt(today))["kind"] == "scan"
@@ -0,0 +1,120 @@
+from datetime import date
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.storage import arrays
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.repository import Repository
+
+np = pytest.importorskip("numpy")
+
+from biblioteka.storage.arrays import NO_CODE, NO_DATE, ArrayTable  # noqa: E402
+
+
+def make_repo(cls=Repository):
+    repo = cls()
+    repo.add(Book(isbn="1", title="A", author="X", genre="Sci-Fi"))
+    repo.add(Book(isbn="2", title="B", author="Y", publication_year=1999))
+    repo.add(Book(isbn="3", title="C", author="X", genre="Sci-Fi"))
+    return repo
+
+
+def test_columns_encode_values():
+    repo = make_repo()
+    repo.add(Loan("L1", "M1", "1", date(2024, 1, 1), date(2024, 1, 15)))
+    books = ArrayTable(repo, Book)
+    loans = ArrayTable(repo, Loan, ("loan_date", "returned_on"))
+
+    codes, genres = books.categorical("genre")
+    assert genres == ["Sci-Fi"]
+    assert codes.tolist() == [0, NO_CODE, 0]
+    assert books.categorical("status")[1] == list(BookStatus)
+    years = books.column("publication_year")
+    assert np.isnan(years[0]) and years[1] == 1999
+    assert books.counts("author") == {"X": 2, "Y": 1}
+    assert books.counts("genre") == {"Sci-Fi": 2, None: 1}
+    assert loans.column("loan_date").tolist() == [
+        date(2024, 1, 1).toordinal(),
+    ]
+    assert loans.column("returned_on").tolist() == [NO_DATE]
+    assert books.values_for("genre", ["3", "9"]).tolist() == [0, NO_CODE]
+    with pytest.raises(ValueError):
+        ArrayTable(repo, Book, ("nope",))
+    with pytest.raises(ValueError):
+        books.counts("publication_year")
+
+
+def test_refresh_applies_only_changes():
+    repo = make_repo()
+    books = ArrayTable(repo, Book, ("genre", "status"))
+    assert len(books) == 3
+
+    book = repo.get(Book, "2")
+    book.genre = "Fantasy"
+    book.mark_loaned()
+    repo.update(book)
+    repo.delete(Book, "1")
+    repo.add(Book(isbn="4", title="D", author="Z", genre="Fantasy"))
+
+    fetched = []
+    original = repo.get
+
+    def recording_get(cls, pk):
+        fetched.append(pk)
+        return original(cls, pk)
+
+    repo.get = recording_get
+    assert books.counts("genre") == {"Sci-Fi": 1, "Fantasy": 2}
+    assert sorted(fetched) == ["1", "2", "4"]
+    assert books.keys() == ["2", "3", "4"]
+    assert books.counts("status") == {
+        BookStatus.AVAILABLE: 2, BookStatus.LOANED: 1,
+    }
+
+
+def test_rollback_and_clear_are_reflected():
+    repo = make_repo()
+    books = ArrayTable(repo, Book, ("genre",))
+    assert len(books) == 3
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.delete(Book, "1")
+            repo.add(Book(isbn="9", title="Z", author="Z"))
+            assert len(books) == 3
+            raise RuntimeError("boom")
+    assert sorted(books.keys()) == ["1", "2", "3"]
+
+    repo.clear(Book)
+    assert len(books) == 0
+    repo.add(Book(isbn="5", title="E", author="X", genre="Horror"))
+    assert books.counts("genre") == {"Horror": 1}
+
+
+def test_deleted_rows_are_compacted():
+    repo = Repository()
+    for i in range(10):
+        repo.add(Book(isbn=str(i), title="T", author="A", genre=f"G{i % 2}"))
+    books = ArrayTable(repo, Book, ("genre",))
+    assert len(books) == 10
+    for i in range(7):
+        repo.delete(Book, str(i))
+
+    assert books.keys() == ["7", "8", "9"]
+    assert books._size == 3
+    assert books.counts("genre") == {"G1": 2, "G0": 1}
+
+
+def test_closed_view_stops_watching():
+    repo = make_repo(ConcurrentRepository)
+    with ArrayTable(repo, Book) as books:
+        assert len(books) == 3
+    assert repo._watchers == ()
+
+
+def test_requires_numpy(monkeypatch):
+    monkeypatch.setattr(arrays, "np", None)
+    with pytest.raises(ImportError):
+        ArrayTable(Repository(), Book)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+import time
+
+from biblioteka.models.book import Book
+from biblioteka.storage.async_repository import AsyncRepository
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+
+
+def book_factory(rec):
+    return Book(**rec)
+
+
+def test_crud_and_async_iteration():
+    async def scenario():
+        repo = AsyncRepository()
+        for i in range(5):
+            await repo.add(Book(isbn=str(i), title=f"T{i}", author="A"))
+        book = await repo.get(Book, "3")
+        book.title = "Changed"
+        await repo.update(book)
+        await repo.delete(Book, "4")
+
+        seen = [b.isbn async for b in repo.iterate(Book, batch_size=2)]
+        changed = await repo.find_by_pattern(Book, "title", "chan")
+        return seen, changed, await repo.count(Book)
+
+    seen, changed, count = asyncio.run(scenario())
+    assert seen == ["0", "1", "2", "3"]
+    assert [b.isbn for b in changed] == ["3"]
+    assert count == 4
+
+
+def test_file_io_runs_in_executor(tmp_path):
+    path = tmp_path / "books.json"
+    path.write_text(json.dumps(
+        [{"isbn": "1", "title": "T", "author": "A"}]
+    ))
+    threads = []
+
+    class RecordingRepository(ConcurrentRepository):
+        def import_from_json(self, *args, **kwargs):
+            threads.append(threading.current_thread())
+            super().import_from_json(*args, **kwargs)
+
+    async def scenario():
+        repo = AsyncRepository(RecordingRepository())
+        repo.repo.register_loader(
+            Book,
+            lambda: repo.repo.import_from_json(Book, str(path), book_factory),
+        )
+        books = await repo.list(Book)
+        await repo.export_to_json(Book, str(tmp_path / "out.json"))
+        return books
+
+    books = asyncio.run(scenario())
+    assert [b.isbn for b in books] == ["1"]
+    assert threads and threads[0] is not threading.main_thread()
+    assert json.loads((tmp_path / "out.json").read_text())[0]["isbn"] == "1"
+
+
+def test_lock_wait_does_not_block_event_loop(tmp_path):
+    path = tmp_path / "books.json"
+    path.write_text(json.dumps(
+        [{"isbn": str(i), "title": "T", "author": "A"} for i in range(3)]
+    ))
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_factory(rec):
+        # Import trzyma blokadę zapisu tabeli Book aż do release.
+        started.set()
+        release.wait(5)
+        return Book(**rec)
+
+    async def scenario():
+        repo = AsyncRepository()
+        importing = asyncio.create_task(
+            repo.import_from_json(Book, str(path), slow_factory),
+        )
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        reading = asyncio.create_task(repo.get(Book, "1"))
+        gaps = []
+        for _ in range(10):
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            gaps.append(time.perf_counter() - start)
+        waiting = not reading.done()
+        release.set()
+        await importing
+        return gaps, waiting, await reading
+
+    gaps, waiting, book = asyncio.run(scenario())
+    assert waiting
+    assert max(gaps) < 1
+    assert book.isbn == "1"
+
+
+def test_iterate_fetches_pages():
+    limits = []
+
+    class RecordingRepository(ConcurrentRepository):
+        def iterate(self, cls, **kwargs):
+            limits.append(kwargs.get("limit"))
+            return super().iterate(cls, **kwargs)
+
+    async def scenario():
+        repo = AsyncRepository(RecordingRepository())
+        await repo.add_many(
+            Book(isbn=f"{i:02d}", title=f"T{i % 7}", author="A")
+            for i in range(20)
+        )
+        by_title = [
+            b.isbn async for b in repo.iterate(
+                Book, batch_size=3, order_by="-title", limit=10,
+            )
+        ]
+        in_table_order = [b.isbn async for b in repo.iterate(Book, batch_size=6)]
+        return repo.repo, by_title, in_table_order
+
+    sync_repo, by_title, in_table_order = asyncio.run(scenario())
+    assert limits and max(limits) <= 6
+    assert by_title == [
+        b.isbn for b in sync_repo.iterate(Book, order_by="-title", limit=10)
+    ]
+    assert in_table_order == [f"{i:02d}" for i in range(20)]
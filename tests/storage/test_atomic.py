@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from biblioteka.models.book import Book
+from biblioteka.storage.atomic import atomic_write
+from biblioteka.storage.repository import Repository
+from biblioteka.utils.exceptions import DataExportError
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = str(tmp_path / "data.txt")
+    with open(path, "w") as f:
+        f.write("old")
+
+    with atomic_write(path) as f:
+        f.write("new")
+        with open(path) as current:
+            assert current.read() == "old"
+
+    with open(path) as f:
+        assert f.read() == "new"
+    assert os.listdir(tmp_path) == ["data.txt"]
+
+
+def test_failed_write_keeps_previous_version(tmp_path):
+    path = str(tmp_path / "data.txt")
+    with open(path, "w") as f:
+        f.write("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("half")
+            raise RuntimeError("crash")
+
+    with open(path) as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["data.txt"]
+
+
+def test_interrupted_export_leaves_importable_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "books.json")
+    repo = Repository()
+    repo.add(Book(isbn="1", title="T", author="A"))
+    repo.export_to_json(Book, path)
+
+    repo.add(Book(isbn="2", title="U", author="B"))
+
+    def crash(records, f):
+        f.write(b'[{"isbn": "1"')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(repo.codec, "dump", crash)
+    with pytest.raises(DataExportError):
+        repo.export_to_json(Book, path)
+    monkeypatch.undo()
+
+    other = Repository()
+    other.import_from_json(Book, path, lambda rec: Book(**rec))
+    assert [b.isbn for b in other.list_books()] == ["1"]
+    assert os.listdir(tmp_path) == ["books.json"]
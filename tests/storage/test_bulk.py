@@ -0,0 +1,118 @@
+import pytest
+
+from biblioteka.models.book import Book
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.journal import Journal
+from biblioteka.storage.query import between
+from biblioteka.storage.repository import Repository
+from biblioteka.storage.sqlite_repository import SQLiteRepository
+from biblioteka.utils.exceptions import DataImportError
+
+
+def make_repo(kind):
+    if kind == "sqlite":
+        return SQLiteRepository(indexes={Book: ("author",)})
+    cls = ConcurrentRepository if kind == "concurrent" else Repository
+    return cls(
+        indexes={Book: ("author",)},
+        sorted_indexes={Book: ("publication_year",)},
+    )
+
+
+def book(i, year=2000):
+    return Book(
+        isbn=f"B{i}", title=f"T{i}", author=f"A{i % 2}",
+        publication_year=year,
+    )
+
+
+@pytest.mark.parametrize("kind", ["memory", "concurrent", "sqlite"])
+def test_bulk_operations_report_per_item_errors(kind):
+    repo = make_repo(kind)
+    repo.add(book(0))
+
+    result = repo.add_many([book(1), book(0), book(2), book(1), object()])
+    assert result.keys == ["B1", "B2"]
+    assert [pos for pos, _ in result.errors] == [1, 3, 4]
+    assert isinstance(result.errors[0][1], KeyError)
+    assert not result.ok
+    assert repo.count(Book) == 3
+
+    result = repo.update_many([book(1, 1990), book(9, 1990)])
+    assert result.keys == ["B1"] and [p for p, _ in result.errors] == [1]
+    assert [b.isbn for b in repo.list(Book, publication_year=1990)] == ["B1"]
+    assert [b.isbn for b in repo.list(Book, author="A0")] == ["B0", "B2"]
+
+    result = repo.delete_many(Book, ["B0", "B9", "B2"])
+    assert result.keys == ["B0", "B2"]
+    with pytest.raises(KeyError):
+        result.raise_first()
+    assert [b.isbn for b in repo.list(Book)] == ["B1"]
+
+
+def test_bulk_maintains_indexes_like_single_operations():
+    bulk = make_repo("memory")
+    single = make_repo("memory")
+    books = [book(i, 1900 + (i * 37) % 100) for i in range(200)]
+    bulk.add_many(books)
+    for b in books:
+        single.add(b)
+    for b in books[::3]:
+        b.publication_year = 2100
+    bulk.update_many(books[::3])
+    for b in books[::3]:
+        single.update(b)
+    bulk.delete_many(Book, [b.isbn for b in books[1::3]])
+    for b in books[1::3]:
+        single.delete(Book, b.isbn)
+
+    for query in ({"publication_year": between(1950, 1960)},
+                  {"publication_year": 2100}, {"author": "A1"}):
+        assert bulk.list(Book, **query) == single.list(Book, **query)
+
+
+def test_bulk_journal_and_transaction_rollback(tmp_path):
+    repo = Repository()
+    journal = Journal(str(tmp_path / "books.journal"))
+    repo.attach_journal(Book, journal)
+    version = repo.version
+
+    repo.add_many([book(i) for i in range(5)])
+    assert repo.version == version + 1
+    assert [r["op"] for r in journal.records()] == ["add"] * 5
+    assert set(repo.dirty_keys(Book)) == {f"B{i}" for i in range(5)}
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.delete_many(Book, ["B0", "B1"])
+            repo.add_many([book(7)])
+            raise RuntimeError("rollback")
+    assert sorted(b.isbn for b in repo.list(Book)) == [
+        f"B{i}" for i in range(5)
+    ]
+    assert len(journal) == 5
+
+
+def test_import_uses_batches_and_rejects_duplicates(tmp_path, monkeypatch):
+    from biblioteka.storage import repository
+
+    monkeypatch.setattr(repository, "IMPORT_BATCH_SIZE", 3)
+    source = Repository()
+    source.add_many([book(i) for i in range(10)])
+    path = tmp_path / "books.json"
+    source.export_to_json(Book, str(path))
+
+    calls = []
+    repo = Repository()
+    original = repo.add_many
+    monkeypatch.setattr(
+        repo, "add_many",
+        lambda objs: calls.append(len(objs)) or original(objs),
+    )
+    repo.import_from_json(Book, str(path))
+    assert calls == [3, 3, 3, 1]
+    assert repo.count(Book) == 10
+
+    path.write_text(path.read_text().replace('"B3"', '"B2"'))
+    with pytest.raises(DataImportError, match="B2"):
+        repo.import_from_json(Book, str(path))
@@ -0,0 +1,142 @@
+from datetime import date
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.member import Member
+from biblioteka.storage.changes import (
+    CLEAR,
+    DELETE,
+    INSERT,
+    UPDATE,
+    EventLog,
+    apply_event,
+    read_events,
+)
+from biblioteka.storage.repository import Repository
+
+
+@pytest.fixture
+def repo():
+    return Repository()
+
+
+def record(repo, classes=None):
+    events = []
+    repo.subscribe(events.append, classes)
+    return events
+
+
+def test_insert_update_delete_events(repo):
+    events = record(repo)
+    repo.add(Book(isbn="1", title="T", author="A"))
+    repo.update(Book(isbn="1", title="T2", author="A"))
+    repo.delete(Book, "1")
+
+    assert [(e.op, e.cls, e.key) for e in events] == [
+        (INSERT, Book, "1"), (UPDATE, Book, "1"), (DELETE, Book, "1"),
+    ]
+    insert, update, delete = events
+    assert insert.old is None and insert.new["status"] == "AVAILABLE"
+    assert update.old["title"] == "T" and update.new["title"] == "T2"
+    assert delete.old["title"] == "T2" and delete.new is None
+    assert [e.version for e in events] == [1, 2, 3]
+
+
+def test_old_state_of_in_place_updates(repo):
+    repo.add(Member("M1", "Ala", date(2024, 1, 1)))
+    events = record(repo)
+
+    # W transakcji stan sprzed zmiany pochodzi z pierwszego odczytu,
+    # także przez list().
+    with repo.transaction():
+        (member,) = repo.list(Member)
+        member.current_loans.append("L1")
+        repo.update(member)
+    (event,) = events
+    assert event.old["current_loans"] == []
+    assert event.new["current_loans"] == ["L1"]
+    assert event.new["registered_on"] == "2024-01-01"
+
+    # Poza transakcją zmiana "w miejscu" nie ma old, niezależnie
+    # od wcześniejszych odczytów, a nowy obiekt — ma.
+    events.clear()
+    member = repo.get(Member, "M1")
+    member.current_loans.append("L2")
+    repo.update(member)
+    repo.update(Member("M1", "Ola", date(2024, 1, 1)))
+    assert [e.old for e in events][0] is None
+    assert events[1].old["current_loans"] == ["L1", "L2"]
+    assert events[1].new["name"] == "Ola"
+
+
+def test_transaction_publishes_net_changes_on_commit(repo):
+    repo.add(Book(isbn="1", title="T", author="A"))
+    repo.add(Book(isbn="2", title="U", author="B"))
+    events = record(repo)
+
+    with repo.transaction():
+        book = repo.get(Book, "1")
+        book.mark_loaned()
+        repo.update(book)
+        repo.add(Book(isbn="3", title="V", author="C"))
+        repo.delete(Book, "3")
+        repo.delete(Book, "2")
+        assert events == []
+
+    assert [(e.op, e.key) for e in events] == [(UPDATE, "1"), (DELETE, "2")]
+    assert events[0].old["status"] == BookStatus.AVAILABLE.name
+    assert events[0].new["status"] == BookStatus.LOANED.name
+
+    events.clear()
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add(Book(isbn="4", title="W", author="D"))
+            raise RuntimeError("rollback")
+    assert events == []
+
+
+def test_class_filter_clear_and_unsubscribe(repo):
+    books = record(repo, classes=[Book])
+    repo.add(Member("M1", "Ala", date(2024, 1, 1)))
+    repo.add(Book(isbn="1", title="T", author="A"))
+    repo.clear(Member)
+    repo.clear()
+
+    assert [(e.op, e.cls) for e in books] == [
+        (INSERT, Book), (CLEAR, None),
+    ]
+
+    repo.unsubscribe(books.append)
+    repo.add(Book(isbn="2", title="U", author="B"))
+    assert len(books) == 2
+
+
+def test_lazy_loading_is_not_published(repo):
+    events = record(repo)
+    repo.register_loader(
+        Book, lambda: repo.add(Book(isbn="1", title="T", author="A")),
+    )
+    assert repo.count(Book) == 1
+    assert events == []
+
+
+def test_event_log_replays_into_replica(tmp_path, repo):
+    path = str(tmp_path / "events.jsonl")
+    with EventLog(path) as log:
+        repo.subscribe(log)
+        repo.add(Book(isbn="1", title="T", author="A"))
+        repo.add(Book(isbn="2", title="U", author="B"))
+        book = repo.get(Book, "1")
+        book.mark_loaned()
+        repo.update(book)
+        repo.delete(Book, "2")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "insert"')
+
+    replica = Repository()
+    for event in read_events(path):
+        apply_event(replica, event, {"Book": Book})
+
+    assert replica.list(Book) == repo.list(Book)
+    assert replica.get(Book, "1").status is BookStatus.LOANED
@@ -0,0 +1,144 @@
+from datetime import date, datetime
+import json
+
+import pytest
+
+from biblioteka.models import Book, Member, Loan, Role, User
+from biblioteka.models.book import BookStatus
+from biblioteka.models.reservation import Reservation
+from biblioteka.storage import codecs
+from biblioteka.storage.codecs import (
+    Codec,
+    FastJsonCodec,
+    JsonCodec,
+    JsonLinesCodec,
+    best_codec,
+    get_codec,
+)
+from biblioteka.storage.repository import Repository
+from biblioteka.utils.exceptions import DataImportError
+
+
+def make_records():
+    book = Book(isbn="1", title="Pan Tadeusz", author="Mickiewicz")
+    book.status = BookStatus.LOANED
+    member = Member(
+        member_id="M1",
+        name="Ala",
+        registered_on=date(2024, 1, 2),
+        current_loans=["L1"],
+    )
+    loan = Loan(
+        loan_id="L1",
+        member_id="M1",
+        isbn="1",
+        loan_date=date(2024, 2, 1),
+        due_date=date(2024, 2, 15),
+    )
+    reservation = Reservation("R1", "M1", "1", date(2024, 3, 1))
+    reservation.active = False
+    user = User(
+        user_id="U1",
+        name="Ola",
+        role=Role.LIBRARIAN,
+        joined_on=datetime(2024, 1, 1, 12, 30),
+    )
+    return [book, member, loan, reservation, user]
+
+
+def available_codecs():
+    names = ["json", "jsonl"]
+    if codecs.orjson is not None or codecs.msgspec is not None:
+        names.append("fast-json")
+    return names
+
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_export_import_round_trip(tmp_path, name):
+    repo = Repository(codec=get_codec(name))
+    objects = make_records()
+    for obj in objects:
+        repo.add(obj)
+
+    other = Repository(codec=get_codec(name))
+    for obj in objects:
+        cls = type(obj)
+        path = str(tmp_path / f"{cls.__name__}.{name}")
+        repo.export_to_json(cls, path)
+        other.import_from_json(cls, path)
+        assert other.list(cls) == [obj]
+        assert other.list(cls)[0].__dict__ == obj.__dict__
+
+
+def test_encode_uses_names_and_iso_dates():
+    book, member, _, _, user = make_records()
+    codec = JsonCodec()
+    assert codec.encode(book)["status"] == "LOANED"
+    assert codec.encode(member)["registered_on"] == "2024-01-02"
+    assert codec.encode(user)["joined_on"] == "2024-01-01T12:30:00"
+
+
+def test_decode_accepts_legacy_values():
+    codec = JsonCodec()
+    book = codec.decode(Book, {
+        "isbn": "1", "title": "T", "author": "A",
+        "status": "BookStatus.RESERVED",
+    })
+    user = codec.decode(User, {
+        "user_id": "U1", "name": "Ola", "role": "Role.ADMIN",
+        "joined_on": "2024-01-01 12:30:00",
+    })
+    assert book.status is BookStatus.RESERVED
+    assert user.role is Role.ADMIN
+    assert user.joined_on == datetime(2024, 1, 1, 12, 30)
+
+
+def test_decode_restores_computed_fields_and_validates():
+    codec = JsonCodec()
+    reservation = codec.decode(Reservation, {
+        "reservation_id": "R1", "member_id": "M1", "isbn": "1",
+        "reserved_on": "2024-03-01", "expiration_date": "2024-04-01",
+        "active": False,
+    })
+    assert reservation.expiration_date == date(2024, 4, 1)
+    assert reservation.active is False
+    with pytest.raises(ValueError):
+        codec.decode(Member, {
+            "member_id": "M1", "name": "Ala",
+            "registered_on": "2024-01-02", "email": "zly-adres",
+        })
+
+
+def test_json_codec_is_compact_and_jsonl_writes_lines(tmp_path):
+    repo = Repository()
+    for i in range(3):
+        repo.add(Book(isbn=str(i), title="T", author="A"))
+    path = tmp_path / "books.json"
+    repo.export_to_json(Book, str(path))
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text and ", " not in text
+    assert len(json.loads(text)) == 3
+
+    repo.export_to_json(Book, str(path), codec=JsonLinesCodec())
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["isbn"] for line in lines] == ["0", "1", "2"]
+
+
+def test_jsonl_syntax_error_names_line(tmp_path):
+    path = tmp_path / "books.jsonl"
+    path.write_text('{"isbn": "1", "title": "T", "author": "A"}\n{"isbn"\n')
+    repo = Repository(codec=JsonLinesCodec())
+    with pytest.raises(DataImportError, match="Line 2"):
+        repo.import_from_json(Book, str(path))
+
+
+def test_codec_selection(monkeypatch):
+    with pytest.raises(ValueError):
+        get_codec("xml")
+    with pytest.raises(TypeError):
+        Codec()
+    monkeypatch.setattr(codecs, "orjson", None)
+    monkeypatch.setattr(codecs, "msgspec", None)
+    assert isinstance(best_codec(), JsonCodec)
+    with pytest.raises(ImportError):
+        FastJsonCodec()
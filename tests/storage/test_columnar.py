@@ -0,0 +1,136 @@
+from datetime import date, datetime, timezone
+import json
+import os
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.models.member import Member
+from biblioteka.models.user import User, Role
+from biblioteka.storage.columnar import read_columnar, write_columnar
+from biblioteka.storage.repository import Repository
+from biblioteka.utils.exceptions import DataExportError, DataImportError
+
+
+def _books(n):
+    return [
+        Book(
+            isbn=f"{i:05d}",
+            title=f"Tytuł {i}",
+            author=f"Autor {i % 20}",
+            publication_year=1950 + i % 70,
+            genre=("Fantastyka", "Kryminał", None)[i % 3],
+            location=f"Regał {i % 10}",
+            status=BookStatus.LOANED if i % 4 == 0 else BookStatus.AVAILABLE,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma", "none"])
+def test_round_trip_all_field_kinds(tmp_path, compression):
+    joined = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    users = [
+        User("U1", "Zażółć", Role.LIBRARIAN, joined),
+        User("U2", "Bob", Role.GUEST, datetime(2020, 1, 1, 8, 0)),
+    ]
+    member = Member(
+        member_id="M1", name="Ala", registered_on=date(2023, 1, 2),
+        email=None, current_loans=["L1", "L2"],
+    )
+    path = str(tmp_path / "data.col")
+
+    count = write_columnar(
+        path, User, ((u.user_id, u) for u in users), compression,
+    )
+    write_columnar(path + "m", Member, [("M1", member)], compression)
+
+    assert count == 2
+    assert read_columnar(path, User) == [("U1", users[0]), ("U2", users[1])]
+    assert read_columnar(path, User)[1][1].joined_on.tzinfo is None
+    assert read_columnar(path + "m", Member) == [("M1", member)]
+
+
+def test_repository_export_and_import(tmp_path):
+    repo = Repository(indexes={Book: ("genre",)})
+    books = _books(500)
+    for book in books:
+        repo.add(book)
+    path = str(tmp_path / "books.col")
+
+    repo.export_columnar(Book, path)
+    other = Repository(indexes={Book: ("genre",)})
+    other.add(Book(isbn="X", title="Stara", author="A"))
+    other.import_columnar(Book, path)
+
+    assert other.list_books() == books
+    assert other.get(Book, "X") is None
+    assert len(other.list(Book, genre="Kryminał")) == 167
+    assert other.get(Book, "00004").status is BookStatus.LOANED
+
+
+def test_columnar_is_much_smaller_than_json(tmp_path):
+    repo = Repository()
+    for book in _books(2000):
+        repo.add(book)
+    json_path = str(tmp_path / "books.json")
+    col_path = str(tmp_path / "books.col")
+
+    repo.export_to_json(Book, json_path)
+    repo.export_columnar(Book, col_path)
+
+    assert os.path.getsize(col_path) * 10 < os.path.getsize(json_path)
+
+
+def test_dates_and_nulls(tmp_path):
+    loan = Loan(
+        loan_id="L1", member_id="M1", isbn="1",
+        loan_date=date(2024, 1, 1), due_date=date(2024, 1, 15),
+    )
+    path = str(tmp_path / "loans.col")
+    write_columnar(path, Loan, [("L1", loan)])
+
+    [(key, restored)] = read_columnar(path, Loan)
+
+    assert key == "L1"
+    assert restored == loan
+    assert restored.returned_on is None
+
+
+def test_invalid_files_raise(tmp_path):
+    path = str(tmp_path / "books.col")
+    write_columnar(path, Book, [("1", _books(1)[0])])
+
+    with pytest.raises(ValueError):
+        read_columnar(path, Member)
+    with pytest.raises(ValueError):
+        write_columnar(path, Book, [], compression="bz2")
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-5])
+    with pytest.raises(Exception):
+        read_columnar(path, Book)
+
+    json_path = tmp_path / "books.json"
+    json_path.write_text(json.dumps([]))
+    with pytest.raises(ValueError):
+        read_columnar(str(json_path), Book)
+
+
+def test_repository_columnar_errors(tmp_path):
+    repo = Repository()
+    repo.add(Book(isbn="1", title="T", author="A"))
+    with pytest.raises(DataImportError):
+        repo.import_columnar(Book, str(tmp_path / "missing.col"))
+    with pytest.raises(DataExportError):
+        repo.export_columnar(Book, str(tmp_path / "b.col"), "bz2")
+    with pytest.raises(DataExportError):
+        repo.export_columnar(Book, str(tmp_path / "no" / "b.col"))
+
+    path = tmp_path / "bad.col"
+    path.write_bytes(b"garbage")
+    with pytest.raises(DataImportError):
+        repo.import_columnar(Book, str(path))
+    assert repo.count(Book) == 1
@@ -0,0 +1,134 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.models.member import Member
+from biblioteka.services.loan_service import LoanService
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.locks import RWLock
+from biblioteka.utils.exceptions import BookNotAvailable
+
+
+def run_threads(target, count):
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(i):
+        barrier.wait()
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=worker, args=(i,)) for i in range(count)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return errors
+
+
+def test_rwlock_allows_concurrent_readers_and_excludes_writer():
+    lock = RWLock()
+    inside = []
+    state = {"readers": 0, "max": 0}
+    guard = threading.Lock()
+
+    def reader(_):
+        with lock.read():
+            with guard:
+                state["readers"] += 1
+                state["max"] = max(state["max"], state["readers"])
+            time.sleep(0.05)
+            with guard:
+                state["readers"] -= 1
+
+    assert run_threads(reader, 4) == []
+    assert state["max"] > 1
+
+    def writer(i):
+        with lock.write():
+            inside.append(i)
+            time.sleep(0.01)
+            assert inside[-1] == i
+            with lock.write(), lock.read():
+                pass
+
+    assert run_threads(writer, 4) == []
+
+
+def test_rwlock_rejects_upgrade():
+    lock = RWLock()
+    with lock.read():
+        with lock.read():
+            pass
+        with pytest.raises(RuntimeError):
+            with lock.write():
+                pass
+    with lock.write():
+        pass
+
+
+def test_concurrent_loans_of_one_book_succeed_once():
+    repo = ConcurrentRepository(indexes={Book: ("status",)})
+    repo.add(Book(isbn="1", title="T", author="A"))
+    for i in range(8):
+        repo.add(
+            Member(member_id=f"M{i}", name="N", registered_on=date.today())
+        )
+    service = LoanService(repo)
+
+    errors = run_threads(lambda i: service.loan_book(f"M{i}", "1"), 8)
+
+    assert len(errors) == 7
+    assert all(isinstance(e, BookNotAvailable) for e in errors)
+    loans = repo.list(Loan)
+    assert len(loans) == 1
+    assert repo.get(Book, "1").status is BookStatus.LOANED
+    assert repo.list(Book, status=BookStatus.AVAILABLE) == []
+    holders = [m for m in repo.list(Member) if m.current_loans]
+    assert [m.current_loans for m in holders] == [[loans[0].loan_id]]
+
+
+def test_transaction_is_per_thread():
+    repo = ConcurrentRepository()
+    repo.add(Book(isbn="1", title="T", author="A"))
+    started, done = threading.Event(), threading.Event()
+
+    def reader():
+        started.wait()
+        repo.get(Book, "1")
+        repo.list(Book)
+        done.set()
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    with repo.transaction():
+        started.set()
+        assert done.wait(5)
+        assert repo._tx.saved == {}
+    thread.join()
+
+
+def test_lazy_loader_runs_once_under_contention():
+    repo = ConcurrentRepository()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.02)
+        repo.add(Book(isbn="1", title="T", author="A"))
+
+    repo.register_loader(Book, loader)
+    results = []
+    errors = run_threads(lambda i: results.append(repo.count(Book)), 6)
+
+    assert errors == []
+    assert calls == [1]
+    assert results == [1] * 6
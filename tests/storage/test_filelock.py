@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from biblioteka.storage.filelock import FileLock, TableLocks
+
+
+def test_generation_is_bumped_by_writers(tmp_path):
+    path = str(tmp_path / "books.json")
+    lock = FileLock(path)
+
+    with lock.shared():
+        assert lock.generation() == 0
+        with pytest.raises(RuntimeError):
+            lock.bump()
+    with lock.exclusive():
+        with lock.shared():
+            assert lock.bump() == 1
+        assert lock.bump() == 2
+    with FileLock(path).shared() as other:
+        assert other.generation() == 2
+
+    with pytest.raises(RuntimeError):
+        lock.generation()
+    with lock.shared():
+        with pytest.raises(RuntimeError):
+            lock.acquire(exclusive=True)
+
+
+def test_exclusive_lock_blocks_other_holders(tmp_path):
+    path = str(tmp_path / "books.json")
+    events = []
+    locked = threading.Event()
+
+    def reader():
+        locked.wait()
+        with FileLock(path).shared():
+            events.append("read")
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    with FileLock(path).exclusive():
+        locked.set()
+        time.sleep(0.1)
+        events.append("write")
+    thread.join()
+
+    assert events == ["write", "read"]
+
+
+def test_commit_detects_tables_changed_by_others(tmp_path):
+    books = str(tmp_path / "books.json")
+    loans = str(tmp_path / "loans.json")
+    first, second = TableLocks(), TableLocks()
+    for locks in (first, second):
+        for path in (books, loans):
+            with locks.reading(path):
+                pass
+
+    with first.committing([loans]) as stale:
+        assert stale == []
+    with second.committing([books]) as stale:
+        assert stale == [loans]
+    assert second.conflicts == [loans]
+    with second.lock(books).shared() as lock:
+        assert lock.generation() == 0
+
+    with second.reading(loans):
+        pass
+    with second.committing([books]) as stale:
+        assert stale == []
+    assert second.versions == {books: 1, loans: 1}
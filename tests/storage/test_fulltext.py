@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from biblioteka.storage.fulltext import FullTextIndex, fold, tokenize
+
+FIELDS = ("title", "author", "description")
+
+
+@dataclass
+class Doc:
+    isbn: str
+    title: str
+    author: str
+    description: Optional[str] = None
+
+
+def build_index():
+    index = FullTextIndex(FIELDS)
+    index.add("1", Doc("1", "Pan Tadeusz", "Adam Mickiewicz", "Epopeja"))
+    index.add("2", Doc("2", "Lalka", "Bolesław Prus", "Powieść o Wokulskim"))
+    index.add("3", Doc("3", "Quo vadis", "Henryk Sienkiewicz"))
+    index.add("4", Doc("4", "Potop", "Henryk Sienkiewicz", "Potop szwedzki"))
+    return index
+
+
+def test_fold_and_tokenize_polish_text():
+    assert fold("Żółć ŁĄKA") == "zolc laka"
+    assert tokenize("Bolesław Prus, \"Lalka\" (1890)") == [
+        "boleslaw", "prus", "lalka", "1890",
+    ]
+
+
+def test_search_ranks_with_bm25_and_limits_results():
+    index = build_index()
+
+    assert [pk for pk, _ in index.search("potop")] == ["4"]
+    assert [pk for pk, _ in index.search("sienkiewicz potop")] == ["4", "3"]
+    assert len(index.search("HENRYK", k=1)) == 1
+    assert [pk for pk, _ in index.search("powiesc boleslaw")] == ["2"]
+    assert index.search("nieznane") == []
+    assert index.search("potop", k=0) == []
+
+
+def test_incremental_update_and_remove():
+    index = build_index()
+    index.add("2", Doc("2", "Faraon", "Bolesław Prus"))
+    assert index.search("lalka") == []
+    assert [pk for pk, _ in index.search("faraon")] == ["2"]
+
+    index.remove("4")
+    assert [pk for pk, _ in index.search("potop")] == []
+    assert len(index) == 3
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "books.search.json")
+    index = build_index()
+    index.save(path, source=[["books.json", 10, 1]])
+
+    loaded = FullTextIndex.load(path, FIELDS, [["books.json", 10, 1]])
+    assert loaded is not None
+    assert loaded.search("sienkiewicz") == index.search("sienkiewicz")
+
+    assert FullTextIndex.load(path, FIELDS, [["books.json", 11, 1]]) is None
+    assert FullTextIndex.load(path, ("title",), [["books.json", 10, 1]]) \
+        is None
+    assert FullTextIndex.load(str(tmp_path / "missing"), FIELDS) is None
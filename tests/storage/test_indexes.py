@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+
+import pytest
+
+from biblioteka.storage.indexes import HashIndex, SortedIndex, TrigramIndex
+
+
+@dataclass
+class Item:
+    isbn: str
+    category: object
+
+
+def test_add_lookup_remove():
+    index = HashIndex("category")
+    index.add("A", Item("A", "alpha"))
+    index.add("B", Item("B", "beta"))
+    index.add("C", Item("C", "alpha"))
+
+    assert list(index.lookup("alpha")) == ["A", "C"]
+    assert index.size_of("alpha") == 2
+
+    index.remove("A")
+    assert list(index.lookup("alpha")) == ["C"]
+    index.remove("NOPE")
+    assert list(index.lookup("gamma")) == []
+
+
+def test_readd_moves_key_to_new_bucket():
+    index = HashIndex("category")
+    item = Item("A", "alpha")
+    index.add("A", item)
+    item.category = "beta"
+    index.add("A", item)
+
+    assert list(index.lookup("alpha")) == []
+    assert list(index.lookup("beta")) == ["A"]
+
+
+def test_unhashable_values_are_always_candidates():
+    index = HashIndex("category")
+    index.add("A", Item("A", ["x"]))
+    index.add("B", Item("B", "beta"))
+
+    assert set(index.lookup("beta")) == {"A", "B"}
+    assert list(index.lookup(["x"])) == ["A"]
+
+    index.clear()
+    assert list(index.lookup("beta")) == []
+
+
+def test_trigram_search_is_case_insensitive():
+    index = TrigramIndex("category")
+    index.add("A", Item("A", "Pan Tadeusz"))
+    index.add("B", Item("B", "Lalka"))
+    index.add("C", Item("C", "Quo Vadis"))
+
+    assert index.search("TADEU") == ["A"]
+    assert index.search("ka") == ["B"]
+    assert index.search("a") == ["A", "B", "C"]
+    assert index.search("xyz") == []
+
+
+def test_trigram_update_and_remove():
+    index = TrigramIndex("category")
+    item = Item("A", "Lalka")
+    index.add("A", item)
+    item.category = "Potop"
+    index.add("A", item)
+
+    assert index.search("lalk") == []
+    assert index.search("poto") == ["A"]
+
+    index.remove("A")
+    assert index.search("poto") == []
+    index.add("B", Item("B", 123))
+    assert index.search("12") == []
+
+
+def test_sorted_index_ranges_and_updates():
+    index = SortedIndex("category")
+    for pk, value in (("A", 3), ("B", 1), ("C", 2), ("D", None), ("E", 2)):
+        index.add(pk, Item(pk, value))
+
+    assert index.range() == ["B", "C", "E", "A"]
+    assert index.range((2, True), (3, False)) == ["C", "E"]
+    assert index.range((2, False)) == ["A"]
+    assert index.size_of_range(None, (2, True)) == 3
+
+    index.add("B", Item("B", 5))
+    index.remove("C")
+    assert index.range((2, True)) == ["E", "A", "B"]
+
+    index.add("X", Item("X", "text"))
+    assert "X" in index.range((1, True), (1, True))
+    with pytest.raises(TypeError):
+        index.range(("a", True))
+
+
+def test_sorted_index_add_many_matches_add():
+    items = [(f"K{i}", Item(f"K{i}", (i * 7) % 10)) for i in range(50)]
+    items.append(("N", Item("N", None)))
+    bulk = SortedIndex("category")
+    bulk.add_many(items)
+    single = SortedIndex("category")
+    for pk, obj in items:
+        single.add(pk, obj)
+    assert bulk.range() == single.range()
+    assert bulk.range((3, True), (5, False)) == single.range((3, True), (5, False))
+
+    bulk.add_many([
+        ("K1", Item("K1", 100)), ("K2", Item("K2", None)),
+        ("X", Item("X", "text")), ("Y", Item("Y", -1)),
+    ])
+    keys = bulk.range()
+    assert keys[0] == "Y" and keys[-2:] == ["K1", "X"]
+    assert "K2" not in keys and len(keys) == 51
+    bulk.remove("K1")
+    assert "K1" not in bulk.range()
+
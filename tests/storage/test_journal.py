@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+
+import pytest
+
+from biblioteka.storage.journal import Journal
+from biblioteka.storage.repository import Repository
+from biblioteka.utils.exceptions import DataImportError
+
+
+@dataclass
+class Dummy:
+    user_id: str
+    value: int
+
+
+def factory(rec: dict) -> Dummy:
+    return Dummy(user_id=rec["user_id"], value=rec["value"])
+
+
+def test_append_records_and_len(tmp_path):
+    journal = Journal(str(tmp_path / "j.journal"))
+    assert len(journal) == 0
+    journal.append("add", "U1", {"user_id": "U1", "value": 1})
+    journal.append("delete", "U1")
+    assert len(journal) == 2
+    assert [r["op"] for r in journal.records()] == ["add", "delete"]
+
+    with pytest.raises(ValueError):
+        journal.append("upsert", "U1")
+
+    journal.truncate()
+    assert len(journal) == 0
+    assert list(journal.records()) == []
+
+
+def test_partial_last_line_is_dropped(tmp_path):
+    path = tmp_path / "j.journal"
+    path.write_text('{"op":"delete","key":"A"}\n{"op":"del')
+    journal = Journal(str(path))
+    assert [r["key"] for r in journal.records()] == ["A"]
+    journal.append("delete", "B")
+    assert [r["key"] for r in Journal(str(path)).records()] == ["A", "B"]
+
+
+def test_repository_journal_replay_and_compaction(tmp_path):
+    snapshot = str(tmp_path / "dummy.json")
+    journal_path = str(tmp_path / "dummy.json.journal")
+
+    repo = Repository()
+    repo.load_journaled(Dummy, snapshot, Journal(journal_path), factory)
+    repo.add(Dummy("U1", 1))
+    repo.add(Dummy("U2", 2))
+    d1 = repo.get(Dummy, "U1")
+    d1.value = 10
+    repo.update(d1)
+    repo.delete(Dummy, "U2")
+    assert len(repo.journal_for(Dummy)) == 4
+
+    with pytest.raises(KeyError):
+        repo.add(Dummy("U1", 0))
+    assert len(repo.journal_for(Dummy)) == 4
+
+    other = Repository()
+    other.load_journaled(Dummy, snapshot, Journal(journal_path), factory)
+    assert other.count(Dummy) == 1
+    assert other.get(Dummy, "U1").value == 10
+
+    other.compact_journal(Dummy, snapshot)
+    assert len(other.journal_for(Dummy)) == 0
+
+    third = Repository()
+    third.load_journaled(Dummy, snapshot, Journal(journal_path), factory)
+    assert third.get(Dummy, "U1").value == 10
+
+    assert third.detach_journal(Dummy) is not None
+    with pytest.raises(KeyError):
+        third.compact_journal(Dummy, snapshot)
+
+
+def test_replay_bad_record_raises(tmp_path):
+    journal_path = tmp_path / "dummy.json.journal"
+    journal_path.write_text('{"op":"add","key":"U1","data":{}}\n')
+    repo = Repository()
+    with pytest.raises(DataImportError):
+        repo.load_journaled(
+            Dummy, str(tmp_path / "none.json"),
+            Journal(str(journal_path)), factory,
+        )
+
+
+def test_group_commit_coalesces_fsyncs(tmp_path, monkeypatch):
+    import os
+    import threading
+
+    from biblioteka.storage import journal as journal_module
+
+    syncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(
+        journal_module.os, "fsync",
+        lambda fd: (syncs.append(fd), real_fsync(fd))[1],
+    )
+    journal = Journal(
+        str(tmp_path / "j.journal"), fsync=True, group_commit=0.05,
+    )
+    barrier = threading.Barrier(8)
+
+    def writer(i):
+        barrier.wait()
+        journal.append("add", f"U{i}", {"user_id": f"U{i}", "value": i})
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(journal) == 8
+    assert 1 <= len(syncs) < 8
+
+
+def test_fsync_without_group_commit_syncs_every_write(tmp_path, monkeypatch):
+    from biblioteka.storage import journal as journal_module
+
+    syncs = []
+    monkeypatch.setattr(journal_module.os, "fsync", syncs.append)
+    journal = Journal(str(tmp_path / "j.journal"), fsync=True)
+    journal.append("add", "U1", {"user_id": "U1", "value": 1})
+    journal.append("delete", "U1")
+
+    assert len(syncs) == 2
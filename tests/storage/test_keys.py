@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+
+import pytest
+
+from biblioteka.models import Book, Loan
+from biblioteka.storage.keys import get_key, primary_key
+from biblioteka.storage.repository import Repository
+
+
+@dataclass
+class Card:
+    __primary_key__ = "code"
+
+    member_id: str
+    code: str
+
+
+@dataclass
+class Probed:
+    value: int
+    user_id: str
+
+
+class Plain:
+    def __init__(self, isbn):
+        self.isbn = isbn
+
+
+def test_models_declare_primary_key():
+    assert primary_key(Book) == "isbn"
+    assert primary_key(Loan) == "loan_id"
+
+
+def test_declared_key_wins_over_candidates():
+    card = Card(member_id="M1", code="C1")
+    assert primary_key(Card) == "code"
+    assert get_key(card) == "C1"
+
+    repo = Repository()
+    repo.add(card)
+    assert repo.get(Card, "C1") is card
+
+
+def test_key_is_probed_once_per_class():
+    assert primary_key(Probed) == "user_id"
+    assert get_key(Probed(1, "U1")) == "U1"
+    assert get_key(Plain("X")) == "X"
+    assert primary_key(Plain) == "isbn"
+
+
+def test_unsupported_object_raises():
+    class Nothing:
+        pass
+
+    with pytest.raises(ValueError):
+        get_key(Nothing())
+    with pytest.raises(ValueError):
+        primary_key(Nothing)
@@ -0,0 +1,132 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.models.member import Member
+from biblioteka.services.loan_service import LoanService
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.repository import Repository
+
+
+def make_repo(cls=Repository):
+    repo = cls(indexes={Book: ("status",)})
+    for i in range(3):
+        repo.add(Book(isbn=f"B{i}", title=f"T{i}", author="A"))
+    repo.add(Member(member_id="M1", name="X", registered_on=date.today()))
+    return repo
+
+
+def test_snapshot_does_not_see_later_commits():
+    repo = make_repo()
+    snap = repo.snapshot()
+    version = repo.version
+
+    loan = LoanService(repo).loan_book("M1", "B0")
+    repo.add(Book(isbn="B9", title="New", author="A"))
+    repo.delete(Book, "B2")
+
+    assert repo.version == version + 3
+    assert snap.version == version
+    assert snap.get(Book, "B0").status is BookStatus.AVAILABLE
+    assert snap.get(Member, "M1").current_loans == []
+    assert snap.get(Loan, loan.loan_id) is None
+    assert snap.get(Book, "B9") is None
+    assert sorted(b.isbn for b in snap.list(Book)) == ["B0", "B1", "B2"]
+    assert snap.count(Book) == 3
+    assert snap.count() == 4
+    assert snap.list(Book, status=BookStatus.LOANED) == []
+    assert repo.get(Book, "B0").status is BookStatus.LOANED
+
+
+def test_snapshot_returns_copies():
+    repo = make_repo()
+    with repo.snapshot() as snap:
+        book = snap.get(Book, "B0")
+        assert book == repo.get(Book, "B0")
+        assert book is not repo.get(Book, "B0")
+        book.title = "Changed"
+        assert repo.get(Book, "B0").title == "T0"
+        assert snap.get(Book, "B0").title == "T0"
+    assert snap.closed
+    with pytest.raises(ValueError):
+        snap.list(Book)
+    assert repo._snapshots == ()
+
+
+def test_snapshot_survives_clear_and_rollback():
+    repo = make_repo()
+    snap = repo.snapshot()
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            book = repo.get(Book, "B1")
+            book.mark_loaned()
+            repo.update(book)
+            raise RuntimeError("boom")
+    repo.clear()
+
+    assert repo.count() == 0
+    assert snap.count(Book) == 3
+    assert snap.get(Book, "B1").status is BookStatus.AVAILABLE
+    assert snap.find_by_pattern(Book, "title", "t1")[0].isbn == "B1"
+
+
+def test_snapshot_in_transaction_sees_committed_state():
+    repo = make_repo()
+    with repo.transaction():
+        book = repo.get(Book, "B0")
+        book.mark_loaned()
+        repo.update(book)
+        repo.add(Book(isbn="B9", title="New", author="A"))
+        snap = repo.snapshot()
+    assert snap.get(Book, "B0").status is BookStatus.AVAILABLE
+    assert snap.get(Book, "B9") is None
+
+
+def test_service_reads_from_snapshot():
+    repo = make_repo()
+    service = LoanService(repo)
+    loan = service.loan_book("M1", "B0")
+    loan.due_date = date.today() - timedelta(days=1)
+    repo.update(loan)
+
+    with repo.snapshot() as snap:
+        service.return_book(loan.loan_id)
+        overdue = LoanService(snap).list_overdue_loans()
+
+    assert [l.loan_id for l in overdue] == [loan.loan_id]
+    assert service.list_overdue_loans() == []
+
+
+def test_concurrent_snapshot_is_consistent_during_checkouts():
+    repo = make_repo(ConcurrentRepository)
+    for i in range(3, 40):
+        repo.add(Book(isbn=f"B{i}", title=f"T{i}", author="A"))
+    members = [f"N{i}" for i in range(40)]
+    for member_id in members:
+        repo.add(
+            Member(member_id=member_id, name="N", registered_on=date.today())
+        )
+    service = LoanService(repo)
+    snap = repo.snapshot()
+
+    def checkout(i):
+        service.loan_book(members[i], f"B{i}")
+
+    threads = [
+        threading.Thread(target=checkout, args=(i,)) for i in range(40)
+    ]
+    for t in threads:
+        t.start()
+    counts = [snap.count(Loan) for _ in range(20)]
+    available = len(snap.list(Book, status=BookStatus.AVAILABLE))
+    for t in threads:
+        t.join(timeout=10)
+
+    assert counts == [0] * 20
+    assert available == 40
+    assert repo.count(Loan) == 40
+    assert snap.list(Book, status=BookStatus.LOANED) == []
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 
 from biblioteka.storage.repository import Repository
 from biblioteka.utils.exceptions import DataExportError, DataImportError
-from biblioteka.models.book import Book
+from biblioteka.models.book import Book, BookStatus
 
 
 @dataclass
@@ -148,3 +148,342 @@ def test_find_by_pattern_non_string(repo):
     i = Item("X", 123)
     repo.add(i)
     assert repo.find_by_pattern(Item, "number", "123") == []
+
+
+def test_find_by_pattern_uses_text_index():
+    repo = Repository(text_indexes={Book: ("title",)})
+    b1 = Book(isbn="1", title="Alpha One", author="A")
+    b2 = Book(isbn="2", title="Beta Two", author="B")
+    repo.add(b1)
+    repo.add(b2)
+
+    assert repo.find_by_pattern(Book, "title", "ALPHA") == [b1]
+    assert repo.find_by_pattern(Book, "title", "o") == [b1, b2]
+
+    b1.title = "Gamma"
+    repo.update(b1)
+    assert repo.find_by_pattern(Book, "title", "alpha") == []
+    assert repo.find_by_pattern(Book, "title", "gamm") == [b1]
+
+    repo.delete(Book, "2")
+    assert repo.find_by_pattern(Book, "title", "beta") == []
+
+
+def test_create_text_index_on_existing_data(repo):
+    b1 = Book(isbn="1", title="Alpha One", author="A")
+    repo.add(b1)
+    repo.create_text_index(Book, "title")
+    assert repo.find_by_pattern(Book, "title", "pha o") == [b1]
+
+
+def test_list_uses_secondary_index():
+    repo = Repository(indexes={Book: ("author", "genre")})
+    b1 = Book(isbn="1", title="T1", author="A", genre="g1")
+    b2 = Book(isbn="2", title="T2", author="B", genre="g1")
+    b3 = Book(isbn="3", title="T3", author="A", genre="g2")
+    for b in (b1, b2, b3):
+        repo.add(b)
+
+    assert repo.indexed_attrs(Book) == ["author", "genre"]
+    assert repo.list(Book, author="A") == [b1, b3]
+    assert repo.list(Book, author="A", genre="g2") == [b3]
+
+    b1.author = "C"
+    repo.update(b1)
+    assert repo.list(Book, author="A") == [b3]
+    assert repo.list(Book, author="C") == [b1]
+
+    repo.delete(Book, "3")
+    assert repo.list(Book, author="A") == []
+
+    repo.clear(Book)
+    assert repo.list(Book, author="C") == []
+
+
+def test_create_index_on_existing_data(repo):
+    b1 = Book(isbn="1", title="T1", author="A")
+    repo.add(b1)
+    repo.create_index(Book, "author")
+    assert repo.list(Book, author="A") == [b1]
+
+
+def test_import_from_json_reports_progress(tmp_path, repo):
+    filepath = tmp_path / "dummy.json"
+    filepath.write_text(json.dumps(
+        [{"user_id": f"U{i}", "value": i} for i in range(1000)]
+    ))
+    calls = []
+    repo.import_from_json(
+        Dummy, str(filepath), lambda rec: Dummy(**rec),
+        progress=lambda n, done, total: calls.append((n, done, total)),
+    )
+    assert repo.count(Dummy) == 1000
+    size = filepath.stat().st_size
+    assert calls[-1] == (1000, size, size)
+    assert all(done <= total for _, done, total in calls)
+
+
+def test_register_loader_runs_once_on_first_access(repo):
+    calls = []
+
+    def loader():
+        calls.append("books")
+        repo.add(Book(isbn="1", title="T", author="A"))
+
+    repo.register_loader(Book, loader)
+    repo.register_loader(Dummy, lambda: calls.append("dummy"))
+    assert not repo.is_loaded(Book)
+    assert calls == []
+
+    assert repo.get(Book, "1").title == "T"
+    assert repo.is_loaded(Book)
+    assert repo.count(Book) == 1
+    assert calls == ["books"]
+
+    repo.clear(Dummy)
+    assert repo.is_loaded(Dummy)
+    assert repo.count() == 1
+    assert calls == ["books"]
+
+
+def test_transaction_rolls_back_in_memory_state():
+    repo = Repository(indexes={Book: ("status",)})
+    book = Book(isbn="1", title="T", author="A")
+    repo.add(book)
+    repo.add(Dummy(user_id="U1", value=1))
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            b = repo.get(Book, "1")
+            b.mark_loaned()
+            repo.update(b)
+            repo.add(Dummy(user_id="U2", value=2))
+            repo.delete(Dummy, "U1")
+            raise RuntimeError("boom")
+
+    assert book.is_available()
+    assert repo.get(Book, "1") is book
+    assert repo.list(Book, status=BookStatus.AVAILABLE) == [book]
+    assert repo.list(Book, status=BookStatus.LOANED) == []
+    assert [d.user_id for d in repo.list(Dummy)] == ["U1"]
+
+
+def test_transaction_commits_one_batch_per_journal(tmp_path):
+    from biblioteka.storage.journal import Journal
+
+    repo = Repository()
+    journal = Journal(str(tmp_path / "dummy.journal"))
+    repo.attach_journal(Dummy, journal)
+    writes = []
+    original = journal.write
+    journal.write = lambda entries: (
+        writes.append(list(entries)) or original(writes[-1])
+    )
+
+    with repo.transaction():
+        d = Dummy(user_id="U1", value=1)
+        repo.add(d)
+        d.value = 2
+        repo.update(d)
+        repo.add(Dummy(user_id="U2", value=3))
+        repo.delete(Dummy, "U2")
+        with repo.transaction():
+            repo.add(Dummy(user_id="U3", value=4))
+        assert writes == []
+
+    assert len(writes) == 1
+    assert [(op, key) for op, key, _ in writes[0]] == [
+        ("add", "U1"), ("add", "U3"),
+    ]
+    assert writes[0][0][2]["value"] == 2
+
+
+def test_iterate_pages_with_offset_and_cursor():
+    repo = Repository(indexes={Book: ("author",)})
+    years = [2001, None, 1999, 2001, 1850]
+    for i, year in enumerate(years):
+        repo.add(Book(
+            isbn=f"B{i}", title=f"T{i}", author="A" if i % 2 else "B",
+            publication_year=year,
+        ))
+
+    it = repo.iterate(Book, offset=1, limit=2)
+    assert not isinstance(it, list)
+    assert [b.isbn for b in it] == ["B1", "B2"]
+    assert [b.isbn for b in repo.iterate(Book, author="B", offset=1)] == [
+        "B2", "B4",
+    ]
+
+    ordered = repo.iterate(Book, order_by="publication_year")
+    assert [b.isbn for b in ordered] == ["B4", "B2", "B0", "B3", "B1"]
+    page = list(repo.iterate(Book, order_by="-publication_year", limit=2))
+    assert [b.isbn for b in page] == ["B1", "B3"]
+    page = repo.iterate(
+        Book, order_by="-publication_year", after_key=page[-1].isbn,
+    )
+    assert [b.isbn for b in page] == ["B0", "B2", "B4"]
+    after = repo.iterate(Book, after_key="B2", limit=5)
+    assert [b.isbn for b in after] == ["B3", "B4"]
+
+    with pytest.raises(KeyError):
+        repo.iterate(Book, after_key="NOPE")
+    with pytest.raises(ValueError):
+        repo.iterate(Book, limit=-1)
+
+
+def test_range_queries_use_most_selective_index():
+    from datetime import date
+    from biblioteka.models.loan import Loan
+    from biblioteka.storage.query import between, ge, in_, lt
+
+    repo = Repository(
+        indexes={Book: ("author",)},
+        sorted_indexes={Book: ("publication_year",)},
+    )
+    for i in range(20):
+        repo.add(Book(
+            isbn=f"B{i}", title=f"T{i}", author="A" if i < 18 else "B",
+            publication_year=1980 + i,
+        ))
+
+    assert repo.explain(Book, publication_year=between(1990, 1992)) == {
+        "index": "publication_year", "kind": "sorted", "candidates": 3,
+    }
+    assert [b.isbn for b in repo.list(
+        Book, author="A", publication_year=between(1990, 1992),
+    )] == ["B10", "B11", "B12"]
+    assert repo.explain(Book, author="B", publication_year=ge(1981)) == {
+        "index": "author", "kind": "hash", "candidates": 2,
+    }
+    assert [b.isbn for b in repo.list(
+        Book, author="B", publication_year=ge(1981),
+    )] == ["B18", "B19"]
+    found = repo.list(Book, author=in_(["B", "C"]), publication_year=lt(1999))
+    assert found == [repo.get(Book, "B18")]
+    assert repo.explain(Book, title="T1")["kind"] == "scan"
+
+    book = repo.get(Book, "B0")
+    book.publication_year = 2050
+    repo.update(book)
+    assert repo.list(Book, publication_year=lt(1981)) == []
+    page = repo.iterate(
+        Book, order_by="-publication_year", limit=1,
+        publication_year=ge(2000),
+    )
+    assert [b.isbn for b in page] == ["B0"]
+
+    repo.add(Loan(
+        loan_id="L1", member_id="M", isbn="B1",
+        loan_date=date(2024, 1, 1), due_date=date(2024, 1, 15),
+    ))
+    assert len(repo.list(Loan, due_date=lt(date(2024, 2, 1)))) == 1
+
+
+@pytest.mark.parametrize("sorted_indexes", [None, {Book: ("status",)}])
+def test_enum_ranges_do_not_depend_on_plan(sorted_indexes):
+    from biblioteka.storage.query import Predicate, ge, lt
+
+    repo = Repository(sorted_indexes=sorted_indexes)
+    for i, status in enumerate(BookStatus):
+        book = Book(isbn=str(i), title="T", author="A")
+        book.status = status
+        repo.add(book)
+
+    # Enumy porównywane są wg nazwy, jak w SortedIndex.
+    assert {b.status for b in repo.list(
+        Book, status=lt(BookStatus.RESERVED),
+    )} == {BookStatus.AVAILABLE, BookStatus.LOANED}
+    assert [b.status for b in repo.list(
+        Book, status=ge(BookStatus.RESERVED),
+    )] == [BookStatus.RESERVED]
+    with pytest.raises(TypeError):
+        Predicate()
+
+
+def test_sorted_index_redeclared_with_other_where(repo):
+    repo.create_sorted_index(Book, "publication_year")
+    repo.create_sorted_index(Book, "publication_year")
+    with pytest.raises(ValueError, match="already exists"):
+        repo.create_sorted_index(
+            Book, "publication_year", where={"status": BookStatus.AVAILABLE},
+        )
+
+
+def test_flush_writes_only_changed_tables_and_records(repo):
+    full, delta = [], []
+    repo.register_writer(Dummy, lambda changes: full.append(changes))
+    repo.register_writer(
+        Book, lambda changes: delta.append(changes), delta=True,
+    )
+    repo.add(Dummy("U1", 1))
+    repo.add(Book(isbn="1", title="T", author="A"))
+    repo.add(Book(isbn="2", title="U", author="B"))
+    assert repo.flush() == [Dummy, Book]
+    assert full == [None]
+    assert sorted(delta[0]) == ["1", "2"]
+    assert not repo.is_dirty()
+    assert repo.flush() == []
+
+    with repo.transaction():
+        book = repo.get(Book, "1")
+        book.mark_loaned()
+        repo.update(book)
+        repo.delete(Book, "2")
+        assert not repo.is_dirty()
+        with pytest.raises(RuntimeError):
+            repo.flush()
+    assert repo.is_dirty(Book) and not repo.is_dirty(Dummy)
+    assert repo.dirty_keys(Book) == ["1", "2"]
+    assert repo.flush() == [Book]
+    assert delta[1] == {"1": book, "2": None}
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add(Book(isbn="3", title="V", author="C"))
+            raise RuntimeError("boom")
+    assert not repo.is_dirty()
+
+
+def test_flush_after_clear_rewrites_whole_table(repo):
+    changes = []
+    repo.register_writer(
+        Book, lambda c: changes.append(c), delta=True,
+    )
+    repo.register_loader(
+        Book, lambda: repo.add(Book(isbn="1", title="T", author="A")),
+    )
+    assert repo.count(Book) == 1
+    assert not repo.is_dirty()
+
+    repo.clear(Book)
+    repo.add(Book(isbn="2", title="U", author="B"))
+    assert repo.dirty_keys(Book) == []
+    repo.add(Dummy("U1", 1))
+    assert repo.flush() == [Book]
+    assert changes == [None]
+    assert repo.is_dirty(Dummy)
+    repo.mark_clean()
+    assert not repo.is_dirty()
+
+
+def test_import_builds_indexes_once_after_loading(tmp_path, monkeypatch):
+    from biblioteka.storage.indexes import SortedIndex
+    from biblioteka.storage.query import between
+
+    source = Repository()
+    for i in range(200):
+        source.add(Book(
+            isbn=f"B{i:03d}", title="T", author="A",
+            publication_year=2000 - i,
+        ))
+    path = str(tmp_path / "books.json")
+    source.export_to_json(Book, path)
+
+    def no_insort(self, pk, obj):
+        raise AssertionError("import must not insert one by one")
+
+    monkeypatch.setattr(SortedIndex, "add", no_insort)
+    repo = Repository(sorted_indexes={Book: ("publication_year",)})
+    repo.import_from_json(Book, path)
+    found = repo.list(Book, publication_year=between(1801, 1803))
+    assert [b.isbn for b in found] == ["B199", "B198", "B197"]
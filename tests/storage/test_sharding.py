@@ -0,0 +1,141 @@
+import json
+import os
+
+import pytest
+
+from biblioteka.models.book import Book
+from biblioteka.storage import sharding
+from biblioteka.storage.concurrent_repository import ConcurrentRepository
+from biblioteka.storage.repository import Repository
+from biblioteka.storage.sharding import (
+    MANIFEST,
+    ShardedTable,
+    shard_of,
+    shard_path,
+)
+from biblioteka.utils.exceptions import DataExportError, DataImportError
+
+
+def book_factory(rec):
+    rec = dict(rec)
+    rec.pop("status", None)
+    return Book(**rec)
+
+
+def make_repo(n=100, cls=Repository):
+    repo = cls(indexes={Book: ("author",)})
+    for i in range(n):
+        repo.add(Book(isbn=f"{i:04d}", title=f"T{i}", author=f"A{i % 5}"))
+    return repo
+
+
+def test_round_trip_and_manifest(tmp_path):
+    directory = str(tmp_path / "books.shards")
+    repo = make_repo()
+    repo.export_sharded(Book, directory, shards=8)
+
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    assert manifest["shards"] == 8 and sum(manifest["counts"]) == 100
+    for i in range(8):
+        with open(shard_path(directory, i)) as f:
+            keys = [rec["isbn"] for rec in json.load(f)]
+        assert all(shard_of(key, 8) == i for key in keys)
+
+    other = Repository(indexes={Book: ("author",)})
+    other.load_sharded(Book, directory, book_factory)
+    assert other.count(Book) == 100
+    assert sorted(b.isbn for b in other.list(Book)) == [
+        f"{i:04d}" for i in range(100)
+    ]
+    assert len(other.list(Book, author="A3")) == 20
+
+
+def test_point_lookup_loads_one_shard(tmp_path):
+    directory = str(tmp_path / "books.shards")
+    make_repo().export_sharded(Book, directory, shards=8)
+    repo = Repository()
+    repo.load_sharded(Book, directory, book_factory)
+    table = repo._data[Book]
+
+    assert repo.count(Book) == 100
+    assert table.loaded_shards() == []
+    assert repo.get(Book, "0042").title == "T42"
+    assert repo.get(Book, "nope") is None
+    assert table.loaded_shards() == sorted(
+        {shard_of("0042", 8), shard_of("nope", 8)}
+    )
+
+
+def test_changed_keys_rewrite_only_their_shards(tmp_path, monkeypatch):
+    directory = str(tmp_path / "books.shards")
+    make_repo().export_sharded(Book, directory, shards=8)
+    repo = Repository()
+    repo.load_sharded(Book, directory, book_factory)
+    book = repo.get(Book, "0007")
+    book.title = "Nowy"
+    repo.update(book)
+    repo.delete(Book, "0008")
+
+    written = []
+    original = sharding.atomic_write
+
+    def recording_atomic_write(path, *args, **kwargs):
+        written.append(os.path.basename(path))
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(sharding, "atomic_write", recording_atomic_write)
+    repo.export_sharded(Book, directory, keys=["0007", "0008"])
+    monkeypatch.undo()
+
+    changed = sorted({shard_of("0007", 8), shard_of("0008", 8)})
+    assert written == [
+        os.path.basename(shard_path(directory, i)) for i in changed
+    ] + [MANIFEST]
+    assert repo._data[Book].loaded_shards() == changed
+
+    other = Repository()
+    other.load_sharded(Book, directory, book_factory)
+    assert other.count(Book) == 99
+    assert other.get(Book, "0007").title == "Nowy"
+    assert other.get(Book, "0008") is None
+
+
+def test_resharding_removes_old_files(tmp_path):
+    directory = str(tmp_path / "books.shards")
+    repo = make_repo(20)
+    repo.export_sharded(Book, directory, shards=8)
+    repo.export_sharded(Book, directory, shards=2, keys=["0001"])
+
+    assert sorted(os.listdir(directory)) == ["0000.json", "0001.json", MANIFEST]
+    other = Repository()
+    other.load_sharded(Book, directory, book_factory)
+    assert other.count(Book) == 20
+
+
+def test_parallel_load(tmp_path):
+    directory = str(tmp_path / "books.shards")
+    make_repo(200).export_sharded(Book, directory, shards=4)
+    repo = ConcurrentRepository()
+    repo.load_sharded(Book, directory, book_factory, workers=2)
+
+    assert repo._data[Book].loaded_shards() == [0, 1, 2, 3]
+    assert repo.count(Book) == 200
+
+
+def test_invalid_directories_raise(tmp_path):
+    directory = tmp_path / "books.shards"
+    repo = Repository()
+    with pytest.raises(DataImportError):
+        repo.load_sharded(Book, str(directory), book_factory)
+
+    make_repo(5).export_sharded(Book, str(directory), shards=2)
+    with pytest.raises(ValueError):
+        ShardedTable(str(directory), Repository, book_factory)
+    (directory / "0000.json").write_text("{}")
+    (directory / "0001.json").write_text("{}")
+    with pytest.raises(DataImportError):
+        repo.load_sharded(Book, str(directory), book_factory, workers=2)
+
+    with pytest.raises(DataExportError):
+        make_repo(5).export_sharded(Book, str(directory), shards=0)
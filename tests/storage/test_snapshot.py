@@ -0,0 +1,169 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.loan import Loan
+from biblioteka.models.member import Member
+from biblioteka.models.user import User, Role
+from biblioteka.storage.repository import Repository
+from biblioteka.storage.snapshot import (
+    SnapshotTable,
+    encode_record,
+    write_snapshot,
+)
+from biblioteka.utils.exceptions import DataImportError
+
+
+def _books(n):
+    return [
+        Book(isbn=f"{i:05d}", title=f"Tytuł {i}", author=f"A{i % 3}")
+        for i in range(n)
+    ]
+
+
+def _write(path, cls, objs, key):
+    write_snapshot(
+        str(path), cls,
+        ((key(o), encode_record(cls, key(o), o)) for o in objs),
+    )
+
+
+def test_round_trip_all_field_kinds(tmp_path):
+    joined = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    user = User("U1", "Zażółć", Role.LIBRARIAN, joined)
+    naive = User("U2", "Bob", Role.GUEST, datetime(2020, 1, 1, 8, 0))
+    path = tmp_path / "users.bin"
+    _write(path, User, [user, naive], lambda u: u.user_id)
+
+    table = SnapshotTable(str(path), User)
+    assert table["U1"] == user
+    assert table["U2"] == naive
+    assert table["U1"] is table["U1"]
+    table.close()
+
+    member = Member("M1", "Jan", date(2024, 1, 2), email="jan@ex.pl")
+    member.current_loans = ["L1"]
+    loan = Loan("L1", "M1", "B1", date(2024, 1, 2), date(2024, 1, 16))
+    _write(tmp_path / "m.bin", Member, [member], lambda m: m.member_id)
+    _write(tmp_path / "l.bin", Loan, [loan], lambda x: x.loan_id)
+    assert SnapshotTable(str(tmp_path / "m.bin"), Member)["M1"] == member
+    assert SnapshotTable(str(tmp_path / "l.bin"), Loan)["L1"] == loan
+
+
+def test_lazy_table_mapping_semantics(tmp_path):
+    path = tmp_path / "books.bin"
+    books = _books(50)
+    _write(path, Book, reversed(books), lambda b: b.isbn)
+    table = SnapshotTable(str(path), Book)
+
+    assert len(table) == 50
+    assert table._cache == {}
+    assert "00007" in table and "99999" not in table
+    assert table._cache == {}
+    assert table["00007"] == books[7]
+    assert list(table._cache) == ["00007"]
+
+    del table["00003"]
+    assert "00003" not in table
+    with pytest.raises(KeyError):
+        del table["00003"]
+    table["00003"] = books[3]
+    table["NEW"] = Book(isbn="NEW", title="N", author="X")
+    assert len(table) == 51
+    keys = list(table)
+    assert keys[0] == "00049" and keys[-1] == "NEW"
+    assert len(keys) == len(set(keys))
+
+
+def test_invalid_files_raise(tmp_path):
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"not a snapshot file at all, sorry........")
+    with pytest.raises(ValueError):
+        SnapshotTable(str(bad), Book)
+
+    path = tmp_path / "books.bin"
+    _write(path, Book, _books(1), lambda b: b.isbn)
+    with pytest.raises(ValueError):
+        SnapshotTable(str(path), User)
+
+
+def test_repository_export_and_lazy_load(tmp_path):
+    path = str(tmp_path / "books.bin")
+    repo = Repository()
+    for b in _books(10):
+        repo.add(b)
+    repo.export_snapshot(Book, path)
+
+    lazy = Repository(indexes={Book: ("author",)})
+    lazy.load_snapshot(Book, path)
+    assert lazy.count(Book) == 10
+    book = lazy.get(Book, "00004")
+    assert book.title == "Tytuł 4"
+    assert [b.isbn for b in lazy.list(Book, author="A1")] == [
+        "00001", "00004", "00007",
+    ]
+
+    book.mark_loaned()
+    lazy.update(book)
+    lazy.delete(Book, "00000")
+    lazy.add(Book(isbn="X", title="X", author="A1"))
+    assert [b.isbn for b in lazy.list(Book, author="A1")] == [
+        "00001", "00004", "00007", "X",
+    ]
+    lazy.export_snapshot(Book, path)
+    assert lazy.get(Book, "00004") is book
+
+    fresh = Repository()
+    fresh.load_snapshot(Book, path)
+    assert fresh.count(Book) == 10
+    assert fresh.get(Book, "00000") is None
+    assert fresh.get(Book, "00004").status is BookStatus.LOANED
+    assert fresh.get(Book, "X").author == "A1"
+
+
+@pytest.mark.parametrize("os_name", ["posix", "nt"])
+def test_failed_export_keeps_snapshot_table_readable(
+        tmp_path, monkeypatch, os_name,
+):
+    import os
+
+    from biblioteka.storage import atomic
+    from biblioteka.utils.exceptions import DataExportError
+
+    path = str(tmp_path / "books.bin")
+    source = Repository()
+    for b in _books(5):
+        source.add(b)
+    source.export_snapshot(Book, path)
+    repo = Repository()
+    repo.load_snapshot(Book, path)
+    repo.delete(Book, "00000")
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "name", os_name)
+    monkeypatch.setattr(atomic.os, "replace", failing_replace)
+    with pytest.raises(DataExportError, match="disk full"):
+        repo.export_snapshot(Book, path)
+    monkeypatch.undo()
+
+    assert [b.isbn for b in repo.list(Book)] == [
+        "00001", "00002", "00003", "00004",
+    ]
+    assert repo.get(Book, "00003").title == "Tytuł 3"
+    repo.export_snapshot(Book, path)
+    fresh = Repository()
+    fresh.load_snapshot(Book, path)
+    assert fresh.count(Book) == 4
+
+
+def test_repository_load_snapshot_errors(tmp_path):
+    repo = Repository()
+    with pytest.raises(DataImportError):
+        repo.load_snapshot(Book, str(tmp_path / "missing.bin"))
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"x")
+    with pytest.raises(DataImportError):
+        repo.load_snapshot(Book, str(bad))
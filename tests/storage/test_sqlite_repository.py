@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+import pytest
+
+from biblioteka.models.book import Book, BookStatus
+from biblioteka.models.member import Member
+from biblioteka.models.user import User, Role
+from biblioteka.services.loan_service import LoanService
+from biblioteka.storage.sqlite_repository import SQLiteRepository
+
+
+@dataclass
+class Dummy:
+    user_id: str
+    value: int
+
+
+@pytest.fixture
+def repo():
+    with SQLiteRepository() as r:
+        yield r
+
+
+def test_add_get_list_update_delete_count_clear(repo):
+    repo.add(Dummy(user_id="U1", value=10))
+    assert repo.get(Dummy, "U1") == Dummy("U1", 10)
+    assert repo.get(Dummy, "NOPE") is None
+
+    with pytest.raises(KeyError):
+        repo.add(Dummy(user_id="U1", value=0))
+
+    repo.add(Dummy(user_id="U2", value=20))
+    assert [d.user_id for d in repo.list(Dummy)] == ["U1", "U2"]
+    assert repo.count(Dummy) == 2
+
+    d1 = repo.get(Dummy, "U1")
+    d1.value = 99
+    repo.update(d1)
+    assert repo.get(Dummy, "U1").value == 99
+
+    with pytest.raises(KeyError):
+        repo.update(Dummy(user_id="U3", value=0))
+
+    repo.delete(Dummy, "U2")
+    assert repo.get(Dummy, "U2") is None
+    with pytest.raises(KeyError):
+        repo.delete(Dummy, "NOPE")
+
+    repo.add(Book(isbn="B1", title="T", author="A"))
+    assert repo.count() == 2
+    repo.clear(Dummy)
+    assert repo.count(Dummy) == 0
+    repo.clear()
+    assert repo.count() == 0
+
+
+def test_round_trip_of_typed_fields(repo):
+    joined = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    repo.add(User("U1", "Ala", Role.ADMIN, joined))
+    member = Member("M1", "Jan", date(2024, 1, 2))
+    member.current_loans = ["L1", "L2"]
+    repo.add(member)
+
+    user = repo.get(User, "U1")
+    assert user.role is Role.ADMIN
+    assert user.joined_on == joined
+    assert user.last_login is None
+    assert user.is_active is True
+
+    stored = repo.get(Member, "M1")
+    assert stored.registered_on == date(2024, 1, 2)
+    assert stored.current_loans == ["L1", "L2"]
+
+
+def test_filters_and_indexes(tmp_path):
+    path = str(tmp_path / "lib.db")
+    with SQLiteRepository(path, indexes={Book: ("author",)}) as repo:
+        repo.add(Book(isbn="1", title="Alpha", author="A", genre="g"))
+        repo.add(Book(isbn="2", title="Beta", author="B", genre="g"))
+        repo.add(Book(isbn="3", title="Żółw", author="A"))
+        assert repo.indexed_attrs(Book) == ["author"]
+        assert [b.isbn for b in repo.list(Book, author="A")] == ["1", "3"]
+        assert [b.isbn for b in repo.list(Book, genre=None)] == ["3"]
+        assert [
+            b.isbn for b in repo.list(Book, status=BookStatus.AVAILABLE)
+        ] == ["1", "2", "3"]
+        with pytest.raises(AttributeError):
+            repo.list(Book, nonexistent=1)
+        names = [
+            row[0] for row in repo._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        ]
+        assert "ix_book_author" in names
+
+    with SQLiteRepository(path) as reopened:
+        assert reopened.count(Book) == 3
+
+
+def test_find_by_pattern(repo):
+    b1 = Book(isbn="1", title="Alpha One", author="A")
+    repo.add(b1)
+    repo.add(Book(isbn="2", title="ŻÓŁTY Dom", author="B"))
+
+    assert repo.find_by_pattern(Book, "title", "alpha") == [b1]
+    assert [
+        b.isbn for b in repo.find_by_pattern(Book, "title", "żółty")
+    ] == ["2"]
+    assert repo.find_by_pattern(Book, "title", "gamma") == []
+    assert repo.find_by_pattern(Book, "nonexistent", "x") == []
+    assert repo.find_by_pattern(Book, "publication_year", "1") == []
+
+
+def test_services_work_on_sqlite(repo):
+    repo.add(Member("M1", "Jan", date.today()))
+    repo.add(Book(isbn="B1", title="T", author="A"))
+    loans = LoanService(repo)
+
+    loan = loans.loan_book("M1", "B1")
+    assert repo.get(Book, "B1").status is BookStatus.LOANED
+    assert repo.get(Member, "M1").current_loans == [loan.loan_id]
+
+    loans.return_book(loan.loan_id)
+    assert repo.get(Book, "B1").status is BookStatus.AVAILABLE
+    assert loans.list_active_loans() == []
+
+
+def test_transaction_commit_and_rollback(repo):
+    repo.add(Dummy(user_id="U1", value=1))
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add(Dummy(user_id="U2", value=2))
+            repo.add(Book(isbn="B1", title="T", author="A"))
+            repo.delete(Dummy, "U1")
+            raise RuntimeError("boom")
+    assert [d.user_id for d in repo.list(Dummy)] == ["U1"]
+    assert repo.count(Book) == 0
+
+    with repo.transaction():
+        repo.add(Dummy(user_id="U2", value=2))
+        with repo.transaction():
+            repo.delete(Dummy, "U1")
+    assert [d.user_id for d in repo.list(Dummy)] == ["U2"]
+
+
+def test_search_index(repo):
+    repo.add(Book(isbn="1", title="Pan Tadeusz", author="Mickiewicz"))
+    repo.create_search_index(Book, ("title", "author"))
+    repo.add(Book(isbn="2", title="Lalka", author="Prus"))
+
+    assert [b.isbn for b in repo.search(Book, "tadeusz")] == ["1"]
+    assert [b.isbn for b in repo.search(Book, "prus")] == ["2"]
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.delete(Book, "2")
+            raise RuntimeError("boom")
+    assert [b.isbn for b in repo.search(Book, "lalka")] == ["2"]
+
+
+def test_iterate_matches_repository_order(repo):
+    years = [2001, None, 1999, 2001, 1850]
+    for i, year in enumerate(years):
+        repo.add(Book(
+            isbn=f"B{i}", title=f"T{i}", author="A", publication_year=year,
+        ))
+
+    assert [b.isbn for b in repo.iterate(Book, offset=1, limit=2)] == [
+        "B1", "B2",
+    ]
+    ordered = repo.iterate(Book, order_by="publication_year")
+    assert [b.isbn for b in ordered] == ["B4", "B2", "B0", "B3", "B1"]
+    for order_by in ("publication_year", "-publication_year", None):
+        for cursor in ("B0", "B1", "B4"):
+            expected = [b.isbn for b in repo.iterate(Book, order_by=order_by)]
+            if order_by is None:
+                expected = sorted(expected)
+            rest = expected[expected.index(cursor) + 1:]
+            page = repo.iterate(Book, order_by=order_by, after_key=cursor)
+            assert [b.isbn for b in page] == rest
+    with pytest.raises(KeyError):
+        repo.iterate(Book, after_key="NOPE")
+
+
+def test_range_predicates_run_in_sql(repo):
+    from biblioteka.storage.query import between, gt, in_, lt
+
+    repo.create_sorted_index(Book, "publication_year")
+    for i, year in enumerate([1990, 1995, None, 2000]):
+        repo.add(Book(
+            isbn=f"B{i}", title=f"T{i}", author="A", publication_year=year,
+        ))
+
+    def isbns(**filters):
+        return [b.isbn for b in repo.list(Book, **filters)]
+
+    assert isbns(publication_year=between(1990, 1995)) == ["B0", "B1"]
+    assert isbns(publication_year=gt(1990)) == ["B1", "B3"]
+    assert isbns(publication_year=lt(1990)) == []
+    assert isbns(publication_year=in_([2000, None])) == ["B2", "B3"]
+    assert isbns(publication_year=in_([])) == []
+    assert [b.isbn for b in repo.iterate(
+        Book, order_by="-publication_year", publication_year=gt(1900),
+    )] == ["B3", "B1", "B0"]
@@ -0,0 +1,58 @@
+import io
+import json
+
+import pytest
+
+from biblioteka.storage.streaming import JsonArrayReader, iter_json_array
+
+
+def _reader(text: str, chunk_size: int = 4) -> JsonArrayReader:
+    return JsonArrayReader(io.BytesIO(text.encode("utf-8")), chunk_size)
+
+
+def test_parses_records_across_small_chunks():
+    records = [
+        {"isbn": str(i), "title": "Zażółć gęślą jaźń", "year": 1000 + i}
+        for i in range(20)
+    ]
+    text = json.dumps(records, indent=2)
+    reader = _reader(text, chunk_size=3)
+    assert list(reader) == records
+    assert reader.bytes_read == len(text.encode("utf-8"))
+
+
+def test_numbers_split_on_chunk_boundary():
+    assert list(_reader("[12345, 678]", chunk_size=3)) == [12345, 678]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 12))
+def test_tokens_split_on_chunk_boundary(chunk_size):
+    text = '[{"a": -Infinity, "b": "\\u0105x", "c": false, "d": 1.5e3}]'
+    assert list(_reader(text, chunk_size)) == json.loads(text)
+
+
+def test_syntax_error_mid_file_does_not_read_rest():
+    text = '[{"a": 1}, {"a": ]' + ', {"a": 2}' * 10_000 + "]"
+    reader = _reader(text, chunk_size=1024)
+    with pytest.raises(ValueError):
+        list(reader)
+    assert reader.bytes_read <= 1024
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]  ", "\ufeff[]"])
+def test_empty_arrays(text):
+    assert list(_reader(text)) == []
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "not a valid json",
+    "{\"a\": 1}",
+    "[1, 2",
+    "[1 2]",
+    "[1] trailing",
+    "[{\"a\": }]",
+])
+def test_invalid_input_raises(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(text.encode("utf-8")), 4))
@@ -16,10 +16,11 @@ def run_main(monkeypatch, args):
         "biblioteka_reservations.json",
         "biblioteka_users.json",
     ]:
-        try:
-            os.remove(fname)
-        except FileNotFoundError:
-            pass
+        for name in (fname, fname + ".lock"):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
 
     monkeypatch.setenv("BIB_BOOK_DATA_FILE", "biblioteka_books.json")
     monkeypatch.setenv("BIB_MEMBER_DATA_FILE", "biblioteka_members.json")
@@ -215,3 +216,412 @@ def test_unknown_command_exits(monkeypatch):
     with pytest.raises(SystemExit) as e:
         run_main(monkeypatch, ["foobar"])
     assert e.value.code == 2
+
+
+def test_journal_mode_appends_and_compacts(capsys, monkeypatch, tmp_path):
+    """
+    W trybie dziennika mutacje trafiają do pliku .journal,
+    a compact-journal składa je do snapshotu JSON.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "JOURNAL_MODE", True)
+    for args in (
+        ["add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+        ["add-book", "--isbn", "2", "--title", "U", "--author", "B"],
+    ):
+        monkeypatch.setattr(sys, "argv", ["prog"] + args)
+        main()
+    assert not (tmp_path / cli.DATA_BOOK_FILE).exists()
+    assert (tmp_path / (cli.DATA_BOOK_FILE + ".journal")).exists()
+
+    monkeypatch.setattr(sys, "argv", ["prog", "compact-journal"])
+    main()
+    assert (tmp_path / cli.DATA_BOOK_FILE).exists()
+    assert (tmp_path / (cli.DATA_BOOK_FILE + ".journal")).read_text() == ""
+
+    capsys.readouterr()
+    monkeypatch.setattr(sys, "argv", ["prog", "list-books"])
+    main()
+    out = capsys.readouterr().out
+    assert "1: T — A" in out and "2: U — B" in out
+
+
+def test_sqlite_database_backend(capsys, monkeypatch, tmp_path):
+    """
+    Z BIB_DATABASE dane zapisywane są w bazie SQLite zamiast w JSON.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "DATABASE_FILE", str(tmp_path / "lib.db"))
+    monkeypatch.setattr(
+        sys, "argv",
+        ["prog", "add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+    )
+    main()
+    monkeypatch.setattr(sys, "argv", ["prog", "list-books"])
+    main()
+    out = capsys.readouterr().out
+    assert "1: T — A" in out
+    assert not (tmp_path / cli.DATA_BOOK_FILE).exists()
+
+
+def test_snapshot_mode_writes_binary_files(capsys, monkeypatch, tmp_path):
+    """
+    W trybie BIB_SNAPSHOT tabele zapisywane są do plików .bin
+    i wczytywane z nich leniwie.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "SNAPSHOT_MODE", True)
+    for args in (
+        ["add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+        ["add-book", "--isbn", "2", "--title", "U", "--author", "B"],
+        ["list-books"],
+    ):
+        monkeypatch.setattr(sys, "argv", ["prog"] + args)
+        main()
+    out = capsys.readouterr().out
+    assert "1: T — A" in out and "2: U — B" in out
+    assert (tmp_path / cli.snapshot_path(cli.DATA_BOOK_FILE)).exists()
+    assert not (tmp_path / cli.DATA_BOOK_FILE).exists()
+
+
+def test_commands_load_only_declared_tables(capsys, monkeypatch, tmp_path):
+    """
+    Komenda wczytuje (leniwie) tylko tabele, których potrzebuje.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    loaded = []
+    original = cli.load_table
+
+    def recording_load_table(repo, model, factory, path):
+        loaded.append(model.__name__)
+        original(repo, model, factory, path)
+
+    monkeypatch.setattr(cli, "load_table", recording_load_table)
+    run_main(monkeypatch, ["login-user", "--user-id", "U1"])
+    assert loaded == ["User"]
+
+    loaded.clear()
+    run_main(monkeypatch, ["loan-book", "--member-id", "X", "--isbn", "1"])
+    assert loaded == ["Member"]
+    assert "Error: Member X not found" in capsys.readouterr().out
+
+
+def test_search_books_persists_index(capsys, monkeypatch, tmp_path):
+    """
+    search-books zapisuje indeks pełnotekstowy obok pliku książek,
+    komendy zmieniające książki aktualizują go przyrostowo,
+    a przebudowywany jest dopiero po zmianie danych poza CLI.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    index_path = tmp_path / "biblioteka_books.search.json"
+    for args in (
+        ["add-book", "--isbn", "1", "--title", "Pan Tadeusz",
+         "--author", "Mickiewicz"],
+        ["search-books", "tadeusz"],
+    ):
+        monkeypatch.setattr(sys, "argv", ["prog"] + args)
+        main()
+    assert "1: Pan Tadeusz — Mickiewicz" in capsys.readouterr().out
+    assert index_path.exists()
+
+    built = []
+    original = cli.Repository.create_search_index
+
+    def recording_create(repo, cls, attrs):
+        built.append(cls)
+        return original(repo, cls, attrs)
+
+    monkeypatch.setattr(
+        cli.Repository, "create_search_index", recording_create,
+    )
+    monkeypatch.setattr(sys, "argv", ["prog", "search-books", "mickiewicz"])
+    main()
+    assert built == []
+    assert "1: Pan Tadeusz" in capsys.readouterr().out
+
+    monkeypatch.setattr(
+        sys, "argv",
+        ["prog", "add-book", "--isbn", "2", "--title", "Lalka",
+         "--author", "Prus"],
+    )
+    main()
+    monkeypatch.setattr(sys, "argv", ["prog", "search-books", "lalka"])
+    main()
+    assert built == []
+    assert "2: Lalka — Prus" in capsys.readouterr().out
+
+    stat = os.stat(cli.DATA_BOOK_FILE)
+    os.utime(cli.DATA_BOOK_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    monkeypatch.setattr(sys, "argv", ["prog", "search-books", "prus"])
+    main()
+    assert built == [cli.Book]
+    assert "2: Lalka — Prus" in capsys.readouterr().out
+
+
+def test_list_books_pages(capsys, monkeypatch, tmp_path):
+    """
+    list-books --limit/--page wypisuje tylko wskazaną stronę katalogu.
+    """
+    monkeypatch.chdir(tmp_path)
+    for i in range(5):
+        monkeypatch.setattr(
+            sys, "argv",
+            ["prog", "add-book", "--isbn", f"B{i}", "--title", f"T{i}",
+             "--author", "A"],
+        )
+        main()
+    capsys.readouterr()
+
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "list-books", "--limit", "2", "--page", "2"],
+    )
+    main()
+    out = capsys.readouterr().out
+    assert out.splitlines() == ["B2: T2 — A", "B3: T3 — A"]
+
+    monkeypatch.setattr(sys, "argv", ["prog", "list-books", "--page", "0"])
+    main()
+    assert "Error" in capsys.readouterr().out
+
+
+def test_list_overdue_empty(capsys, monkeypatch, tmp_path):
+    """
+    list-overdue bez wypożyczeń nic nie wypisuje.
+    """
+    monkeypatch.chdir(tmp_path)
+    run_main(monkeypatch, ["list-overdue", "--as-of", "2024-01-01"])
+    assert capsys.readouterr().out == ""
+
+
+def test_columnar_mode_writes_compressed_files(capsys, monkeypatch, tmp_path):
+    """
+    W trybie BIB_COLUMNAR tabele zapisywane są do plików .col
+    i wczytywane z nich przy kolejnym uruchomieniu.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "COLUMNAR_MODE", True)
+    for args in (
+        ["add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+        ["add-book", "--isbn", "2", "--title", "U", "--author", "B"],
+        ["list-books"],
+    ):
+        monkeypatch.setattr(sys, "argv", ["prog"] + args)
+        main()
+    out = capsys.readouterr().out
+    assert "1: T — A" in out and "2: U — B" in out
+    assert (tmp_path / cli.columnar_path(cli.DATA_BOOK_FILE)).exists()
+    assert not (tmp_path / cli.DATA_BOOK_FILE).exists()
+
+
+def test_commands_write_only_changed_tables(capsys, monkeypatch, tmp_path):
+    """
+    Komenda zapisuje tylko tabele, które faktycznie zmieniła;
+    nieudana operacja niczego nie przepisuje.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    for args in (
+        ["add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+        ["register-member", "--member-id", "M1", "--name", "X"],
+    ):
+        monkeypatch.setattr(sys, "argv", ["prog"] + args)
+        main()
+
+    written = []
+    original = cli.write_table
+
+    def recording_write_table(repo, model, path, changes=None):
+        written.append(model.__name__)
+        original(repo, model, path, changes)
+
+    monkeypatch.setattr(cli, "write_table", recording_write_table)
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "reserve-book", "--member-id", "M1",
+                      "--isbn", "9"],
+    )
+    main()
+    assert written == []
+
+    monkeypatch.setattr(
+        sys, "argv", ["prog", "reserve-book", "--member-id", "M1",
+                      "--isbn", "1"],
+    )
+    main()
+    assert sorted(written) == ["Book", "Reservation"]
+    assert "Reserved book" in capsys.readouterr().out
+
+
+def test_conflicting_write_is_retried_on_fresh_data(
+        capsys, monkeypatch, tmp_path,
+):
+    """
+    Gdy inny proces zapisze tabelę między wczytaniem a zapisem,
+    komenda nie nadpisuje jego zmian: jest powtarzana na świeżo
+    wczytanych danych, a komunikat wypisywany jest raz.
+    """
+    import biblioteka.cli as cli
+
+    monkeypatch.chdir(tmp_path)
+    original = cli.save
+    calls = []
+
+    def racing_save(repo, locks=None):
+        # Wczytanie (i jego blokada współdzielona) jest już zakończone.
+        calls.append(repo)
+        if len(calls) == 1:
+            # "Inny proces" zapisuje książkę po naszym wczytaniu.
+            monkeypatch.setattr(
+                sys, "argv",
+                ["prog", "add-book", "--isbn", "2", "--title", "U",
+                 "--author", "B"],
+            )
+            main()
+        return original(repo, locks)
+
+    monkeypatch.setattr(cli, "save", racing_save)
+    monkeypatch.setattr(
+        sys, "argv",
+        ["prog", "add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+    )
+    main()
+    out = capsys.readouterr().out
+    # Wynik odrzuconej próby (razem z wyjściem "innego procesu",
+    # uruchomionego w tym samym procesie) nie jest wypisywany.
+    assert out.splitlines() == ["Added book 1"]
+    assert len(calls) == 3
+
+    monkeypatch.setattr(cli, "save", original)
+    monkeypatch.setattr(sys, "argv", ["prog", "list-books"])
+    main()
+    out = capsys.readouterr().out
+    assert "1: T — A" in out and "2: U — B" in out
+
+
+def test_output_is_kept_when_command_fails(capsys, monkeypatch, tmp_path):
+    """
+    Wyjątek w próbie optymistycznej nie gubi już wypisanego wyjścia.
+    """
+    import biblioteka.cli as cli
+    from biblioteka.utils.exceptions import DataExportError
+
+    monkeypatch.chdir(tmp_path)
+
+    def failing_save(repo, locks=None):
+        print("Saving...")
+        raise DataExportError("disk full")
+
+    monkeypatch.setattr(cli, "save", failing_save)
+    monkeypatch.setattr(
+        sys, "argv",
+        ["prog", "add-book", "--isbn", "1", "--title", "T", "--author", "A"],
+    )
+    with pytest.raises(DataExportError):
+        main()
+    assert capsys.readouterr().out == "Saving...\n"
+
+
+def _add_books(directory, first, count):
+    os.chdir(directory)
+    for i in range(first, first + count):
+        sys.argv = [
+            "prog", "add-book", "--isbn", str(i), "--title", "T",
+            "--author", "A",
+        ]
+        main()
+
+
+def test_concurrent_processes_do_not_lose_writes(capsys, monkeypatch, tmp_path):
+    """
+    Równoległe procesy CLI zapisujące tę samą tabelę
+    nie nadpisują sobie nawzajem zmian.
+    """
+    import multiprocessing
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("fork start method is not available")
+    monkeypatch.chdir(tmp_path)
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_add_books, args=(str(tmp_path), n * 10, 5))
+        for n in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    capsys.readouterr()
+    monkeypatch.setattr(sys, "argv", ["prog", "list-books"])
+    main()
+    listed = capsys.readouterr().out.splitlines()
+    assert len(listed) == 20
+
+
+def test_sharded_mode_rewrites_only_changed_shards(
+        capsys, monkeypatch, tmp_path,
+):
+    """
+    W trybie BIB_SHARDS tabela zapisywana jest do katalogu shardów,
+    a komenda przepisuje tylko shardy zmienionych rekordów.
+    """
+    import biblioteka.cli as cli
+    from biblioteka.storage.sharding import shard_of, shard_path
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "SHARDS", 4)
+    directory = cli.sharded_path(cli.DATA_BOOK_FILE)
+    for isbn in ("1", "2", "3"):
+        monkeypatch.setattr(
+            sys, "argv",
+            ["prog", "add-book", "--isbn", isbn, "--title", f"T{isbn}",
+             "--author", "A"],
+        )
+        main()
+    assert not (tmp_path / cli.DATA_BOOK_FILE).exists()
+    stamps = {
+        i: os.stat(shard_path(directory, i)).st_mtime_ns for i in range(4)
+    }
+
+    monkeypatch.setattr(
+        sys, "argv",
+        ["prog", "add-book", "--isbn", "4", "--title", "T4", "--author", "B"],
+    )
+    main()
+    changed = [
+        i for i in range(4)
+        if os.stat(shard_path(directory, i)).st_mtime_ns != stamps[i]
+    ]
+    assert changed == [shard_of("4", 4)]
+
+    capsys.readouterr()
+    monkeypatch.setattr(sys, "argv", ["prog", "list-books"])
+    main()
+    assert len(capsys.readouterr().out.splitlines()) == 4
+
+
+@pytest.mark.skipif(
+    bool(os.getenv("BIB_CODEC")), reason="BIB_CODEC wybiera kodek jawnie",
+)
+def test_default_codec_streams():
+    """
+    Bez BIB_CODEC CLI używa strumieniowego JsonCodec, nawet gdy
+    zainstalowano orjson/msgspec (FastJsonCodec czyta cały plik).
+    """
+    import biblioteka.cli as cli
+    from biblioteka.storage.codecs import JsonCodec
+
+    assert type(cli.CODEC) is JsonCodec